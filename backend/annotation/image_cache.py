@@ -0,0 +1,171 @@
+"""
+Decoded-image LRU shared by the SuperAnnotator commands.
+
+annotate, refine_sam, resegment_box, save_segments_for_boxes and detect_obb
+often alternate between a handful of images; each of them used to decode the
+file again. Decoded (EXIF-corrected BGR) images are kept here, keyed by
+absolute path and validated against the file's (mtime, size) on every lookup,
+so an image rewritten in place is decoded again.
+
+The cache is bounded by the decoded bytes it holds (max_bytes) and also gives
+memory back under pressure: when psutil reports less than min_available_bytes
+of available system RAM, least recently used entries are dropped. The most
+recently used image is always kept, so repeated calls on one image (the
+refine_sam / resegment_box loop) never decode it twice, even when it alone
+exceeds the budget.
+
+Cached arrays are shared between callers and must not be modified in place.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_IMAGE_CACHE_BYTES = 1024 * 1024 * 1024
+# Start dropping cached images when the system has less RAM than this available.
+DEFAULT_MIN_AVAILABLE_BYTES = 1024 * 1024 * 1024
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _available_memory_bytes():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return int(psutil.virtual_memory().available)
+    except Exception:
+        return None
+
+
+class DecodedImageCache:
+    """Byte-budgeted LRU of decoded images (see module docstring)."""
+
+    def __init__(
+        self,
+        loader,
+        max_bytes=DEFAULT_IMAGE_CACHE_BYTES,
+        min_available_bytes=DEFAULT_MIN_AVAILABLE_BYTES,
+        available_memory=_available_memory_bytes,
+    ):
+        """
+        loader(path) -> ndarray or None decodes one image; available_memory()
+        -> bytes or None reports free system RAM (None disables pressure checks).
+        """
+        self._loader = loader
+        self.max_bytes = max(0, int(max_bytes))
+        self.min_available_bytes = max(0, int(min_available_bytes))
+        self._available_memory = available_memory
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_failures": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "pressure_evictions": 0,
+            "total_load_s": 0.0,
+        }
+
+    def get(self, image_path):
+        """Decoded image for image_path (None if it cannot be read)."""
+        key = os.path.abspath(image_path)
+        signature = _file_signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry["signature"] == signature:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry["image"]
+                self._drop(key)
+                self._stats["invalidations"] += 1
+            self._stats["misses"] += 1
+
+        started = time.perf_counter()
+        image = self._loader(image_path)
+        load_s = time.perf_counter() - started
+
+        with self._lock:
+            self._stats["loads"] += 1
+            self._stats["total_load_s"] += load_s
+            if image is None:
+                self._stats["load_failures"] += 1
+                return None
+            if key in self._entries:
+                self._drop(key)  # another thread loaded it meanwhile
+            self._entries[key] = {"image": image, "signature": signature, "nbytes": int(image.nbytes)}
+            self._bytes += int(image.nbytes)
+            self._enforce_budget()
+        return image
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["nbytes"]
+
+    def _evict_oldest(self):
+        key = next(iter(self._entries))
+        freed = self._entries[key]["nbytes"]
+        self._drop(key)
+        return freed
+
+    def _enforce_budget(self):
+        while len(self._entries) > 1 and self._bytes > self.max_bytes:
+            self._evict_oldest()
+            self._stats["evictions"] += 1
+        if len(self._entries) <= 1 or self.min_available_bytes <= 0:
+            return
+        available = self._available_memory()
+        if available is None:
+            return
+        while len(self._entries) > 1 and available < self.min_available_bytes:
+            available += self._evict_oldest()
+            self._stats["pressure_evictions"] += 1
+
+    def invalidate(self, image_path=None):
+        """Drop image_path (or everything when None); returns the number of entries dropped."""
+        with self._lock:
+            if image_path is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                key = os.path.abspath(image_path)
+                dropped = 0
+                if key in self._entries:
+                    self._drop(key)
+                    dropped = 1
+            self._stats["invalidations"] += dropped
+            return dropped
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            loads = self._stats["loads"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "min_available_bytes": self.min_available_bytes,
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+                "loads": loads,
+                "load_failures": self._stats["load_failures"],
+                "invalidations": self._stats["invalidations"],
+                "evictions": self._stats["evictions"],
+                "pressure_evictions": self._stats["pressure_evictions"],
+                "total_load_s": round(self._stats["total_load_s"], 3),
+                "mean_load_s": round(self._stats["total_load_s"] / loads, 3) if loads else None,
+            }
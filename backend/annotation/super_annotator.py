@@ -7,7 +7,7 @@ Combines session OBB detection, optional SAM2 segmentation, and Dlib landmark
 prediction into one schema-aware pipeline.
 
 Commands (JSON per line on stdin):
-  {"cmd": "init"}
+  {"cmd": "init"}                       (optional "image_cache_mb", "image_cache_min_available_mb")
   {"cmd": "check"}
   {"cmd": "annotate", "image_path": "...", "class_name": "Fish", ...}
   {"cmd": "refine_sam", "image_path": "...", "object_index": 0, "click_point": [x,y], "click_label": 1}
@@ -43,10 +43,29 @@ _BACKEND_ROOT = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
 if _BACKEND_ROOT not in _sys.path:
     _sys.path.insert(0, _BACKEND_ROOT)
 
+from annotation.image_cache import DecodedImageCache
 from bv_utils.image_utils import load_image
+from detection.detect_specimen import get_yolo_detector, invalidate_yolo_detector, yolo_detector_stats
 
 STANDARD_SIZE = 512
 
+# Same predictor arguments SAM.predict() uses, for the embedding-reusing SAM2 predictor.
+_SAM2_PREDICT_OVERRIDES = {
+    "conf": 0.25,
+    "task": "segment",
+    "mode": "predict",
+    "imgsz": 1024,
+    "retina_masks": True,
+    "batch": 1,
+    "rect": True,
+    "save": False,
+    "verbose": False,
+}
+# Boxes per batched SAM2 call. SAM2 post-processing upsamples every mask of a
+# call to full image resolution as float32, so large images get fewer per call.
+SAM2_MAX_BOXES_PER_CALL = 16
+SAM2_MAX_BATCH_MASK_BYTES = 512 * 1024 * 1024
+
 
 def send(obj):
     """Send a JSON object to stdout (one line)."""
@@ -99,6 +118,52 @@ def _aabb_iou(a, b):
     return inter / (area_a + area_b - inter)
 
 
+def _sam2_boxes_per_call(img_h, img_w):
+    """Boxes per SAM2 call for an img_w x img_h image (at least 1)."""
+    per_mask = 4 * max(1, int(img_h) * int(img_w))
+    return max(1, min(SAM2_MAX_BOXES_PER_CALL, SAM2_MAX_BATCH_MASK_BYTES // per_mask))
+
+
+def _mask_edge_touches(masks, boxes, edge_thresh):
+    """Which edges of its box each mask reaches, vectorized over all masks.
+
+    masks is (N, H, W) bool and boxes (N, 4) int xyxy. Returns (N, 4) bool for
+    the top, bottom, left and right bands of edge_thresh pixels inside each box
+    (clipped to the image).
+    """
+    _, h, w = masks.shape
+    x1 = np.clip(boxes[:, 0], 0, w)[:, None]
+    x2 = np.clip(boxes[:, 2], 0, w)[:, None]
+    y1 = np.clip(boxes[:, 1], 0, h)[:, None]
+    y2 = np.clip(boxes[:, 3], 0, h)[:, None]
+    ys = np.arange(h)[None, :]
+    xs = np.arange(w)[None, :]
+    in_rows = (ys >= y1) & (ys < y2)
+    in_cols = (xs >= x1) & (xs < x2)
+    # Rows (columns) in which each mask has a pixel inside its box.
+    row_hits = (masks & in_cols[:, None, :]).any(axis=2) & in_rows
+    col_hits = (masks & in_rows[:, :, None]).any(axis=1) & in_cols
+    return np.stack([
+        (row_hits & (ys < y1 + edge_thresh)).any(axis=1),
+        (row_hits & (ys >= y2 - edge_thresh)).any(axis=1),
+        (col_hits & (xs < x1 + edge_thresh)).any(axis=1),
+        (col_hits & (xs >= x2 - edge_thresh)).any(axis=1),
+    ], axis=1)
+
+
+def _expand_touched_edges(boxes, touches, img_w, img_h, expand_ratio):
+    """Grow every touched edge by expand_ratio of the box size, within the image."""
+    x1, y1, x2, y2 = boxes.T
+    grow_x = ((x2 - x1) * expand_ratio).astype(np.int64)
+    grow_y = ((y2 - y1) * expand_ratio).astype(np.int64)
+    return np.stack([
+        np.where(touches[:, 2], np.maximum(0, x1 - grow_x), x1),
+        np.where(touches[:, 0], np.maximum(0, y1 - grow_y), y1),
+        np.where(touches[:, 3], np.minimum(img_w, x2 + grow_x), x2),
+        np.where(touches[:, 1], np.minimum(img_h, y2 + grow_y), y2),
+    ], axis=1)
+
+
 def _class_agnostic_dedup(detections, iou_threshold=0.5):
     """Remove lower-confidence duplicates that overlap above threshold, ignoring class."""
     kept = []
@@ -137,9 +202,15 @@ class SuperAnnotator:
         self.yolo_init_error = None
         self.sam2_init_attempted = False
         self.sam2_init_error = None
+        self._image_cache = DecodedImageCache(lambda path: load_image(path)[0])
         self._cached_image_path = None
         self._cached_image = None
         self._cached_sam_results = None
+        self._sam2_predictor = None
+        self._sam2_predictor_model = None
+        self._sam2_embedded_image = None
+        self._sam2_reuse_disabled = False
+        self._sam2_embedding_stats = {"embeds": 0, "reuses": 0, "fallback_predicts": 0}
 
     @staticmethod
     def _format_yolo_error(err):
@@ -413,77 +484,201 @@ class SuperAnnotator:
             "sam2_error": self.sam2_init_error,
             "obb_capable": caps["obb_capable"],
             "obb_model_tier": caps["obb_model_tier"],
+            "yolo_detector_cache": yolo_detector_stats(),
+            "image_cache": self._image_cache.stats(),
+            "sam2_embedding": dict(self._sam2_embedding_stats, reuse_enabled=not self._sam2_reuse_disabled),
         }
 
+    def configure_image_cache(self, max_mb=None, min_available_mb=None):
+        """Adjust the decoded-image cache budget; entries over the new budget are dropped lazily."""
+        if max_mb is not None:
+            self._image_cache.max_bytes = max(0, int(float(max_mb) * 1024 * 1024))
+        if min_available_mb is not None:
+            self._image_cache.min_available_bytes = max(0, int(float(min_available_mb) * 1024 * 1024))
+        return self._image_cache.stats()
+
     # ------------------------------------------------------------------
     # Load / cache image
     # ------------------------------------------------------------------
     def _load_image(self, image_path):
-        """Load image with EXIF correction, caching for repeated SAM calls."""
-        if self._cached_image_path == image_path and self._cached_image is not None:
-            return self._cached_image
-        img, w, h = load_image(image_path)
+        """Load image with EXIF correction through the shared decoded-image cache.
+
+        The returned image becomes the current one; SAM results cached for a
+        different image (or an older version of this file) are invalidated.
+        """
+        img = self._image_cache.get(image_path)
+        if self._cached_image_path != image_path or self._cached_image is not img:
+            self._cached_sam_results = None  # invalidate SAM cache
         self._cached_image_path = image_path
         self._cached_image = img
-        self._cached_sam_results = None  # invalidate SAM cache
         return img
 
+    # ------------------------------------------------------------------
+    # SAM2 prompting with a reused image embedding
+    # ------------------------------------------------------------------
+    def _sam2_predictor_for(self, image):
+        """SAM2 predictor holding the embedding of `image`, or None if reuse is unavailable.
+
+        The image encoder runs only when `image` is a different array from the
+        one last embedded. Images come from the shared decode cache, so every
+        prompt on the same file (refine_sam clicks, resegment_box, the iterative
+        expansion passes) reuses one embedding, and a new or rewritten file is
+        a new array that gets embedded again.
+        """
+        if self._sam2_reuse_disabled:
+            return None
+        if self._sam2_predictor is None or self._sam2_predictor_model is not self.sam2_model:
+            self._release_sam2_predictor()
+            try:
+                predictor_cls = self.sam2_model.task_map["segment"]["predictor"]
+                predictor = predictor_cls(overrides=dict(_SAM2_PREDICT_OVERRIDES))
+                predictor.setup_model(model=self.sam2_model.model, verbose=False)
+            except Exception as e:
+                logger.warning(f"SAM2 embedding reuse unavailable, encoding the image per prompt: {e}")
+                self._sam2_reuse_disabled = True
+                return None
+            self._sam2_predictor = predictor
+            self._sam2_predictor_model = self.sam2_model
+
+        if image is self._sam2_embedded_image:
+            self._sam2_embedding_stats["reuses"] += 1
+        else:
+            self._sam2_embedded_image = None
+            self._sam2_predictor.set_image(image)
+            self._sam2_embedded_image = image
+            self._sam2_embedding_stats["embeds"] += 1
+        return self._sam2_predictor
+
+    def _sam2_predict(self, image, bboxes, points=None, labels=None):
+        """SAM2 results for box (and optional point) prompts on `image`."""
+        predictor = self._sam2_predictor_for(image)
+        if predictor is None:
+            self._sam2_embedding_stats["fallback_predicts"] += 1
+            return self.sam2_model.predict(image, bboxes=bboxes, points=points, labels=labels, verbose=False)
+        return predictor(bboxes=bboxes, points=points, labels=labels)
+
+    def _release_sam2_predictor(self):
+        """Drop the embedding predictor and its image features (GPU memory)."""
+        self._sam2_predictor = None
+        self._sam2_predictor_model = None
+        self._sam2_embedded_image = None
+
     # ------------------------------------------------------------------
     # Stage A: Detection
     # ------------------------------------------------------------------
     # ------------------------------------------------------------------
     # Stage A.5: SAM2 refinement
     # ------------------------------------------------------------------
-    def _iterative_sam2_segment(self, image, xyxy, img_w, img_h,
-                                max_iter=3, edge_thresh=5, expand_ratio=0.15):
-        """Run SAM2 with automatic boundary-aware box expansion (up to max_iter passes).
+    def _iterative_sam2_segment(self, image, xyxy, max_iter=3, edge_thresh=5, expand_ratio=0.15):
+        """Run SAM2 on one box with boundary-aware box expansion; returns (mask, final_xyxy).
 
-        After each SAM2 pass, checks if the mask touches the bounding box edge
-        (within edge_thresh pixels). If so, expands that edge by expand_ratio of
-        the box dimension and reruns. Stops early when the mask no longer reaches
-        any edge (converged) or when image boundaries are hit.
-
-        Returns (mask, final_xyxy).
+        Raises the SAM2 error (or RuntimeError when no mask came back).
         """
-        xyxy = [int(v) for v in xyxy]
-        mask = None
-        for _ in range(max_iter):
-            results = self.sam2_model.predict(image, bboxes=[xyxy], verbose=False)
-            mask = (results[0].masks.data[0].cpu().numpy() > 0.5).astype(np.uint8)
-            x1, y1, x2, y2 = xyxy
-            crop = mask[y1:y2, x1:x2]
-            bw, bh = x2 - x1, y2 - y1
-            nx1, ny1, nx2, ny2 = x1, y1, x2, y2
-            if crop[:edge_thresh, :].any():    ny1 = max(0,     y1 - int(bh * expand_ratio))
-            if crop[-edge_thresh:, :].any():   ny2 = min(img_h, y2 + int(bh * expand_ratio))
-            if crop[:, :edge_thresh].any():    nx1 = max(0,     x1 - int(bw * expand_ratio))
-            if crop[:, -edge_thresh:].any():   nx2 = min(img_w, x2 + int(bw * expand_ratio))
-            if [nx1, ny1, nx2, ny2] == [x1, y1, x2, y2]:
-                break  # converged -- mask does not touch any edge
-            xyxy = [nx1, ny1, nx2, ny2]
-        return mask, xyxy
+        ((mask, final_xyxy, error),) = self._batched_sam2_segment(
+            image, [xyxy], max_iter=max_iter, edge_thresh=edge_thresh, expand_ratio=expand_ratio)
+        if error is not None:
+            raise error
+        return mask, final_xyxy
+
+    def _batched_sam2_segment(self, image, boxes, iterative=True, max_iter=3,
+                              edge_thresh=5, expand_ratio=0.15):
+        """Segment all boxes of one image with batched SAM2 box prompts.
+
+        Boxes are prompted together, at most _sam2_boxes_per_call() per call.
+        With iterative=True each pass checks, for all masks at once, whether a
+        mask touches its box edge (within edge_thresh pixels); touched edges are
+        expanded by expand_ratio of the box dimension and only those boxes are
+        prompted again, for up to max_iter passes. A box stops early when its
+        mask no longer reaches any edge or the image boundary is hit.
+
+        Returns one (mask, final_xyxy, error) per box. When SAM2 fails or
+        returns no mask for a box, mask is None, final_xyxy is the input box and
+        error the exception.
+        """
+        img_h, img_w = image.shape[:2]
+        original = np.array([[int(v) for v in box[:4]] for box in boxes], dtype=np.int64).reshape(-1, 4)
+        xyxy = original.copy()
+        masks = [None] * len(original)
+        errors = [None] * len(original)
+        per_call = _sam2_boxes_per_call(img_h, img_w)
+        active = list(range(len(original)))
+
+        def fail(idx, error):
+            masks[idx], errors[idx] = None, error
+            xyxy[idx] = original[idx]
+
+        for _ in range(max_iter if iterative else 1):
+            if not active:
+                break
+            prompted = []
+            touches = np.zeros((len(original), 4), dtype=bool)
+            queue = [active[start:start + per_call] for start in range(0, len(active), per_call)]
+            while queue:
+                chunk = queue.pop(0)
+                try:
+                    chunk_masks, chunk_touches = self._sam2_prompt_boxes(
+                        image, xyxy[chunk], edge_thresh if iterative else 0)
+                except Exception as e:
+                    if len(chunk) > 1:
+                        # Usually out of memory for the whole batch: try the boxes one at a time.
+                        logger.warning(f"Batched SAM2 call for {len(chunk)} boxes failed ({e}); prompting them one at a time")
+                        queue[:0] = [[idx] for idx in chunk]
+                    else:
+                        fail(chunk[0], e)
+                    continue
+                for idx, mask, touched in zip(chunk, chunk_masks, chunk_touches):
+                    if mask is None:
+                        fail(idx, RuntimeError("SAM2 returned no mask for this box"))
+                        continue
+                    masks[idx] = mask
+                    touches[idx] = touched
+                    prompted.append(idx)
+
+            if not iterative or not prompted:
+                break
+            expanded = _expand_touched_edges(xyxy[prompted], touches[prompted], img_w, img_h, expand_ratio)
+            changed = (expanded != xyxy[prompted]).any(axis=1)
+            xyxy[prompted] = expanded
+            active = [idx for idx, grew in zip(prompted, changed) if grew]
+
+        return [(masks[i], xyxy[i].tolist(), errors[i]) for i in range(len(original))]
+
+    def _sam2_prompt_boxes(self, image, boxes, edge_thresh):
+        """One SAM2 call for boxes (k, 4); returns per-box uint8 masks (None if missing) and (k, 4) edge touches."""
+        result = self._sam2_predict(image, boxes.tolist())[0]
+        masks = [None] * len(boxes)
+        touches = np.zeros((len(boxes), 4), dtype=bool)
+        if result.masks is None or len(result.masks.data) == 0:
+            return masks, touches
+        stack = result.masks.data.cpu().numpy() > 0.5
+        # Masks scoring under conf are dropped; boxes.cls keeps the prompt index of the rest.
+        prompt_idx = np.arange(len(stack))
+        if result.boxes is not None and len(result.boxes) == len(stack):
+            prompt_idx = result.boxes.cls.cpu().numpy().astype(np.int64)
+        valid = (prompt_idx >= 0) & (prompt_idx < len(boxes))
+        if not valid.all():
+            stack, prompt_idx = stack[valid], prompt_idx[valid]
+        if edge_thresh > 0:
+            touches[prompt_idx] = _mask_edge_touches(stack, boxes[prompt_idx], edge_thresh)
+        for k, idx in enumerate(prompt_idx):
+            masks[idx] = stack[k].astype(np.uint8)
+        return masks, touches
 
     def refine_with_sam2(self, image, boxes):
-        """Refine YOLO boxes with SAM2 masks (with iterative boundary expansion)."""
-        img_h, img_w = image.shape[:2]
+        """Refine YOLO boxes with SAM2 masks (batched, with iterative boundary expansion)."""
+        outcomes = self._batched_sam2_segment(image, [box_data["xyxy"] for box_data in boxes])
         masks = []
-        for i, box_data in enumerate(boxes):
-            try:
-                mask, expanded_xyxy = self._iterative_sam2_segment(
-                    image, box_data["xyxy"], img_w, img_h)
-                box_data["xyxy"] = expanded_xyxy
-                masks.append(mask)
-            except RuntimeError as e:
+        for i, (box_data, (mask, expanded_xyxy, error)) in enumerate(zip(boxes, outcomes)):
+            if error is not None:
                 # OOM or other GPU error -- degrade gracefully
-                if "out of memory" in str(e).lower() or "oom" in str(e).lower():
+                if "out of memory" in str(error).lower() or "oom" in str(error).lower():
                     logger.warning(f"SAM2 OOM on object {i}, skipping mask refinement")
-                    masks.append(None)
                 else:
-                    logger.warning(f"SAM2 error on object {i}: {e}")
-                    masks.append(None)
-            except Exception as e:
-                logger.warning(f"SAM2 error on object {i}: {e}")
+                    logger.warning(f"SAM2 error on object {i}: {error}")
                 masks.append(None)
+                continue
+            box_data["xyxy"] = expanded_xyxy
+            masks.append(mask)
         return masks
 
     def mask_to_outline(self, mask, max_points=100):
@@ -603,7 +798,8 @@ class SuperAnnotator:
         if not boxes:
             return {"status": "ok", "saved": 0, "requested": 0, "details": []}
 
-        image = cv2.imread(image_path)
+        # Shared cache, but not _load_image(): SAM results of the current image stay valid.
+        image = self._image_cache.get(image_path)
         if image is None:
             return {
                 "status": "error",
@@ -634,13 +830,31 @@ class SuperAnnotator:
                 key = tuple(int(v) for v in box_data["xyxy"])
                 cached_lookup[key] = mask
 
+        clipped = [
+            (max(0, int(box_xyxy[0])), max(0, int(box_xyxy[1])),
+             min(img_w, int(box_xyxy[2])), min(img_h, int(box_xyxy[3])))
+            for box_xyxy in boxes
+        ]
+
+        # Fresh SAM2 inference for valid boxes without a cached mask, all in one batch.
+        sam2_outcomes = {}
+        if self.sam2_model is not None:
+            pending = [
+                idx for idx, (x1, y1, x2, y2) in enumerate(clipped)
+                if x2 > x1 and y2 > y1 and cached_lookup.get((x1, y1, x2, y2)) is None
+            ]
+            if pending:
+                outcomes = self._batched_sam2_segment(
+                    image,
+                    [clipped[idx] for idx in pending],
+                    iterative=iterative,
+                    expand_ratio=float(expand_ratio),
+                )
+                sam2_outcomes = dict(zip(pending, outcomes))
+
         saved = 0
         details = []
-        for idx, box_xyxy in enumerate(boxes):
-            x1 = max(0, int(box_xyxy[0]))
-            y1 = max(0, int(box_xyxy[1]))
-            x2 = min(img_w, int(box_xyxy[2]))
-            y2 = min(img_h, int(box_xyxy[3]))
+        for idx, (x1, y1, x2, y2) in enumerate(clipped):
             if x2 <= x1 or y2 <= y1:
                 details.append({"index": idx, "status": "failed", "reason": "invalid_or_empty_crop"})
                 continue
@@ -651,27 +865,16 @@ class SuperAnnotator:
             failure_reason = None
 
             # Fall back to fresh SAM2 inference if no cached mask.
-            if mask is None and self.sam2_model is not None:
-                try:
-                    if iterative:
-                        mask, expanded_xyxy = self._iterative_sam2_segment(
-                            image,
-                            [x1, y1, x2, y2],
-                            img_w,
-                            img_h,
-                            expand_ratio=float(expand_ratio),
-                        )
-                        if expanded_xyxy:
-                            save_x1, save_y1, save_x2, save_y2 = [int(v) for v in expanded_xyxy]
-                        mask_source = "sam2_iterative"
-                    else:
-                        results = self.sam2_model.predict(
-                            image, bboxes=[[x1, y1, x2, y2]], verbose=False)
-                        mask = (results[0].masks.data[0].cpu().numpy() > 0.5).astype(np.uint8)
-                        mask_source = "sam2"
-                except Exception as e:
-                    logger.warning(f"SAM2 failed for box {idx}: {e}")
-                    failure_reason = f"sam2_inference_failed:{e}"
+            if idx in sam2_outcomes:
+                mask, expanded_xyxy, error = sam2_outcomes[idx]
+                if error is not None:
+                    logger.warning(f"SAM2 failed for box {idx}: {error}")
+                    failure_reason = f"sam2_inference_failed:{error}"
+                elif iterative:
+                    save_x1, save_y1, save_x2, save_y2 = expanded_xyxy
+                    mask_source = "sam2_iterative"
+                else:
+                    mask_source = "sam2"
             elif mask is None and self.sam2_model is None:
                 failure_reason = "sam2_unavailable"
 
@@ -816,8 +1019,9 @@ class SuperAnnotator:
     # ------------------------------------------------------------------
     def detect_finetuned(self, image, finetuned_path, class_name, conf_threshold=0.5, top_k=10, nms_iou=0.3, imgsz=640):
         """Run detection with a fine-tuned YOLOv8 OBB model."""
-        from ultralytics import YOLO
-        ft_model = YOLO(finetuned_path)
+        ft_model = get_yolo_detector(finetuned_path)
+        if ft_model is None:
+            raise FileNotFoundError(f"Fine-tuned detector unavailable: {finetuned_path}")
         results = ft_model.predict(
             image,
             conf=conf_threshold,
@@ -1364,6 +1568,7 @@ class SuperAnnotator:
         if self.sam2_model is not None:
             self.sam2_model = None
             logger.info("Unloaded SAM2 before OBB training")
+        self._release_sam2_predictor()
         gc.collect()
         try:
             import torch
@@ -1646,6 +1851,8 @@ class SuperAnnotator:
 
         dest = os.path.join(models_dir, "session_obb_detector.pt")
         shutil.copy2(best_pt, dest)
+        # Drop the cached detector for dest so the next detect loads the new weights.
+        invalidate_yolo_detector(dest)
 
         send_obb_progress("OBB detector training complete", 100, "done")
         return {
@@ -1666,7 +1873,6 @@ class SuperAnnotator:
         Returns list of detections: [{corners, angle, class_id, confidence}]
         """
         import json as _json_obb
-        from ultralytics import YOLO
         from detection.detection_utils import normalize_orientation_payload
 
         # Load the NMS IoU that was saved when this model was trained.
@@ -1691,9 +1897,12 @@ class SuperAnnotator:
             imgsz=imgsz,
         )
 
-        model = YOLO(model_path)
+        model = get_yolo_detector(model_path)
+        if model is None:
+            raise FileNotFoundError(f"OBB detector unavailable: {model_path}")
+        image = self._image_cache.get(image_path)
         results = model.predict(
-            image_path,
+            image if image is not None else image_path,
             conf=float(resolved["conf"]),
             iou=float(resolved["iou"]),
             imgsz=int(resolved["imgsz"]),
@@ -1820,19 +2029,16 @@ class SuperAnnotator:
         image = self._load_image(image_path)
         try:
             if iterative:
-                img_h, img_w = image.shape[:2]
                 mask, _expanded_xyxy = self._iterative_sam2_segment(
                     image,
                     box_xyxy,
-                    img_w,
-                    img_h,
                     expand_ratio=float(expand_ratio),
                 )
                 if mask is None:
                     return {"status": "error", "error": "SAM2 returned no mask for this box"}
                 score = 1.0
             else:
-                results = self.sam2_model.predict(image, bboxes=[box_xyxy], verbose=False)
+                results = self._sam2_predict(image, [box_xyxy])
                 masks_data = results[0].masks
                 if masks_data is None or len(masks_data.data) == 0:
                     return {"status": "error", "error": "SAM2 returned no mask for this box"}
@@ -1878,13 +2084,7 @@ class SuperAnnotator:
         xyxy = box_data["xyxy"]
 
         try:
-            results = self.sam2_model.predict(
-                image,
-                bboxes=[xyxy],
-                points=[click_point],
-                labels=[click_label],
-                verbose=False,
-            )
+            results = self._sam2_predict(image, [xyxy], points=[click_point], labels=[click_label])
             mask = (results[0].masks.data[0].cpu().numpy() > 0.5).astype(np.uint8)
             outline = self.mask_to_outline(mask)
 
@@ -1926,6 +2126,11 @@ def main():
             command = cmd.get("cmd", "")
 
             if command == "init":
+                if cmd.get("image_cache_mb") is not None or cmd.get("image_cache_min_available_mb") is not None:
+                    annotator.configure_image_cache(
+                        max_mb=cmd.get("image_cache_mb"),
+                        min_available_mb=cmd.get("image_cache_min_available_mb"),
+                    )
                 result = annotator.init_models()
                 send_response(result)
 
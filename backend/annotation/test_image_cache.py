@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from backend.annotation.image_cache import DecodedImageCache
+
+
+class DecodedImageCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.loads = []
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _image(self, name, value=0):
+        path = os.path.join(self._tmpdir.name, name)
+        with open(path, "wb") as f:
+            f.write(bytes([value]) * 16)
+        return path
+
+    def _loader(self, path):
+        self.loads.append(os.path.basename(path))
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            value = f.read(1)[0]
+        return np.full((10, 10, 3), value, dtype=np.uint8)  # 300 bytes
+
+    def test_lru_by_bytes_keeps_recently_used_images(self):
+        cache = DecodedImageCache(self._loader, max_bytes=600, available_memory=lambda: None)
+        a, b, c = (self._image(name) for name in ("a.jpg", "b.jpg", "c.jpg"))
+        first = cache.get(a)
+        cache.get(b)
+        self.assertIs(cache.get(a), first)  # a is now most recently used
+        cache.get(c)  # over budget: b goes
+        cache.get(a)
+        cache.get(b)
+        self.assertEqual(self.loads, ["a.jpg", "b.jpg", "c.jpg", "b.jpg"])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 4, 2))
+        self.assertLessEqual(stats["bytes"], 600)
+
+    def test_rewritten_file_is_decoded_again(self):
+        cache = DecodedImageCache(self._loader, available_memory=lambda: None)
+        path = self._image("a.jpg", value=1)
+        self.assertEqual(int(cache.get(path)[0, 0, 0]), 1)
+        with open(path, "wb") as f:
+            f.write(bytes([2]) * 32)
+        self.assertEqual(int(cache.get(path)[0, 0, 0]), 2)
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_memory_pressure_evicts_all_but_newest(self):
+        available = {"bytes": 10 ** 9}
+        cache = DecodedImageCache(
+            self._loader,
+            max_bytes=10 ** 6,
+            min_available_bytes=500,
+            available_memory=lambda: available["bytes"],
+        )
+        for name in ("a.jpg", "b.jpg"):
+            cache.get(self._image(name))
+        available["bytes"] = 0
+        newest = self._image("c.jpg")
+        cache.get(newest)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["pressure_evictions"], 2)
+        cache.get(newest)
+        self.assertEqual(self.loads.count("c.jpg"), 1)
+
+    def test_oversized_and_unreadable_images(self):
+        cache = DecodedImageCache(self._loader, max_bytes=100, available_memory=lambda: None)
+        path = self._image("big.jpg")
+        cache.get(path)
+        cache.get(path)
+        self.assertEqual(self.loads, ["big.jpg"])  # the newest entry is kept over budget
+        self.assertIsNone(cache.get(os.path.join(self._tmpdir.name, "missing.jpg")))
+        self.assertEqual(cache.stats()["load_failures"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from backend.annotation.super_annotator import SuperAnnotator, _mask_edge_touches
+
+
+class _FakeSam2Predictor:
+    instances = []
+
+    def __init__(self, overrides=None):
+        self.overrides = overrides
+        self.embedded = []
+        self.prompts = []
+        _FakeSam2Predictor.instances.append(self)
+
+    def setup_model(self, model=None, verbose=True):
+        self.model = model
+
+    def set_image(self, image):
+        self.embedded.append(image)
+
+    def __call__(self, bboxes=None, points=None, labels=None):
+        self.prompts.append({"bboxes": bboxes, "points": points, "labels": labels})
+        return ["predictor"]
+
+
+class _FakeSam2Model:
+    def __init__(self, predictor_cls=_FakeSam2Predictor):
+        self.model = object()
+        self.task_map = {"segment": {"predictor": predictor_cls}}
+        self.predict_calls = 0
+
+    def predict(self, image, bboxes=None, points=None, labels=None, verbose=False):
+        self.predict_calls += 1
+        return ["model"]
+
+
+class _Tensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def __len__(self):
+        return len(self.array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class _Result:
+    def __init__(self, masks, prompt_idx):
+        self.masks = type("Masks", (), {"data": _Tensor(masks)})() if len(masks) else None
+        self.boxes = type("Boxes", (), {"cls": _Tensor(prompt_idx), "__len__": lambda _: len(prompt_idx)})()
+
+
+class _ObjectSam2Predictor(_FakeSam2Predictor):
+    """Masks every object of `objects` that overlaps the prompted box (like SAM on a clean image)."""
+
+    objects = []
+    dropped = ()
+
+    def __call__(self, bboxes=None, points=None, labels=None):
+        self.prompts.append({"bboxes": bboxes, "points": points, "labels": labels})
+        h, w = self.embedded[-1].shape[:2]
+        masks, prompt_idx = [], []
+        for idx, (x1, y1, x2, y2) in enumerate(bboxes):
+            mask = np.zeros((h, w), dtype=np.float32)
+            for ox1, oy1, ox2, oy2 in self.objects:
+                if ox1 < x2 and x1 < ox2 and oy1 < y2 and y1 < oy2:
+                    mask[oy1:oy2, ox1:ox2] = 1.0
+            if tuple(bboxes[idx]) not in self.dropped:
+                masks.append(mask)
+                prompt_idx.append(idx)
+        return [_Result(masks, prompt_idx)]
+
+
+def _reference_edge_touches(mask, box, edge_thresh):
+    x1, y1, x2, y2 = box
+    crop = mask[max(0, y1):max(0, y2), max(0, x1):max(0, x2)]
+    return [
+        bool(crop[:edge_thresh, :].any()),
+        bool(crop[-edge_thresh:, :].any()),
+        bool(crop[:, :edge_thresh].any()),
+        bool(crop[:, -edge_thresh:].any()),
+    ]
+
+
+class MaskEdgeTouchTests(unittest.TestCase):
+    def test_matches_per_crop_slicing(self):
+        rng = np.random.default_rng(0)
+        masks = rng.random((40, 30, 50)) > 0.97
+        x1 = rng.integers(-5, 45, size=40)
+        y1 = rng.integers(-5, 25, size=40)
+        boxes = np.stack([x1, y1, x1 + rng.integers(1, 20, 40), y1 + rng.integers(1, 15, 40)], axis=1)
+        touches = _mask_edge_touches(masks, boxes, 5)
+        for mask, box, touched in zip(masks, boxes, touches):
+            self.assertEqual(list(touched), _reference_edge_touches(mask, box, 5))
+
+
+class Sam2EmbeddingReuseTests(unittest.TestCase):
+    def setUp(self):
+        _FakeSam2Predictor.instances = []
+        self.annotator = SuperAnnotator()
+        self.annotator.sam2_model = _FakeSam2Model()
+
+    def test_embedding_is_computed_once_per_image(self):
+        first = np.zeros((8, 8, 3), dtype=np.uint8)
+        second = np.zeros((8, 8, 3), dtype=np.uint8)
+        self.annotator._sam2_predict(first, [[0, 0, 4, 4]])
+        self.annotator._sam2_predict(first, [[1, 1, 5, 5]], points=[[2, 2]], labels=[1])
+        self.annotator._sam2_predict(second, [[0, 0, 4, 4]])
+
+        (predictor,) = _FakeSam2Predictor.instances
+        self.assertIs(predictor.model, self.annotator.sam2_model.model)
+        self.assertEqual(len(predictor.embedded), 2)
+        self.assertIs(predictor.embedded[0], first)
+        self.assertIs(predictor.embedded[1], second)
+        self.assertEqual(predictor.prompts[1], {"bboxes": [[1, 1, 5, 5]], "points": [[2, 2]], "labels": [1]})
+        self.assertEqual(self.annotator.sam2_model.predict_calls, 0)
+        stats = self.annotator.check()["sam2_embedding"]
+        self.assertEqual((stats["embeds"], stats["reuses"]), (2, 1))
+
+    def test_new_model_gets_a_new_predictor(self):
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+        self.annotator._sam2_predict(image, [[0, 0, 4, 4]])
+        self.annotator.sam2_model = _FakeSam2Model()
+        self.annotator._sam2_predict(image, [[0, 0, 4, 4]])
+        self.assertEqual(len(_FakeSam2Predictor.instances), 2)
+        self.assertEqual(len(_FakeSam2Predictor.instances[1].embedded), 1)
+
+    def test_falls_back_to_model_predict_when_predictor_cannot_be_built(self):
+        def broken_predictor(overrides=None):
+            raise RuntimeError("unsupported ultralytics version")
+
+        self.annotator.sam2_model = _FakeSam2Model(predictor_cls=broken_predictor)
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+        self.assertEqual(self.annotator._sam2_predict(image, [[0, 0, 4, 4]]), ["model"])
+        self.assertEqual(self.annotator._sam2_predict(image, [[0, 0, 4, 4]]), ["model"])
+        self.assertEqual(self.annotator.sam2_model.predict_calls, 2)
+        self.assertFalse(self.annotator.check()["sam2_embedding"]["reuse_enabled"])
+
+
+class BatchedSam2SegmentTests(unittest.TestCase):
+    def setUp(self):
+        _FakeSam2Predictor.instances = []
+        _ObjectSam2Predictor.objects = [(20, 20, 60, 50), (100, 10, 120, 30)]
+        _ObjectSam2Predictor.dropped = ()
+        self.annotator = SuperAnnotator()
+        self.annotator.sam2_model = _FakeSam2Model(predictor_cls=_ObjectSam2Predictor)
+        self.image = np.zeros((80, 140, 3), dtype=np.uint8)
+
+    def test_only_boxes_touching_an_edge_are_prompted_again(self):
+        boxes = [{"xyxy": [30, 25, 50, 45]}, {"xyxy": [95, 5, 125, 35]}]
+        masks = self.annotator.refine_with_sam2(self.image, boxes)
+
+        (predictor,) = _FakeSam2Predictor.instances
+        self.assertEqual(len(predictor.embedded), 1)
+        self.assertEqual([len(p["bboxes"]) for p in predictor.prompts], [2, 1, 1])
+        # The mask fills the 20x20 box, so every edge grows by 15% on each of the 3 passes.
+        self.assertEqual(boxes[0]["xyxy"], [20, 15, 60, 55])
+        self.assertEqual(boxes[1]["xyxy"], [95, 5, 125, 35])  # converged on the first pass
+        self.assertEqual(int(masks[0].sum()), 40 * 30)
+        self.assertEqual(masks[1].dtype, np.uint8)
+
+    def test_dropped_mask_fails_only_that_box(self):
+        _ObjectSam2Predictor.dropped = {(95, 5, 125, 35)}
+        outcomes = self.annotator._batched_sam2_segment(self.image, [[30, 25, 50, 45], [95, 5, 125, 35]])
+        self.assertIsNotNone(outcomes[0][0])
+        mask, xyxy, error = outcomes[1]
+        self.assertIsNone(mask)
+        self.assertEqual(xyxy, [95, 5, 125, 35])
+        self.assertIsInstance(error, RuntimeError)
+
+    def test_boxes_are_split_into_size_bounded_calls(self):
+        boxes = [[100 + i, 10, 120, 30] for i in range(5)]
+        with unittest.mock.patch("backend.annotation.super_annotator.SAM2_MAX_BOXES_PER_CALL", 2):
+            self.annotator._batched_sam2_segment(self.image, boxes, iterative=False)
+        (predictor,) = _FakeSam2Predictor.instances
+        self.assertEqual([len(p["bboxes"]) for p in predictor.prompts], [2, 2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,253 @@
+"""
+Image-loading benchmark: copies and peak RSS per decoded image.
+
+Compares bv_utils.image_utils.load_image() with the previous PIL path kept
+here as a reference (rotate/transpose on the PIL image, convert to RGB,
+np.array, cvtColor). Every (loader, image) pair is measured in a fresh
+interpreter so peak RSS is not hidden by memory an earlier load left behind.
+
+Usage:
+    python benchmarks/bench_image_load.py [--output bench.json]
+        [--image-size 6000x4000] [--orientations 1,3,6] [--repeats 3] [--root DIR]
+
+Per image the report lists:
+    latency            decode time, min / mean over --repeats loads
+    peak_rss_delta_mb  process peak RSS during the load minus the peak before it
+    rss_buffers        peak_rss_delta_mb over the decoded BGR size, i.e. how many
+                       full-size buffers were alive at the peak (PIL's included)
+    traced_buffers     the same from tracemalloc, which sees NumPy arrays and
+                       bytes objects but not PIL's internal image memory
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+BENCH_SCHEMA_VERSION = 1
+LOADERS = ("legacy", "load_image")
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+def _legacy_load(image_path):
+    """The PIL loading path before the copy-avoiding rewrite (reference only)."""
+    import cv2
+    from PIL import Image
+    from PIL.ExifTags import TAGS
+
+    pil_img = Image.open(image_path)
+    exif = pil_img._getexif() if hasattr(pil_img, "_getexif") else None
+    orientation = 1
+    if exif:
+        for tag_id, tag_name in TAGS.items():
+            if tag_name == "Orientation":
+                orientation = exif.get(tag_id, 1)
+                break
+    if orientation == 2:
+        pil_img = pil_img.transpose(Image.FLIP_LEFT_RIGHT)
+    elif orientation == 3:
+        pil_img = pil_img.rotate(180, expand=True)
+    elif orientation == 4:
+        pil_img = pil_img.transpose(Image.FLIP_TOP_BOTTOM)
+    elif orientation == 5:
+        pil_img = pil_img.rotate(-90, expand=True).transpose(Image.FLIP_LEFT_RIGHT)
+    elif orientation == 6:
+        pil_img = pil_img.rotate(-90, expand=True)
+    elif orientation == 7:
+        pil_img = pil_img.rotate(90, expand=True).transpose(Image.FLIP_LEFT_RIGHT)
+    elif orientation == 8:
+        pil_img = pil_img.rotate(90, expand=True)
+    if pil_img.mode != "RGB":
+        pil_img = pil_img.convert("RGB")
+    return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+
+
+def _loader(name):
+    if name == "legacy":
+        return _legacy_load
+    from bv_utils.image_utils import load_image
+    return lambda path: load_image(path)[0]
+
+
+def _peak_rss_bytes():
+    # VmHWM starts fresh at exec; ru_maxrss keeps the parent's peak on Linux.
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def probe(loader_name, image_path, repeats):
+    """Measure one loader on one image in this (fresh) interpreter."""
+    import tracemalloc
+
+    load = _loader(loader_name)
+    warmup_path = os.path.join(os.path.dirname(image_path), "_warmup.jpg")
+    load(warmup_path)  # plugin imports and decoder init, not counted
+
+    rss_before = _peak_rss_bytes()
+    started = time.perf_counter()
+    img = load(image_path)
+    latencies = [time.perf_counter() - started]
+    rss_delta = max(0, _peak_rss_bytes() - rss_before)
+    shape = list(img.shape)
+    decoded_bytes = int(img.nbytes)
+    del img
+
+    for _ in range(max(0, repeats - 1)):
+        started = time.perf_counter()
+        load(image_path)
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    img = load(image_path)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del img
+
+    return {
+        "shape": shape,
+        "latency_min_ms": round(min(latencies) * 1000.0, 2),
+        "latency_mean_ms": round(float(np.mean(latencies)) * 1000.0, 2),
+        "peak_rss_delta_mb": round(rss_delta / (1024 ** 2), 1),
+        "rss_buffers": round(rss_delta / decoded_bytes, 2),
+        "traced_peak_mb": round(traced_peak / (1024 ** 2), 1),
+        "traced_buffers": round(traced_peak / decoded_bytes, 2),
+    }
+
+
+def build_images(root, image_size, orientations):
+    """Synthetic JPEGs of image_size (stored size) tagged with each EXIF orientation."""
+    import cv2
+    from PIL import Image
+
+    width, height = image_size
+    rng = np.random.default_rng(0)
+    coarse = rng.integers(0, 255, size=(max(2, height // 64), max(2, width // 64), 3), dtype=np.uint8)
+    base = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_LINEAR)
+    base = cv2.add(base, rng.integers(0, 24, size=base.shape, dtype=np.uint8))
+    pil_img = Image.fromarray(base)
+    Image.fromarray(base[:16, :16]).save(os.path.join(root, "_warmup.jpg"), quality=90)
+    paths = {}
+    for orientation in orientations:
+        exif = pil_img.getexif()
+        exif[_EXIF_ORIENTATION_TAG] = int(orientation)
+        path = os.path.join(root, f"orientation_{orientation}.jpg")
+        pil_img.save(path, quality=90, exif=exif.tobytes())
+        paths[int(orientation)] = path
+    return paths
+
+
+def _run_probe(loader_name, image_path, repeats):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--probe", loader_name, image_path, "--repeats", str(repeats)],
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+
+def run_benchmarks(paths, repeats):
+    results = {}
+    for orientation, path in sorted(paths.items()):
+        per_loader = {name: _run_probe(name, path, repeats) for name in LOADERS}
+        legacy, current = per_loader["legacy"], per_loader["load_image"]
+        if "error" not in legacy and "error" not in current:
+            per_loader["delta"] = {
+                "latency_min_ms": round(current["latency_min_ms"] - legacy["latency_min_ms"], 2),
+                "peak_rss_delta_mb": round(current["peak_rss_delta_mb"] - legacy["peak_rss_delta_mb"], 1),
+                "rss_buffers": round(current["rss_buffers"] - legacy["rss_buffers"], 2),
+                "traced_buffers": round(current["traced_buffers"] - legacy["traced_buffers"], 2),
+            }
+        results[f"orientation_{orientation}"] = per_loader
+    return results
+
+
+def _parse_image_size(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BioVision image-loading benchmark")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout).")
+    parser.add_argument("--root", help="Directory for the synthetic images (default: a temporary directory).")
+    parser.add_argument("--image-size", type=_parse_image_size, default=(6000, 4000), help="WIDTHxHEIGHT as stored.")
+    parser.add_argument("--orientations", default="1,3,6", help="Comma-separated EXIF orientations (1-8).")
+    parser.add_argument("--repeats", type=int, default=3, help="Loads per image for the latency figures.")
+    parser.add_argument("--probe", nargs=2, metavar=("LOADER", "IMAGE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    try:
+        args.orientations = [int(part) for part in args.orientations.split(",") if part.strip()]
+    except ValueError:
+        parser.error(f"invalid --orientations: {args.orientations!r}")
+    bad = [value for value in args.orientations if not 1 <= value <= 8]
+    if bad:
+        parser.error(f"EXIF orientations are 1-8, got {bad}")
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.probe:
+        print(json.dumps(probe(args.probe[0], args.probe[1], max(1, args.repeats))))
+        return
+
+    with contextlib.ExitStack() as stack:
+        root = args.root or stack.enter_context(tempfile.TemporaryDirectory(prefix="bv_bench_images_"))
+        os.makedirs(root, exist_ok=True)
+        print("PROGRESS building synthetic images", file=sys.stderr)
+        paths = build_images(root, args.image_size, args.orientations)
+        results = run_benchmarks(paths, max(1, args.repeats))
+
+    report = {
+        "schema_version": BENCH_SCHEMA_VERSION,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "params": {
+            "image_size": list(args.image_size),
+            "orientations": args.orientations,
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,540 @@
+"""
+Landmark-prediction benchmark suite.
+
+Builds (or reuses) a synthetic session and measures end-to-end and per-stage
+inference cost for the dlib and CNN predictors and the persistent worker.
+Every benchmark reports images/sec, p50/p95 latency and peak RSS; the whole
+run is emitted as one JSON document so results from two commits can be
+diffed with --compare.
+
+Usage:
+    python benchmarks/bench_inference.py [--output bench.json] [--images 8]
+        [--image-size 2400x1600] [--specimens 3] [--warmup 1]
+        [--only predict_image,worker_cnn,...] [--root DIR] [--compare old.json]
+
+Benchmarks:
+    predict_image               predict_image() (dlib, provided box, model loaded per call)
+    predict_multi_specimen      predict_multi_specimen() (dlib, provided boxes)
+    predict_cnn_multi_specimen  predict_cnn_multi_specimen() (CNN, provided boxes)
+    stages_dlib / stages_cnn    per-stage timings against a preloaded context
+    worker_dlib / worker_cnn    predict_worker.py over stdin/stdout, one request at a time
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from benchmarks.synthetic_session import DEFAULT_TAG, build_synthetic_session
+
+BENCH_SCHEMA_VERSION = 1
+ALL_BENCHMARKS = (
+    "predict_image",
+    "predict_multi_specimen",
+    "predict_cnn_multi_specimen",
+    "stages_dlib",
+    "stages_cnn",
+    "worker_dlib",
+    "worker_cnn",
+)
+_REQUIRED_PREDICTOR = {
+    "predict_image": "dlib",
+    "predict_multi_specimen": "dlib",
+    "predict_cnn_multi_specimen": "cnn",
+    "stages_dlib": "dlib",
+    "stages_cnn": "cnn",
+    "worker_dlib": "dlib",
+    "worker_cnn": "cnn",
+}
+WORKER_SCRIPT = os.path.join(_BACKEND_ROOT, "inference", "predict_worker.py")
+
+
+# ── Measurement helpers ─────────────────────────────────────────────────────
+
+class PeakRssSampler:
+    """Sample the RSS of a process in a background thread and keep the maximum."""
+
+    def __init__(self, pid=None, interval_s=0.01):
+        self.pid = pid or os.getpid()
+        self.interval_s = interval_s
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+            self._process = psutil.Process(self.pid)
+        except Exception:
+            self._process = None
+
+    def _sample(self):
+        try:
+            self.peak_bytes = max(self.peak_bytes, int(self._process.memory_info().rss))
+        except Exception:
+            pass
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def __enter__(self):
+        if self._process is not None:
+            self._sample()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._sample()
+        return False
+
+    def peak_mb(self):
+        if self._process is None:
+            return _lifetime_peak_rss_mb()
+        return round(self.peak_bytes / (1024 ** 2), 1)
+
+
+def _lifetime_peak_rss_mb():
+    """Process-lifetime peak RSS, used when psutil is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    divisor = 1024 ** 2 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _latency_summary(latencies_s):
+    if not latencies_s:
+        return {"count": 0}
+    values = np.asarray(latencies_s, dtype=np.float64) * 1000.0
+    return {
+        "count": int(values.size),
+        "total_s": round(float(values.sum()) / 1000.0, 4),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def _throughput_result(latencies_s, peak_rss_mb, **extra):
+    summary = _latency_summary(latencies_s)
+    total_s = sum(latencies_s)
+    result = {
+        "images": len(latencies_s),
+        "images_per_sec": round(len(latencies_s) / total_s, 3) if total_s > 0 else None,
+        "latency": summary,
+        "peak_rss_mb": peak_rss_mb,
+    }
+    result.update(extra)
+    return result
+
+
+@contextlib.contextmanager
+def _quiet_stderr():
+    """Swallow PROGRESS lines the predictors print to stderr while timing."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        yield
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=_BACKEND_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except Exception:
+        return None
+    if out.returncode != 0:
+        return None
+    return out.stdout.strip() or None
+
+
+def _time_over_images(manifest, warmup, call):
+    """Run call(entry) for each image; the first `warmup` calls are not recorded."""
+    entries = manifest["images"]
+    latencies = []
+    with PeakRssSampler() as sampler, _quiet_stderr():
+        for idx, entry in enumerate(entries):
+            started = time.perf_counter()
+            call(entry)
+            elapsed = time.perf_counter() - started
+            if idx >= warmup:
+                latencies.append(elapsed)
+    return latencies, sampler.peak_mb()
+
+
+# ── End-to-end predictor benchmarks ─────────────────────────────────────────
+
+def bench_predict_image(manifest, *, warmup=1):
+    from inference.predict import predict_image
+
+    root, tag = manifest["root"], manifest["tag"]
+    latencies, peak = _time_over_images(
+        manifest,
+        warmup,
+        lambda entry: predict_image(root, tag, entry["image_path"], input_box=entry["boxes"][0]),
+    )
+    return _throughput_result(latencies, peak, specimens_per_image=1)
+
+
+def bench_predict_multi_specimen(manifest, *, warmup=1):
+    from inference.predict import predict_multi_specimen
+
+    root, tag = manifest["root"], manifest["tag"]
+    latencies, peak = _time_over_images(
+        manifest,
+        warmup,
+        lambda entry: predict_multi_specimen(root, tag, entry["image_path"], input_boxes=entry["boxes"]),
+    )
+    return _throughput_result(latencies, peak, specimens_per_image=manifest["specimens_per_image"])
+
+
+def bench_predict_cnn_multi_specimen(manifest, *, warmup=1):
+    from inference.predict import predict_cnn_multi_specimen
+
+    root, tag = manifest["root"], manifest["tag"]
+    latencies, peak = _time_over_images(
+        manifest,
+        warmup,
+        lambda entry: predict_cnn_multi_specimen(root, tag, entry["image_path"], input_boxes=entry["boxes"]),
+    )
+    return _throughput_result(latencies, peak, specimens_per_image=manifest["specimens_per_image"])
+
+
+# ── Per-stage benchmarks ────────────────────────────────────────────────────
+
+def bench_stages(manifest, predictor_type, *, warmup=1):
+    """
+    Time each inference stage separately against one preloaded model context.
+
+    Stages mirror _prepare_specimens_with_context / _finish_specimens_with_context:
+    decode (read + detector downscale), boxes (provided-box normalization),
+    crops (OBB crop standardization), forward (batched model call) and
+    finalize (orientation selection, mapping, clamping).
+    """
+    from inference import predict as P
+
+    root, tag = manifest["root"], manifest["tag"]
+    stage_names = ("decode", "boxes", "crops", "forward", "finalize")
+    stage_latencies = {name: [] for name in stage_names}
+    totals = []
+
+    with PeakRssSampler() as sampler, _quiet_stderr():
+        started = time.perf_counter()
+        ctx = P._load_inference_context(root, tag, predictor_type)
+        load_s = time.perf_counter() - started
+
+        for idx, entry in enumerate(manifest["images"]):
+            marks = [time.perf_counter()]
+            img_original, img_detector, orig_w, orig_h, scale, detector_w, detector_h = (
+                P._load_and_resize_for_inference(entry["image_path"])
+            )
+            marks.append(time.perf_counter())
+            detection_result = P._detect_multi_obb_boxes(
+                entry["image_path"],
+                img_detector,
+                scale,
+                detector_w,
+                detector_h,
+                orientation_policy=ctx["orientation_policy"],
+                input_boxes=entry["boxes"],
+                original_w=orig_w,
+                original_h=orig_h,
+            )
+            marks.append(time.perf_counter())
+            prepared_boxes, batch_crops = P._prepare_obb_batch(
+                img_original,
+                detection_result["boxes"],
+                orientation_policy=ctx["orientation_policy"],
+                target_orientation=ctx["target_orientation"],
+                landmark_template=ctx["landmark_template"],
+            )
+            marks.append(time.perf_counter())
+            batch_predictions = ctx["batch_predict_fn"](batch_crops) if batch_crops else []
+            marks.append(time.perf_counter())
+            P._finalize_obb_batch(
+                boxes=detection_result["boxes"],
+                prepared_boxes=prepared_boxes,
+                batch_predictions=batch_predictions,
+                orig_h=orig_h,
+                orig_w=orig_w,
+                detector_scale=scale,
+                detector_w=detector_w,
+                detector_h=detector_h,
+                orientation_policy=ctx["orientation_policy"],
+                predict_fn=ctx["predict_fn"],
+                target_orientation=ctx["target_orientation"],
+                landmark_template=ctx["landmark_template"],
+                head_landmark_id=ctx["head_landmark_id"],
+                tail_landmark_id=ctx["tail_landmark_id"],
+            )
+            marks.append(time.perf_counter())
+            if idx < warmup:
+                continue
+            for name, start, end in zip(stage_names, marks, marks[1:]):
+                stage_latencies[name].append(end - start)
+            totals.append(marks[-1] - marks[0])
+
+    return _throughput_result(
+        totals,
+        sampler.peak_mb(),
+        predictor_type=predictor_type,
+        model_load_s=round(load_s, 4),
+        stages={name: _latency_summary(values) for name, values in stage_latencies.items()},
+    )
+
+
+# ── Worker benchmark ────────────────────────────────────────────────────────
+
+def _read_worker_result(proc, request_id):
+    """Read worker stdout until the non-progress reply for request_id arrives."""
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("predict worker exited before replying.")
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            continue
+        if msg.get("_request_id") != request_id or msg.get("status") == "progress":
+            continue
+        return msg
+
+
+def bench_worker(manifest, predictor_type, *, warmup=1, worker_args=()):
+    """
+    Drive predict_worker.py the way Electron does: one JSON request per line,
+    waiting for each reply. The first request includes the model load and is
+    reported separately as cold_start_ms.
+    """
+    root, tag = manifest["root"], manifest["tag"]
+    proc = subprocess.Popen(
+        [sys.executable, WORKER_SCRIPT, *worker_args],
+        cwd=_BACKEND_ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=1,
+    )
+    latencies = []
+    cold_start_s = None
+    errors = []
+    try:
+        with PeakRssSampler(pid=proc.pid) as sampler:
+            for idx, entry in enumerate(manifest["images"]):
+                request_id = f"bench-{idx}"
+                request = {
+                    "cmd": "predict",
+                    "_request_id": request_id,
+                    "project_root": root,
+                    "tag": tag,
+                    "predictor_type": predictor_type,
+                    "image_path": entry["image_path"],
+                    "boxes": entry["boxes"],
+                }
+                started = time.perf_counter()
+                proc.stdin.write(json.dumps(request) + "\n")
+                proc.stdin.flush()
+                reply = _read_worker_result(proc, request_id)
+                elapsed = time.perf_counter() - started
+                if not reply.get("ok"):
+                    errors.append(reply.get("error"))
+                if idx == 0:
+                    cold_start_s = elapsed
+                if idx >= warmup:
+                    latencies.append(elapsed)
+            proc.stdin.write(json.dumps({"cmd": "shutdown", "_request_id": "bench-shutdown"}) + "\n")
+            proc.stdin.flush()
+            _read_worker_result(proc, "bench-shutdown")
+    finally:
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    return _throughput_result(
+        latencies,
+        sampler.peak_mb(),
+        predictor_type=predictor_type,
+        worker_args=list(worker_args),
+        cold_start_ms=round(cold_start_s * 1000.0, 3) if cold_start_s is not None else None,
+        errors=errors,
+    )
+
+
+# ── Runner ──────────────────────────────────────────────────────────────────
+
+def _dispatch(name, manifest, warmup):
+    if name == "predict_image":
+        return bench_predict_image(manifest, warmup=warmup)
+    if name == "predict_multi_specimen":
+        return bench_predict_multi_specimen(manifest, warmup=warmup)
+    if name == "predict_cnn_multi_specimen":
+        return bench_predict_cnn_multi_specimen(manifest, warmup=warmup)
+    if name.startswith("stages_"):
+        return bench_stages(manifest, name[len("stages_"):], warmup=warmup)
+    if name.startswith("worker_"):
+        return bench_worker(manifest, name[len("worker_"):], warmup=warmup)
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def run_benchmarks(manifest, names=ALL_BENCHMARKS, *, warmup=1):
+    """Run the named benchmarks; unavailable predictors are reported as skipped."""
+    results = {}
+    for name in names:
+        predictor = manifest["predictors"].get(_REQUIRED_PREDICTOR[name], {})
+        if not predictor.get("available"):
+            results[name] = {"skipped": predictor.get("skip_reason") or "predictor unavailable"}
+            continue
+        print(f"PROGRESS benchmark {name}", file=sys.stderr)
+        try:
+            results[name] = _dispatch(name, manifest, warmup)
+        except Exception as exc:
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+    return results
+
+
+def compare_reports(baseline, current):
+    """Per-benchmark throughput / p95 / RSS deltas between two reports (current vs baseline)."""
+    rows = {}
+    for name, result in current.get("results", {}).items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "images_per_sec" not in base or "images_per_sec" not in result:
+            continue
+        row = {}
+        for key, new, old in (
+            ("images_per_sec", result.get("images_per_sec"), base.get("images_per_sec")),
+            ("p95_ms", result["latency"].get("p95_ms"), base["latency"].get("p95_ms")),
+            ("peak_rss_mb", result.get("peak_rss_mb"), base.get("peak_rss_mb")),
+        ):
+            if new is None or old is None:
+                continue
+            row[key] = {
+                "baseline": old,
+                "current": new,
+                "change_pct": round(100.0 * (new - old) / old, 2) if old else None,
+            }
+        rows[name] = row
+    return {
+        "baseline_commit": baseline.get("git_commit"),
+        "current_commit": current.get("git_commit"),
+        "benchmarks": rows,
+    }
+
+
+def _parse_image_size(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BioVision landmark inference benchmarks")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout).")
+    parser.add_argument("--root", help="Synthetic session directory (default: a temporary directory).")
+    parser.add_argument("--images", type=int, default=8, help="Synthetic images to generate.")
+    parser.add_argument("--image-size", type=_parse_image_size, default=(2400, 1600), help="WIDTHxHEIGHT.")
+    parser.add_argument("--specimens", type=int, default=3, help="Specimens (OBB boxes) per image.")
+    parser.add_argument("--landmarks", type=int, default=5, help="Landmarks per specimen.")
+    parser.add_argument("--warmup", type=int, default=1, help="Leading images excluded from latency stats.")
+    parser.add_argument(
+        "--only",
+        default=",".join(ALL_BENCHMARKS),
+        help=f"Comma-separated subset of: {', '.join(ALL_BENCHMARKS)}.",
+    )
+    parser.add_argument("--compare", help="Baseline JSON report to diff the new results against.")
+    args = parser.parse_args(argv)
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ALL_BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    args.only = names
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    need_dlib = any(_REQUIRED_PREDICTOR[name] == "dlib" for name in args.only)
+    need_cnn = any(_REQUIRED_PREDICTOR[name] == "cnn" for name in args.only)
+
+    with contextlib.ExitStack() as stack:
+        root = args.root or stack.enter_context(tempfile.TemporaryDirectory(prefix="bv_bench_"))
+        print("PROGRESS building synthetic session", file=sys.stderr)
+        started = time.perf_counter()
+        manifest = build_synthetic_session(
+            root,
+            tag=DEFAULT_TAG,
+            num_images=max(args.images, args.warmup + 1),
+            image_size=args.image_size,
+            specimens_per_image=args.specimens,
+            n_landmarks=args.landmarks,
+            with_dlib=need_dlib,
+            with_cnn=need_cnn,
+        )
+        build_s = time.perf_counter() - started
+        results = run_benchmarks(manifest, args.only, warmup=args.warmup)
+
+    report = {
+        "schema_version": BENCH_SCHEMA_VERSION,
+        "git_commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "params": {
+            "images": len(manifest["images"]),
+            "warmup": args.warmup,
+            "image_size": manifest["image_size"],
+            "specimens_per_image": manifest["specimens_per_image"],
+            "n_landmarks": manifest["n_landmarks"],
+        },
+        "session_build_s": round(build_s, 3),
+        "predictors": manifest["predictors"],
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["comparison"] = compare_reports(json.load(f), report)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Synthetic BioVision session for inference benchmarks.
+
+Fabricates a self-contained project root that the predictors can load without
+any real data:
+
+    <root>/session.json                     landmark template + orientation policy
+    <root>/images/synthetic_XXX.jpg         images with OBB-annotated specimens
+    <root>/labels/synthetic_XXX.json        per-image boxes + landmarks
+    <root>/xml/train_<tag>.xml              dlib training XML over 512x512 crops
+    <root>/debug/id_mapping_<tag>.json      dlib index -> landmark ID mapping
+    <root>/models/predictor_<tag>.dat       tiny dlib shape predictor (dlib only)
+    <root>/models/cnn_<tag>.pth (+config)   tiny untrained heatmap CNN (torch only)
+
+Specimens are rotated ellipses with a darker head blob, so the dlib predictor
+has real gradients to fit. Accuracy is irrelevant here; the artifacts exist so
+every stage (decode, crop, forward, mapping) runs at realistic cost.
+"""
+
+import json
+import math
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+import cv2
+import numpy as np
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+from bv_utils.orientation_utils import STANDARD_SIZE
+
+DEFAULT_TAG = "bench"
+DEFAULT_NUM_LANDMARKS = 5
+DEFAULT_CNN_VARIANT = "mobilenet_v3_large"
+
+
+# Landmark positions along the specimen's long axis, as fractions of the
+# half-length (-1 = head tip, +1 = tail tip) and half-width.
+def _landmark_offsets(n_landmarks):
+    offsets = []
+    for i in range(n_landmarks):
+        t = -0.95 + 1.9 * i / max(1, n_landmarks - 1)
+        v = 0.0 if i in (0, n_landmarks - 1) else (0.55 if i % 2 else -0.55)
+        offsets.append((t, v))
+    return offsets
+
+
+def _obb_corners(cx, cy, w, h, angle_deg):
+    rad = math.radians(angle_deg)
+    c, s = math.cos(rad), math.sin(rad)
+    return [
+        [cx + c * x - s * y, cy + s * x + c * y]
+        for x, y in ((-w / 2, -h / 2), (w / 2, -h / 2), (w / 2, h / 2), (-w / 2, h / 2))
+    ]
+
+
+def _draw_specimen(img, cx, cy, length, width, angle_deg, n_landmarks, rng):
+    """Draw one specimen and return its landmark list in image coordinates."""
+    body_color = tuple(int(v) for v in rng.integers(120, 220, size=3))
+    head_color = tuple(int(v * 0.45) for v in body_color)
+    cv2.ellipse(
+        img,
+        (int(round(cx)), int(round(cy))),
+        (int(length / 2), int(width / 2)),
+        angle_deg,
+        0,
+        360,
+        body_color,
+        -1,
+        cv2.LINE_AA,
+    )
+    rad = math.radians(angle_deg)
+    ux, uy = math.cos(rad), math.sin(rad)
+    vx, vy = -uy, ux
+    head_x = cx - ux * length * 0.38
+    head_y = cy - uy * length * 0.38
+    cv2.circle(img, (int(round(head_x)), int(round(head_y))), max(2, int(width * 0.3)), head_color, -1, cv2.LINE_AA)
+
+    landmarks = []
+    for lm_id, (t, v) in enumerate(_landmark_offsets(n_landmarks), start=1):
+        x = cx + ux * t * length / 2 + vx * v * width / 2
+        y = cy + uy * t * length / 2 + vy * v * width / 2
+        landmarks.append({"id": lm_id, "x": round(float(x), 2), "y": round(float(y), 2)})
+    return landmarks
+
+
+def _synthetic_image(width, height, specimens_per_image, n_landmarks, rng):
+    """Render one image; returns (bgr, boxes, specimens)."""
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = 90 + 60 * (xx / max(1, width - 1)) + 30 * (yy / max(1, height - 1))
+    img = np.dstack([base, base * 0.95, base * 0.9])
+    img += rng.normal(0.0, 6.0, size=img.shape)
+    img = np.clip(img, 0, 255).astype(np.uint8)
+
+    boxes = []
+    specimens = []
+    cols = max(1, int(math.ceil(math.sqrt(specimens_per_image))))
+    rows = max(1, int(math.ceil(specimens_per_image / cols)))
+    cell_w, cell_h = width / cols, height / rows
+    for idx in range(specimens_per_image):
+        r, c = divmod(idx, cols)
+        cx = (c + 0.5) * cell_w + rng.uniform(-0.05, 0.05) * cell_w
+        cy = (r + 0.5) * cell_h + rng.uniform(-0.05, 0.05) * cell_h
+        length = 0.7 * min(cell_w, cell_h * 2.0)
+        body_width = length * rng.uniform(0.25, 0.35)
+        angle = float(rng.uniform(-25.0, 25.0))
+        landmarks = _draw_specimen(img, cx, cy, length, body_width, angle, n_landmarks, rng)
+        corners = _obb_corners(cx, cy, length * 1.1, body_width * 1.3, angle)
+        xs = [p[0] for p in corners]
+        ys = [p[1] for p in corners]
+        box = {
+            "left": int(max(0, min(xs))),
+            "top": int(max(0, min(ys))),
+            "right": int(min(width - 1, max(xs))),
+            "bottom": int(min(height - 1, max(ys))),
+            "obbCorners": [[round(x, 2), round(y, 2)] for x, y in corners],
+            "angle": angle,
+            "class_id": 0,
+            "confidence": 1.0,
+        }
+        boxes.append(box)
+        specimens.append({"box": box, "landmarks": landmarks})
+    return img, boxes, specimens
+
+
+def _write_dlib_training_xml(root, tag, n_landmarks, n_crops, rng):
+    """Write 512x512 standardized training crops and the dlib XML that lists them."""
+    xml_dir = os.path.join(root, "xml")
+    crop_dir = os.path.join(root, "corrected_images")
+    os.makedirs(xml_dir, exist_ok=True)
+    os.makedirs(crop_dir, exist_ok=True)
+
+    part_name_width = max(2, len(str(n_landmarks - 1)))
+    xml_root = ET.Element("dataset")
+    ET.SubElement(xml_root, "name").text = f"BioVision synthetic benchmark ({tag})"
+    images = ET.SubElement(xml_root, "images")
+    for i in range(n_crops):
+        crop = np.full((STANDARD_SIZE, STANDARD_SIZE, 3), 110, dtype=np.uint8)
+        crop = np.clip(crop + rng.normal(0.0, 6.0, size=crop.shape), 0, 255).astype(np.uint8)
+        half = STANDARD_SIZE / 2
+        landmarks = _draw_specimen(
+            crop,
+            half + rng.uniform(-8, 8),
+            half + rng.uniform(-8, 8),
+            STANDARD_SIZE * rng.uniform(0.72, 0.8),
+            STANDARD_SIZE * rng.uniform(0.24, 0.3),
+            float(rng.uniform(-4.0, 4.0)),
+            n_landmarks,
+            rng,
+        )
+        crop_path = os.path.join(crop_dir, f"train_{i:03d}.png")
+        cv2.imwrite(crop_path, crop)
+        # Absolute paths, as prepare_dataset.py writes them.
+        img_el = ET.SubElement(images, "image", file=os.path.abspath(crop_path))
+        box_el = ET.SubElement(
+            img_el, "box", top="0", left="0", width=str(STANDARD_SIZE), height=str(STANDARD_SIZE)
+        )
+        for idx, lm in enumerate(landmarks):
+            ET.SubElement(
+                box_el,
+                "part",
+                name=f"{idx:0{part_name_width}d}",
+                x=str(int(lm["x"])),
+                y=str(int(lm["y"])),
+            )
+    xml_path = os.path.join(xml_dir, f"train_{tag}.xml")
+    ET.ElementTree(xml_root).write(xml_path, encoding="utf-8", xml_declaration=True)
+    return xml_path, part_name_width
+
+
+def _train_tiny_dlib_predictor(xml_path, predictor_path):
+    """Train a deliberately small shape predictor. Returns a skip reason or None."""
+    try:
+        import dlib
+    except ImportError:
+        return "dlib is not installed"
+    options = dlib.shape_predictor_training_options()
+    options.tree_depth = 2
+    options.cascade_depth = 4
+    options.num_trees_per_cascade_level = 20
+    options.nu = 0.1
+    options.oversampling_amount = 2
+    options.feature_pool_size = 100
+    options.num_test_splits = 10
+    options.random_seed = "42"
+    options.be_verbose = False
+    dlib.train_shape_predictor(xml_path, predictor_path, options)
+    return None
+
+
+def _save_tiny_cnn(models_dir, tag, n_landmarks, variant):
+    """Save an untrained heatmap-head CNN checkpoint. Returns a skip reason or None."""
+    try:
+        import torch
+        from inference.cnn_model import CNNLandmarkPredictor
+    except ImportError as exc:
+        return f"CNN predictor unavailable: {exc}"
+
+    deconv_layers, deconv_filters, beta = 2, 32, 25.0
+    torch.manual_seed(0)
+    model = CNNLandmarkPredictor(
+        n_landmarks,
+        model_variant=variant,
+        head_type="heatmap_deconv",
+        deconv_layers=deconv_layers,
+        deconv_filters=deconv_filters,
+        softargmax_beta=beta,
+    ).eval()
+    torch.save(model.state_dict(), os.path.join(models_dir, f"cnn_{tag}.pth"))
+    config = {
+        "n_landmarks": n_landmarks,
+        "landmark_ids": list(range(1, n_landmarks + 1)),
+        "model_variant_requested": variant,
+        "model_variant_resolved": model.model_variant,
+        "cnn_head_type": "heatmap_deconv",
+        "cnn_format_version": 2,
+        "cnn_deconv_layers": deconv_layers,
+        "cnn_deconv_filters": deconv_filters,
+        "cnn_softargmax_beta": beta,
+        "synthetic_benchmark": True,
+    }
+    with open(os.path.join(models_dir, f"cnn_{tag}_config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return None
+
+
+def build_synthetic_session(
+    root,
+    *,
+    tag=DEFAULT_TAG,
+    num_images=8,
+    image_size=(2400, 1600),
+    specimens_per_image=3,
+    n_landmarks=DEFAULT_NUM_LANDMARKS,
+    train_crops=16,
+    with_dlib=True,
+    with_cnn=True,
+    cnn_variant=DEFAULT_CNN_VARIANT,
+    seed=0,
+):
+    """
+    Create a synthetic project under `root` and return a manifest dict.
+
+    The manifest lists every image with its provided OBB boxes, plus which
+    predictors are available and why any were skipped, e.g.
+    {"root", "tag", "images": [{"image_path", "boxes"}], "predictors": {...}}.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = int(image_size[0]), int(image_size[1])
+    for sub in ("images", "labels", "models", "debug", "xml"):
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    template = []
+    for lm_id in range(1, n_landmarks + 1):
+        category = "head" if lm_id == 1 else ("tail" if lm_id == n_landmarks else "body")
+        template.append({"index": lm_id, "name": f"L{lm_id}", "category": category})
+    session = {
+        "speciesId": "synthetic_benchmark",
+        "landmarkTemplate": template,
+        "orientationPolicy": {"mode": "directional", "targetOrientation": "left"},
+    }
+    with open(os.path.join(root, "session.json"), "w", encoding="utf-8") as f:
+        json.dump(session, f, indent=2)
+
+    images = []
+    for i in range(num_images):
+        img, boxes, specimens = _synthetic_image(width, height, specimens_per_image, n_landmarks, rng)
+        filename = f"synthetic_{i:03d}.jpg"
+        image_path = os.path.join(root, "images", filename)
+        cv2.imwrite(image_path, img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+        with open(os.path.join(root, "labels", f"synthetic_{i:03d}.json"), "w", encoding="utf-8") as f:
+            json.dump({"imageFilename": filename, "boxes": specimens}, f)
+        images.append({"image_path": image_path, "boxes": boxes})
+
+    xml_path, part_name_width = _write_dlib_training_xml(root, tag, n_landmarks, train_crops, rng)
+    index_to_original = {i: i + 1 for i in range(n_landmarks)}
+    id_mapping = {
+        "dlib_index_to_original": index_to_original,
+        "dlib_name_to_original": {f"{i:0{part_name_width}d}": i + 1 for i in range(n_landmarks)},
+        "original_ids": list(range(1, n_landmarks + 1)),
+        "num_landmarks": n_landmarks,
+        "standard_size": STANDARD_SIZE,
+        "part_name_width": part_name_width,
+        "landmark_template": {str(lm["index"]): lm for lm in template},
+        "training_config": {
+            "target_orientation": "left",
+            "orientation_mode": "directional",
+            "head_landmark_id": 1,
+            "tail_landmark_id": n_landmarks,
+        },
+    }
+    with open(os.path.join(root, "debug", f"id_mapping_{tag}.json"), "w", encoding="utf-8") as f:
+        json.dump(id_mapping, f, indent=2)
+
+    predictors = {}
+    models_dir = os.path.join(root, "models")
+    skip = (
+        _train_tiny_dlib_predictor(xml_path, os.path.join(models_dir, f"predictor_{tag}.dat"))
+        if with_dlib else "disabled"
+    )
+    predictors["dlib"] = {"available": skip is None, "skip_reason": skip}
+    skip = _save_tiny_cnn(models_dir, tag, n_landmarks, cnn_variant) if with_cnn else "disabled"
+    predictors["cnn"] = {"available": skip is None, "skip_reason": skip}
+
+    return {
+        "root": root,
+        "tag": tag,
+        "image_size": [width, height],
+        "specimens_per_image": specimens_per_image,
+        "n_landmarks": n_landmarks,
+        "images": images,
+        "predictors": predictors,
+    }
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+
+import cv2
+
+from backend.benchmarks.bench_inference import compare_reports
+from backend.benchmarks.synthetic_session import build_synthetic_session
+
+
+class SyntheticSessionTests(unittest.TestCase):
+    def test_builds_loadable_session_without_models(self):
+        with tempfile.TemporaryDirectory() as root:
+            manifest = build_synthetic_session(
+                root,
+                num_images=2,
+                image_size=(640, 480),
+                specimens_per_image=3,
+                train_crops=2,
+                with_dlib=False,
+                with_cnn=False,
+            )
+            self.assertEqual(len(manifest["images"]), 2)
+            self.assertEqual(manifest["predictors"]["dlib"], {"available": False, "skip_reason": "disabled"})
+            for entry in manifest["images"]:
+                img = cv2.imread(entry["image_path"])
+                self.assertEqual(img.shape[:2], (480, 640))
+                self.assertEqual(len(entry["boxes"]), 3)
+                for box in entry["boxes"]:
+                    self.assertEqual(len(box["obbCorners"]), 4)
+            with open(os.path.join(root, "session.json"), encoding="utf-8") as f:
+                session = json.load(f)
+            self.assertEqual(len(session["landmarkTemplate"]), manifest["n_landmarks"])
+            self.assertTrue(os.path.exists(os.path.join(root, "xml", "train_bench.xml")))
+
+
+class CompareReportsTests(unittest.TestCase):
+    def test_reports_relative_change_and_ignores_skipped(self):
+        def report(commit, ips, p95):
+            return {
+                "git_commit": commit,
+                "results": {
+                    "stages_cnn": {"images_per_sec": ips, "latency": {"p95_ms": p95}, "peak_rss_mb": 100.0},
+                    "worker_dlib": {"skipped": "dlib is not installed"},
+                },
+            }
+
+        comparison = compare_reports(report("a", 10.0, 200.0), report("b", 12.0, 150.0))
+        self.assertEqual(comparison["baseline_commit"], "a")
+        self.assertEqual(list(comparison["benchmarks"]), ["stages_cnn"])
+        row = comparison["benchmarks"]["stages_cnn"]
+        self.assertEqual(row["images_per_sec"]["change_pct"], 20.0)
+        self.assertEqual(row["p95_ms"]["change_pct"], -25.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -59,6 +59,130 @@ def append_json_array(path: str, row: Any, max_entries: int | None = None) -> st
     return path
 
 
+# Prediction logs are append-only JSON Lines. When the active file would grow
+# past PREDICTION_LOG_MAX_BYTES it is rotated to <path>.1 (older rotations
+# shift to .2 ... .PREDICTION_LOG_BACKUPS and the oldest is dropped).
+PREDICTION_LOG_MAX_BYTES = 8 * 1024 * 1024
+PREDICTION_LOG_BACKUPS = 2
+# Entries returned by read_prediction_log(), matching the old JSON-array cap.
+PREDICTION_LOG_MAX_ENTRIES = 2000
+
+
+def _rotated_log_paths(path: str, backups: int) -> list[str]:
+    """Existing rotations of a JSONL log, oldest first."""
+    return [f"{path}.{idx}" for idx in range(int(backups), 0, -1) if os.path.exists(f"{path}.{idx}")]
+
+
+def _rotate_log(path: str, backups: int) -> None:
+    if backups <= 0:
+        os.remove(path)
+        return
+    oldest = f"{path}.{backups}"
+    if os.path.exists(oldest):
+        os.remove(oldest)
+    for idx in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{idx}"):
+            os.replace(f"{path}.{idx}", f"{path}.{idx + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def append_jsonl(
+    path: str,
+    row: Any,
+    max_bytes: int | None = None,
+    backups: int = PREDICTION_LOG_BACKUPS,
+) -> str:
+    """Append one JSON line; rotate first when max_bytes is set and would be exceeded."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = (json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+    if max_bytes:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > int(max_bytes):
+            _rotate_log(path, int(backups))
+    # One write on an O_APPEND handle: concurrent writers never interleave lines.
+    with open(path, "ab") as f:
+        f.write(data)
+    return path
+
+
+def read_jsonl(
+    path: str,
+    max_entries: int | None = None,
+    backups: int = PREDICTION_LOG_BACKUPS,
+) -> list[Any]:
+    """Rows of a JSONL log and its rotations, oldest first (last max_entries if set)."""
+    rows: list[Any] = []
+    for part in _rotated_log_paths(path, backups) + [path]:
+        try:
+            with open(part, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        # A line cut off by a crash mid-write.
+                        continue
+        except OSError:
+            continue
+    if max_entries and len(rows) > int(max_entries):
+        rows = rows[-int(max_entries):]
+    return rows
+
+
+def migrate_json_array_log(json_path: str, jsonl_path: str) -> bool:
+    """
+    One-time conversion of a legacy JSON-array log into jsonl_path.
+
+    The array entries are placed before any lines already in jsonl_path and the
+    old file is kept as <json_path>.bak. Returns True when a file was migrated.
+    """
+    if not os.path.exists(json_path):
+        return False
+    data = read_json(json_path, default=None)
+    if not isinstance(data, list):
+        data = []
+    tmp_path = f"{jsonl_path}.migrate.tmp"
+    os.makedirs(os.path.dirname(jsonl_path), exist_ok=True)
+    with open(tmp_path, "wb") as out:
+        for row in data:
+            out.write((json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+        if os.path.exists(jsonl_path):
+            with open(jsonl_path, "rb") as existing:
+                shutil.copyfileobj(existing, out)
+    os.replace(tmp_path, jsonl_path)
+    os.replace(json_path, f"{json_path}.bak")
+    return True
+
+
+def _legacy_json_log_path(jsonl_path: str) -> str:
+    return f"{os.path.splitext(jsonl_path)[0]}.json"
+
+
+def append_prediction_log(
+    jsonl_path: str,
+    log_entry: Any,
+    max_bytes: int = PREDICTION_LOG_MAX_BYTES,
+    backups: int = PREDICTION_LOG_BACKUPS,
+) -> str:
+    migrate_json_array_log(_legacy_json_log_path(jsonl_path), jsonl_path)
+    return append_jsonl(jsonl_path, log_entry, max_bytes=max_bytes, backups=backups)
+
+
+def read_prediction_log(
+    jsonl_path: str,
+    max_entries: int | None = PREDICTION_LOG_MAX_ENTRIES,
+    backups: int = PREDICTION_LOG_BACKUPS,
+) -> list[Any]:
+    """List view of a prediction log (migrating a legacy .json array next to it first)."""
+    migrate_json_array_log(_legacy_json_log_path(jsonl_path), jsonl_path)
+    return read_jsonl(jsonl_path, max_entries=max_entries, backups=backups)
+
+
 def get_model_tag_dir(project_root: str, model_type: str, tag: str) -> str:
     model_key = _sanitize_name(model_type)
     tag_key = _sanitize_name(tag)
@@ -126,9 +250,9 @@ def append_model_prediction_log(
     model_type: str,
     tag: str,
     log_entry: Any,
-    max_entries: int = 2000,
+    max_bytes: int = PREDICTION_LOG_MAX_BYTES,
+    backups: int = PREDICTION_LOG_BACKUPS,
 ) -> str:
     tag_dir = get_model_tag_dir(project_root, model_type, tag)
-    log_path = os.path.join(tag_dir, "prediction_log.json")
-    append_json_array(log_path, log_entry, max_entries=max_entries)
-    return log_path
+    log_path = os.path.join(tag_dir, "prediction_log.jsonl")
+    return append_prediction_log(log_path, log_entry, max_bytes=max_bytes, backups=backups)
@@ -6,7 +6,6 @@ import numpy as np
 
 try:
     from PIL import Image
-    from PIL.ExifTags import TAGS
     HAS_PIL = True
 except ImportError:
     HAS_PIL = False
@@ -57,52 +56,111 @@ def load_image(image_path):
         return img, w, h
 
 
-def _load_with_pil_exif(image_path):
-    """Load with PIL for EXIF handling, convert to OpenCV format."""
+# EXIF orientations 5-8 swap width and height.
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+_EXIF_ORIENTATION_TAG = 0x0112
+
+# PIL modes whose pixels go straight to BGR with one cvtColor; everything else
+# (palette, CMYK, 16-bit, ...) is converted to RGB by PIL first.
+_BGR_CONVERSIONS = {
+    'RGB': cv2.COLOR_RGB2BGR,
+    'RGBA': cv2.COLOR_RGBA2BGR,
+    'L': cv2.COLOR_GRAY2BGR,
+}
+# Formats load_image() hands to cv2.imdecode (PIL only reads the header).
+_CV2_DECODED_FORMATS = ('JPEG', 'MPO')
+
+
+def _exif_orientation(pil_img):
+    """EXIF orientation tag of an opened PIL image (1 when absent)."""
+    # Only formats PIL exposes EXIF for as a whole (JPEG, PNG, WebP) are honored.
+    if not hasattr(pil_img, '_getexif'):
+        return 1
     try:
-        pil_img = Image.open(image_path)
+        orientation = int(pil_img.getexif().get(_EXIF_ORIENTATION_TAG, 1) or 1)
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError, SyntaxError, OSError):
+        # No EXIF data or orientation tag
+        return 1
+    return orientation if 1 <= orientation <= 8 else 1
 
-        # Check for EXIF orientation
-        try:
-            exif = pil_img._getexif()
-            if exif:
-                # Find the orientation tag
-                orientation_key = None
-                for tag_id, tag_name in TAGS.items():
-                    if tag_name == 'Orientation':
-                        orientation_key = tag_id
-                        break
-
-                if orientation_key and orientation_key in exif:
-                    orientation = exif[orientation_key]
-
-                    # Apply rotation/flip based on EXIF orientation
-                    if orientation == 2:
-                        pil_img = pil_img.transpose(Image.FLIP_LEFT_RIGHT)
-                    elif orientation == 3:
-                        pil_img = pil_img.rotate(180, expand=True)
-                    elif orientation == 4:
-                        pil_img = pil_img.transpose(Image.FLIP_TOP_BOTTOM)
-                    elif orientation == 5:
-                        pil_img = pil_img.rotate(-90, expand=True).transpose(Image.FLIP_LEFT_RIGHT)
-                    elif orientation == 6:
-                        pil_img = pil_img.rotate(-90, expand=True)
-                    elif orientation == 7:
-                        pil_img = pil_img.rotate(90, expand=True).transpose(Image.FLIP_LEFT_RIGHT)
-                    elif orientation == 8:
-                        pil_img = pil_img.rotate(90, expand=True)
-        except (AttributeError, KeyError, IndexError):
-            # No EXIF data or orientation tag
-            pass
 
-        # Convert to RGB if necessary (handles grayscale, RGBA, etc.)
-        if pil_img.mode != 'RGB':
-            pil_img = pil_img.convert('RGB')
+def _apply_exif_orientation(img, orientation):
+    """
+    Rotate/flip a decoded array into EXIF orientation 1.
+
+    Flips (2-4) are done in place on writable arrays; the transposing
+    orientations (5-8) need one new buffer, produced directly by cv2.
+    """
+    if orientation in (2, 3, 4):
+        flip_code = {2: 1, 3: -1, 4: 0}[orientation]
+        if img.flags.writeable:
+            return cv2.flip(img, flip_code, dst=img)
+        return cv2.flip(img, flip_code)
+    if orientation == 5:
+        return cv2.transpose(img)
+    if orientation == 6:
+        return cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7:
+        img = cv2.transpose(img)
+        return cv2.flip(img, -1, dst=img)
+    if orientation == 8:
+        return cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return img
+
 
-        # Convert PIL image to OpenCV format (BGR)
-        img_array = np.array(pil_img)
-        img = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+def _pil_to_bgr(pil_img, orientation=1):
+    """
+    Oriented OpenCV (BGR) array from a PIL image; closes pil_img.
+
+    PIL's own buffer is released as soon as the pixels are copied out, and
+    orientation plus the RGB->BGR swap share one new buffer (in place where
+    possible) instead of a PIL copy per step.
+    """
+    code = _BGR_CONVERSIONS.get(pil_img.mode)
+    if code is None:
+        converted = pil_img.convert('RGB')
+        pil_img.close()
+        pil_img, code = converted, cv2.COLOR_RGB2BGR
+    pixels = np.asarray(pil_img)  # read-only view over a bytes copy
+    pil_img.close()
+
+    if orientation in _TRANSPOSED_ORIENTATIONS and code == cv2.COLOR_RGB2BGR:
+        # Transpose first (new writable buffer), then swap channels in place.
+        img = _apply_exif_orientation(pixels, orientation)
+        return cv2.cvtColor(img, code, dst=img)
+    img = cv2.cvtColor(pixels, code)
+    del pixels
+    return _apply_exif_orientation(img, orientation)
+
+
+def _imdecode_unoriented(image_path, expected_size):
+    """BGR decode by OpenCV with EXIF ignored; None unless it matches PIL's (w, h)."""
+    try:
+        with open(image_path, 'rb') as f:
+            buf = np.frombuffer(f.read(), dtype=np.uint8)
+        img = cv2.imdecode(buf, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+    except Exception:
+        return None
+    if img is None or (img.shape[1], img.shape[0]) != tuple(expected_size):
+        return None
+    return img
 
+
+def _load_with_pil_exif(image_path):
+    """Load with PIL for EXIF handling, convert to OpenCV format."""
+    try:
+        pil_img = Image.open(image_path)
+        orientation = _exif_orientation(pil_img)
+        img = None
+        if pil_img.format in _CV2_DECODED_FORMATS and pil_img.mode in ('RGB', 'L'):
+            # Same libjpeg decode as PIL, but straight into one BGR buffer.
+            img = _imdecode_unoriented(image_path, pil_img.size)
+        if img is None:
+            pil_img.load()
+            img = _pil_to_bgr(pil_img, orientation)
+        else:
+            pil_img.close()
+            img = _apply_exif_orientation(img, orientation)
         h, w = img.shape[:2]
         return img, w, h
 
@@ -127,6 +185,106 @@ def get_image_dimensions(image_path):
     return w, h
 
 
+class LazyImage:
+    """
+    One source image opened for detect-then-crop work at two resolutions.
+
+    Opening reads only the header (size and EXIF orientation); pixels are
+    decoded on first use and kept until release():
+
+        detector_image()  long side downscaled to at most max_dim. JPEGs are
+                          decoded directly at 1/2, 1/4 or 1/8 scale (DCT
+                          scaling through PIL's draft mode) and finished with
+                          an INTER_AREA resize, so the full-resolution pixels
+                          are never materialized just to be thrown away.
+        full_image()      EXIF-corrected full-resolution image, as load_image().
+                          Only callers that cut full-resolution crops need it.
+
+    width/height are the EXIF-corrected full-resolution dimensions; scale,
+    detector_width and detector_height follow the same long-side rule as a
+    plain cv2.resize to max_dim (int(width * scale)). A file whose header cannot
+    be read is decoded eagerly; width/height are 0 when that fails too.
+    """
+
+    def __init__(self, image_path, max_dim=1500):
+        self.path = image_path
+        self.max_dim = int(max_dim)
+        self._orientation = 1
+        self._raw_size = None
+        self._full = None
+        self._detector = None
+        self.width, self.height = self._read_header()
+        self.scale = 1.0
+        self.detector_width, self.detector_height = self.width, self.height
+        if self.width > 0 and self.height > 0 and max(self.width, self.height) > self.max_dim:
+            self.scale = self.max_dim / max(self.width, self.height)
+            self.detector_width = int(self.width * self.scale)
+            self.detector_height = int(self.height * self.scale)
+
+    def _read_header(self):
+        if HAS_PIL:
+            try:
+                with Image.open(self.path) as pil_img:
+                    self._orientation = _exif_orientation(pil_img)
+                    self._raw_size = tuple(pil_img.size)
+                w, h = self._raw_size
+                if self._orientation in _TRANSPOSED_ORIENTATIONS:
+                    w, h = h, w
+                return int(w), int(h)
+            except Exception:
+                pass
+        img = self.full_image()
+        if img is None:
+            return 0, 0
+        h, w = img.shape[:2]
+        return int(w), int(h)
+
+    def full_image(self):
+        if self._full is None:
+            self._full, _, _ = load_image(self.path)
+        return self._full
+
+    def detector_image(self):
+        if self._detector is None:
+            if self.scale == 1.0:
+                self._detector = self.full_image()
+                return self._detector
+            if self._full is None:
+                self._detector = self._decode_reduced()
+            if self._detector is None:
+                full = self.full_image()
+                if full is None:
+                    return None
+                self._detector = cv2.resize(
+                    full,
+                    (self.detector_width, self.detector_height),
+                    interpolation=cv2.INTER_AREA,
+                )
+        return self._detector
+
+    def _decode_reduced(self):
+        """Detector-size image from a reduced-resolution decode, or None if the format has none."""
+        if not HAS_PIL or self._raw_size is None:
+            return None
+        target = (self.detector_width, self.detector_height)
+        if self._orientation in _TRANSPOSED_ORIENTATIONS:
+            target = target[::-1]
+        try:
+            with Image.open(self.path) as pil_img:
+                pil_img.draft(None, target)  # no-op for anything but JPEG
+                if tuple(pil_img.size) == self._raw_size:
+                    return None
+                img = _pil_to_bgr(pil_img, self._orientation)
+        except Exception:
+            return None
+        return cv2.resize(img, (self.detector_width, self.detector_height), interpolation=cv2.INTER_AREA)
+
+    def release(self):
+        """Drop the decoded pixels; the next access decodes again."""
+        self._full = None
+        self._detector = None
+
+
 if __name__ == "__main__":
     import sys
     import json
@@ -1545,7 +1545,51 @@ def select_orientation(
     Evaluate normal/flipped candidates and choose orientation with the same policy
     used in predict.py.
     """
-    lms_a = predict_fn(crop_512) or []
+    return select_orientation_from_candidates(
+        predict_fn(crop_512) or [],
+        lambda: predict_fn(cv2.flip(crop_512, 1)),
+        target_orientation=target_orientation,
+        landmark_template=landmark_template,
+        head_id=head_id,
+        tail_id=tail_id,
+        orientation_hint_original=orientation_hint_original,
+        template_margin=template_margin,
+        template_gain_ratio=template_gain_ratio,
+        primary_bad_score=primary_bad_score,
+    )
+
+
+def select_orientation_requires_flipped(
+    *,
+    target_orientation: str | None = None,
+    landmark_template: Mapping[int | str, Mapping[str, float]] | None = None,
+    orientation_hint_original: str | None = None,
+) -> bool:
+    """Return True when select_orientation would evaluate the flipped candidate."""
+    return bool(target_orientation or landmark_template or orientation_hint_original)
+
+
+def select_orientation_from_candidates(
+    lms_a: Sequence[Mapping[str, Any]] | None,
+    predict_flipped: Callable[[], list[dict[str, Any]] | None],
+    *,
+    target_orientation: str | None = None,
+    landmark_template: Mapping[int | str, Mapping[str, float]] | None = None,
+    head_id: int | None = None,
+    tail_id: int | None = None,
+    orientation_hint_original: str | None = None,
+    template_margin: float = 0.5,
+    template_gain_ratio: float = 0.20,
+    primary_bad_score: float = 1.8,
+) -> tuple[list[dict[str, Any]], bool, dict[str, Any]]:
+    """
+    Orientation selection on already-decoded candidates.
+
+    lms_a is the prediction on the unflipped crop. predict_flipped is only called
+    when the flipped candidate is actually needed, so batched callers can hand in
+    a precomputed result while select_orientation keeps its lazy second forward.
+    """
+    lms_a = list(lms_a or [])
     if not lms_a:
         return [], False, {
             "used_flipped_crop": False,
@@ -1557,7 +1601,11 @@ def select_orientation(
 
     score_a = score_landmarks_against_template(lms_a, landmark_template)
     ori_a = detect_orientation(lms_a, head_id=head_id, tail_id=tail_id)
-    need_flipped = bool(target_orientation or landmark_template or orientation_hint_original)
+    need_flipped = select_orientation_requires_flipped(
+        target_orientation=target_orientation,
+        landmark_template=landmark_template,
+        orientation_hint_original=orientation_hint_original,
+    )
     if not need_flipped:
         return lms_a, False, {
             "candidate_a_orientation": ori_a,
@@ -1573,7 +1621,7 @@ def select_orientation(
             "target_orientation": target_orientation,
         }
 
-    lms_b = predict_fn(cv2.flip(crop_512, 1)) or []
+    lms_b = predict_flipped() or []
     if not lms_b:
         return lms_a, False, {
             "candidate_a_orientation": ori_a,
@@ -1680,6 +1728,127 @@ def select_orientation(
     }
 
 
+def _point_mapping_params(metadata: Mapping[str, Any], was_flipped: bool) -> dict[str, Any]:
+    sx = float(metadata.get("scale_x", metadata.get("scale", 1.0))) or 1.0
+    sy = float(metadata.get("scale_y", metadata.get("scale", 1.0))) or 1.0
+    ox, oy = metadata["crop_origin"]
+    angle = float(metadata.get("rotation", 0.0))
+    pad_left, pad_top, _pad_right, _pad_bottom = _get_standardized_padding(
+        metadata,
+        sx=sx,
+        sy=sy,
+    )
+    canonical_flip_applied = bool(metadata.get("canonical_flip_applied", False))
+    affine_M_raw = metadata.get("affine_M")
+    use_exact_affine = bool(metadata.get("obb_deskewed")) and affine_M_raw is not None
+    if use_exact_affine:
+        # Exact inverse of the warpAffine used during extraction.
+        M_inv = cv2.invertAffineTransform(np.array(affine_M_raw, dtype=np.float64))
+    else:
+        M_inv = np.zeros((2, 3), dtype=np.float64)
+    angle_rad = np.radians(-angle)
+    return {
+        "sx": sx,
+        "sy": sy,
+        "ox": float(ox),
+        "oy": float(oy),
+        "pad_left": pad_left,
+        "pad_top": pad_top,
+        "effective_flip": bool(was_flipped) ^ canonical_flip_applied,
+        "rotated_180": bool(metadata.get("rotated_180", False)),
+        "exact": use_exact_affine,
+        "M_inv": M_inv,
+        "rotate": abs(angle) > 1e-9,
+        "cos_a": float(np.cos(angle_rad)),
+        "sin_a": float(np.sin(angle_rad)),
+    }
+
+
+def map_points_to_original(
+    points_512: np.ndarray,
+    metadata: Mapping[str, Any] | Sequence[Mapping[str, Any]],
+    *,
+    was_flipped: bool | Sequence[bool] = False,
+    image_scale: float = 1.0,
+    image_shape: tuple[int, int] | None = None,
+) -> np.ndarray:
+    """
+    Array form of map_to_original() (same transform chain, no rounding).
+
+    points_512 is (N, 2) for one specimen with a single metadata mapping, or
+    (S, N, 2) for S specimens with a sequence of S metadata mappings (and
+    optionally one was_flipped flag per specimen). Every step is applied
+    element-wise in the same order as the scalar path, so results match
+    map_to_original() exactly before its 0.1 px rounding.
+    Returns a float64 array with the shape of points_512.
+    """
+    pts = np.asarray(points_512, dtype=np.float64)
+    single = pts.ndim == 2
+    if single:
+        pts = pts[None]
+        metadatas = [metadata]
+        flips = [bool(was_flipped)]
+    else:
+        metadatas = list(metadata)
+        if isinstance(was_flipped, (bool, np.bool_)):
+            flips = [bool(was_flipped)] * len(metadatas)
+        else:
+            flips = [bool(flag) for flag in was_flipped]
+    if pts.ndim != 3 or pts.shape[-1] != 2 or len(metadatas) != pts.shape[0] or len(flips) != pts.shape[0]:
+        raise ValueError("points_512 must be (N, 2) or (S, N, 2) with one metadata per specimen")
+    if pts.size == 0:
+        return pts[0] if single else pts
+
+    params = [_point_mapping_params(meta, flag) for meta, flag in zip(metadatas, flips)]
+
+    def column(name: str, dtype: Any = np.float64) -> np.ndarray:
+        return np.array([p[name] for p in params], dtype=dtype)[:, None]
+
+    max_s = float(STANDARD_SIZE - 1)
+    x = np.clip(pts[..., 0], 0.0, max_s)
+    y = np.clip(pts[..., 1], 0.0, max_s)
+
+    flip = column("effective_flip", bool)
+    x = np.where(flip, np.clip(max_s - x, 0.0, max_s), x)
+    rot180 = column("rotated_180", bool)
+    x = np.where(rot180, np.clip(max_s - x, 0.0, max_s), x)
+    y = np.where(rot180, np.clip(max_s - y, 0.0, max_s), y)
+
+    # Legacy (non-OBB) crops un-rotate in STANDARD_SIZE space around the center.
+    exact = column("exact", bool)
+    legacy_rotate = (~exact) & column("rotate", bool)
+    if legacy_rotate.any():
+        c = STANDARD_SIZE / 2.0
+        cos_a = column("cos_a")
+        sin_a = column("sin_a")
+        x_u = c + (x - c) * cos_a - (y - c) * sin_a
+        y_u = c + (x - c) * sin_a + (y - c) * cos_a
+        x = np.where(legacy_rotate, x_u, x)
+        y = np.where(legacy_rotate, y_u, y)
+
+    # Un-resize to crop space, then offset by the crop origin.
+    x = (x - column("pad_left")) / column("sx") + column("ox")
+    y = (y - column("pad_top")) / column("sy") + column("oy")
+
+    if exact.any():
+        M_inv = np.stack([p["M_inv"] for p in params])
+        x_orig = M_inv[:, 0, 0, None] * x + M_inv[:, 0, 1, None] * y + M_inv[:, 0, 2, None]
+        y_orig = M_inv[:, 1, 0, None] * x + M_inv[:, 1, 1, None] * y + M_inv[:, 1, 2, None]
+        x = np.where(exact, x_orig, x)
+        y = np.where(exact, y_orig, y)
+
+    if image_scale and image_scale != 1.0:
+        x = x / float(image_scale)
+        y = y / float(image_scale)
+
+    if image_shape is not None:
+        x = np.clip(x, 0.0, float(image_shape[1] - 1))
+        y = np.clip(y, 0.0, float(image_shape[0] - 1))
+
+    out = np.stack([x, y], axis=-1)
+    return out[0] if single else out
+
+
 def map_to_original(
     landmarks_512: Sequence[Mapping[str, Any]],
     metadata: Mapping[str, Any],
@@ -1711,112 +1880,26 @@ def map_to_original(
         4) offset by crop origin
         5) un-scale to original image size
         6) optional bounds clamp
+
+    Thin wrapper over map_points_to_original(); coordinates are rounded to 0.1 px.
     """
-    sx = float(metadata.get("scale_x", metadata.get("scale", 1.0))) or 1.0
-    sy = float(metadata.get("scale_y", metadata.get("scale", 1.0))) or 1.0
-    ox, oy = metadata["crop_origin"]
-    angle = float(metadata.get("rotation", 0.0))
-    pad_left, pad_top, _pad_right, _pad_bottom = _get_standardized_padding(
+    if not landmarks_512:
+        return []
+    points = np.array(
+        [[float(lm["x"]), float(lm["y"])] for lm in landmarks_512],
+        dtype=np.float64,
+    )
+    mapped = map_points_to_original(
+        points,
         metadata,
-        sx=sx,
-        sy=sy,
+        was_flipped=was_flipped,
+        image_scale=image_scale,
+        image_shape=image_shape,
     )
-
-    img_h = image_shape[0] if image_shape is not None else None
-    img_w = image_shape[1] if image_shape is not None else None
-
-    mapped: list[dict[str, Any]] = []
-    canonical_flip_applied = bool(metadata.get("canonical_flip_applied", False))
-    effective_flip = bool(was_flipped) ^ canonical_flip_applied
-    rotated_180 = bool(metadata.get("rotated_180", False))
-
-    # Use exact inverse affine when available (OBB-deskewed crops).
-    affine_M_raw = metadata.get("affine_M")
-    use_exact_affine = bool(metadata.get("obb_deskewed")) and affine_M_raw is not None
-
-    if use_exact_affine:
-        M = np.array(affine_M_raw, dtype=np.float64)
-        M_inv = cv2.invertAffineTransform(M)  # exact inverse of the warpAffine used during extraction
-
-        for lm in landmarks_512:
-            x_s = max(0.0, min(float(STANDARD_SIZE - 1), float(lm["x"])))
-            y_s = max(0.0, min(float(STANDARD_SIZE - 1), float(lm["y"])))
-
-            if effective_flip:
-                x_s = _mirror_x(x_s, STANDARD_SIZE)
-            if rotated_180:
-                x_s = _mirror_x(x_s, STANDARD_SIZE)
-                y_s = _mirror_y(y_s, STANDARD_SIZE)
-
-            # Un-resize: 512 → crop space
-            x_crop = (x_s - pad_left) / sx
-            y_crop = (y_s - pad_top) / sy
-
-            # Offset to rotated-image space
-            x_rot = x_crop + float(ox)
-            y_rot = y_crop + float(oy)
-
-            # Un-rotate using exact inverse affine
-            x_orig = M_inv[0, 0] * x_rot + M_inv[0, 1] * y_rot + M_inv[0, 2]
-            y_orig = M_inv[1, 0] * x_rot + M_inv[1, 1] * y_rot + M_inv[1, 2]
-
-            if image_scale and image_scale != 1.0:
-                x_orig = x_orig / float(image_scale)
-                y_orig = y_orig / float(image_scale)
-
-            if img_w is not None and img_h is not None:
-                x_orig = max(0.0, min(float(img_w - 1), x_orig))
-                y_orig = max(0.0, min(float(img_h - 1), y_orig))
-
-            mapped.append({
-                "id": int(lm["id"]),
-                "x": round(x_orig, 1),
-                "y": round(y_orig, 1),
-            })
-        return mapped
-
-    # Fallback: center-based rotation in 512-space (non-OBB or legacy crops).
-    angle_rad = np.radians(-angle)
-    cos_a = float(np.cos(angle_rad))
-    sin_a = float(np.sin(angle_rad))
-    cx_s = STANDARD_SIZE / 2.0
-    cy_s = STANDARD_SIZE / 2.0
-
-    for lm in landmarks_512:
-        x_s = max(0.0, min(float(STANDARD_SIZE - 1), float(lm["x"])))
-        y_s = max(0.0, min(float(STANDARD_SIZE - 1), float(lm["y"])))
-
-        if effective_flip:
-            x_s = _mirror_x(x_s, STANDARD_SIZE)
-        if rotated_180:
-            x_s = _mirror_x(x_s, STANDARD_SIZE)
-            y_s = _mirror_y(y_s, STANDARD_SIZE)
-
-        if abs(angle) > 1e-9:
-            x_u = cx_s + (x_s - cx_s) * cos_a - (y_s - cy_s) * sin_a
-            y_u = cy_s + (x_s - cx_s) * sin_a + (y_s - cy_s) * cos_a
-        else:
-            x_u, y_u = x_s, y_s
-
-        x_crop = (x_u - pad_left) / sx
-        y_crop = (y_u - pad_top) / sy
-        x_orig = x_crop + float(ox)
-        y_orig = y_crop + float(oy)
-
-        if image_scale and image_scale != 1.0:
-            x_orig = x_orig / float(image_scale)
-            y_orig = y_orig / float(image_scale)
-
-        if img_w is not None and img_h is not None:
-            x_orig = max(0.0, min(float(img_w - 1), x_orig))
-            y_orig = max(0.0, min(float(img_h - 1), y_orig))
-
-        mapped.append({
-            "id": int(lm["id"]),
-            "x": round(x_orig, 1),
-            "y": round(y_orig, 1),
-        })
-    return mapped
+    return [
+        {"id": int(lm["id"]), "x": round(float(x), 1), "y": round(float(y), 1)}
+        for lm, (x, y) in zip(landmarks_512, mapped.tolist())
+    ]
 
 
 # ===========================================================================
@@ -1889,12 +1972,146 @@ def _letterbox_to_square(
         "resized_height": int(resized_h),
     }
 
+# ---------------------------------------------------------------------------
+# Crop-local leveling warp
+# ---------------------------------------------------------------------------
+# cv2.warpAffine derives each source coordinate from the *absolute* destination
+# pixel, so warping only the crop window with a translated matrix rounds
+# differently and drifts from the full-image warp by ±1 intensity level. Instead,
+# the exact source maps warpAffine would build for the crop window are
+# reproduced here and handed to cv2.remap (which is what warpAffine does
+# internally), touching only crop-sized buffers. Two map conventions exist:
+#   "fixed"     – 10-bit fixed-point coordinates (OpenCV <= 4.10).
+#   "float:<n>" – float32 FMA coordinates with a scalar tail after the last
+#                 n-pixel SIMD block of each row (OpenCV >= 4.11 kernels).
+# The convention is chosen once per (dtype, channels) by probing against a real
+# full-image warpAffine; if none matches bit-for-bit, extraction falls back to
+# the full-image warp so crops never silently change.
+
+_CROP_LOCAL_CANDIDATES = ("fixed", "float:16", "float:8", "float:32", "float:64", "float:4")
+_CROP_LOCAL_MODES: dict[tuple[str, int], str | None] = {}
+
+
+def _warp_affine_inverse(M: np.ndarray) -> tuple[float, ...]:
+    """Inverse of a 2x3 affine computed exactly as cv2.warpAffine does (float64)."""
+    m0, m1, m2 = (float(v) for v in M[0])
+    m3, m4, m5 = (float(v) for v in M[1])
+    det = m0 * m4 - m1 * m3
+    det = 1.0 / det if det != 0 else 0.0
+    a11, a22 = m4 * det, m0 * det
+    a12, a21 = -m1 * det, -m3 * det
+    b1 = -a11 * m2 - a12 * m5
+    b2 = -a21 * m2 - a22 * m5
+    return a11, a12, b1, a21, a22, b2
+
+
+def _crop_local_maps_fixed(M, x1, y1, x2, y2):
+    a11, a12, b1, a21, a22, b2 = _warp_affine_inverse(M)
+    xs = np.arange(x1, x2, dtype=np.float64)
+    ys = np.arange(y1, y2, dtype=np.float64)
+    # AB_BITS=10 fixed point, INTER_BITS=5 sub-pixel table, round_delta=16.
+    adelta = np.rint(a11 * xs * 1024.0).astype(np.int64)
+    bdelta = np.rint(a21 * xs * 1024.0).astype(np.int64)
+    x0 = np.rint((a12 * ys + b1) * 1024.0).astype(np.int64) + 16
+    y0 = np.rint((a22 * ys + b2) * 1024.0).astype(np.int64) + 16
+    X = (x0[:, None] + adelta[None, :]) >> 5
+    Y = (y0[:, None] + bdelta[None, :]) >> 5
+    map_xy = np.stack(
+        [np.clip(X >> 5, -32768, 32767), np.clip(Y >> 5, -32768, 32767)],
+        axis=-1,
+    ).astype(np.int16)
+    map_frac = ((Y & 31) * 32 + (X & 31)).astype(np.uint16)
+    return map_xy, map_frac
+
+
+def _crop_local_maps_float(M, x1, y1, x2, y2, img_w, block):
+    f32, f64 = np.float32, np.float64
+    a11, a12, b1, a21, a22, b2 = (f32(v) for v in _warp_affine_inverse(M))
+    xs = np.arange(x1, x2, dtype=f32)[None, :]
+    ys = np.arange(y1, y2, dtype=f32)[:, None]
+    # SIMD body: fma(x, M0, float(y*M1 + M2)) with a single rounding.
+    map_x = (f64(a11) * xs.astype(f64) + (a12 * ys + b1).astype(f64)).astype(f32)
+    map_y = (f64(a21) * xs.astype(f64) + (a22 * ys + b2).astype(f64)).astype(f32)
+    tail_start = img_w - (img_w % block)
+    tail = np.arange(x1, x2) >= tail_start
+    if tail.any():
+        # Scalar tail: fma(x, M0, y*M1) + M2.
+        xt = xs[:, tail].astype(f64)
+        tail_x = (f64(a11) * xt + (a12 * ys).astype(f64)).astype(f32) + b1
+        tail_y = (f64(a21) * xt + (a22 * ys).astype(f64)).astype(f32) + b2
+        map_x[:, tail] = tail_x
+        map_y[:, tail] = tail_y
+    return map_x, map_y
+
+
+def _crop_local_warp(image, M, window, mode):
+    """Warp only the crop window of `image` under M, matching cv2.warpAffine."""
+    x1, y1, x2, y2 = window
+    if mode == "fixed":
+        map_a, map_b = _crop_local_maps_fixed(M, x1, y1, x2, y2)
+    else:
+        block = int(mode.split(":", 1)[1])
+        map_a, map_b = _crop_local_maps_float(M, x1, y1, x2, y2, image.shape[1], block)
+    return cv2.remap(
+        image, map_a, map_b,
+        interpolation=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=0,
+    )
+
+
+def _probe_crop_local_mode(dtype: np.dtype, channels: int) -> str | None:
+    rng = np.random.default_rng(20240917)
+    cases = []
+    for img_w in (509, 520, 527, 544, 561, 575):
+        img_h = 97
+        shape = (img_h, img_w) if channels == 1 else (img_h, img_w, channels)
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            image = rng.integers(info.min, info.max, size=shape, endpoint=True).astype(dtype)
+        else:
+            image = rng.uniform(0.0, 255.0, size=shape).astype(dtype)
+        for angle in (-41.3, 17.9):
+            M = cv2.getRotationMatrix2D((float(img_w // 2), float(img_h // 2)), angle, 1.0)
+            full = cv2.warpAffine(
+                image, M, (img_w, img_h),
+                flags=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=0,
+            )
+            for window in ((img_w - 150, 0, img_w, img_h), (3, 5, 211, 90)):
+                cases.append((image, M, window, full))
+
+    for mode in _CROP_LOCAL_CANDIDATES:
+        try:
+            if all(
+                np.array_equal(
+                    _crop_local_warp(image, M, window, mode),
+                    full[window[1]:window[3], window[0]:window[2]],
+                )
+                for image, M, window, full in cases
+            ):
+                return mode
+        except cv2.error:
+            continue
+    return None
+
+
+def _crop_local_mode_for(image: np.ndarray) -> str | None:
+    channels = 1 if image.ndim == 2 else int(image.shape[2])
+    key = (image.dtype.str, channels)
+    if key not in _CROP_LOCAL_MODES:
+        _CROP_LOCAL_MODES[key] = _probe_crop_local_mode(image.dtype, channels)
+    return _CROP_LOCAL_MODES[key]
+
+
 def extract_obb_crop(
     image: np.ndarray,
     obb_corners: list,
     pad_ratio: float = STANDARDIZED_OBB_PAD_RATIO,
     target_size: int = STANDARD_SIZE,
     apply_leveling: bool = True,
+    crop_local: bool = True,
 ) -> tuple:
     """
     Extract a tight deskewed OBB crop, then letterbox it into a square canvas.
@@ -1907,6 +2124,9 @@ def extract_obb_crop(
         apply_leveling: If True (default), rotate the image to deskew the OBB. If False,
             pixels are untouched (AABB-like crop), but affine_M is still stored so
             downstream landmark remapping can apply or skip the same transform.
+        crop_local: If True (default), warp only the padded OBB envelope instead of
+            the whole image. Output is bit-identical to the full-image warp (see
+            _crop_local_mode_for); False forces the full-image warpAffine.
 
     Returns:
         (crop_512, metadata) — crop_512 is (target_size, target_size, C);
@@ -1931,21 +2151,6 @@ def extract_obb_crop(
     # leveling is disabled so downstream landmark remapping stays consistent).
     M = cv2.getRotationMatrix2D((float(cx_i), float(cy_i)), angle, 1.0)
 
-    if apply_leveling:
-        # Rotate the entire image to deskew the OBB.  Use BORDER_CONSTANT (black)
-        # instead of BORDER_REFLECT_101 so that areas swept outside the original
-        # image boundary are filled with neutral zeros rather than mirrored fish
-        # content, which would contaminate the crop with fake landmark targets.
-        rotated = cv2.warpAffine(
-            image, M, (img_w, img_h),
-            flags=cv2.INTER_LINEAR,
-            borderMode=cv2.BORDER_CONSTANT,
-            borderValue=0,
-        )
-    else:
-        # Pixels untouched; M is still stored for coordinate transforms
-        rotated = image
-
     transformed_pts = cv2.transform(pts.reshape(1, -1, 2), M).reshape(-1, 2)
     min_x = float(np.min(transformed_pts[:, 0]))
     max_x = float(np.max(transformed_pts[:, 0]))
@@ -1959,7 +2164,26 @@ def extract_obb_crop(
     y1 = max(0, int(math.floor(min_y - pad_y)))
     x2 = min(img_w, int(math.ceil(max_x + pad_x)))
     y2 = min(img_h, int(math.ceil(max_y + pad_y)))
-    crop = rotated[y1:y2, x1:x2]
+
+    if not apply_leveling:
+        # Pixels untouched; M is still stored for coordinate transforms
+        crop = image[y1:y2, x1:x2]
+    else:
+        # Deskew the OBB.  Use BORDER_CONSTANT (black) instead of BORDER_REFLECT_101
+        # so that areas swept outside the original image boundary are filled with
+        # neutral zeros rather than mirrored fish content, which would contaminate
+        # the crop with fake landmark targets.
+        mode = _crop_local_mode_for(image) if (crop_local and x2 > x1 and y2 > y1) else None
+        if mode is not None:
+            crop = _crop_local_warp(image, M, (x1, y1, x2, y2), mode)
+        else:
+            rotated = cv2.warpAffine(
+                image, M, (img_w, img_h),
+                flags=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=0,
+            )
+            crop = rotated[y1:y2, x1:x2]
 
     ch, cw = crop.shape[:2]
     if crop.size == 0 or cw <= 0 or ch <= 0:
@@ -2082,6 +2306,72 @@ def project_point_to_obb_perimeter(
     return best_point if best_point is not None else (px, py)
 
 
+def points_in_convex_quads(
+    points: np.ndarray,
+    corners: np.ndarray,
+    *,
+    epsilon: float = 1e-6,
+) -> np.ndarray:
+    """
+    Vectorized point_in_convex_quad().
+
+    points is (N, 2) with corners (4, 2), or (S, N, 2) with corners (S, 4, 2).
+    Returns a bool array of shape points.shape[:-1].
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    quad = np.asarray(corners, dtype=np.float64)
+    a = quad[..., None, :, :]                          # (..., 1, 4, 2)
+    b = np.roll(quad, -1, axis=-2)[..., None, :, :]
+    p = pts[..., :, None, :]                           # (..., N, 1, 2)
+    cross = ((b[..., 0] - a[..., 0]) * (p[..., 1] - a[..., 1])) - ((b[..., 1] - a[..., 1]) * (p[..., 0] - a[..., 0]))
+    has_pos = np.any(cross > epsilon, axis=-1)
+    has_neg = np.any(cross < -epsilon, axis=-1)
+    return ~(has_pos & has_neg)
+
+
+def project_points_to_obb_perimeter(
+    points: np.ndarray,
+    obb_corners: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized project_point_to_obb_perimeter(): nearest point on the quad outline.
+
+    Shapes as in points_in_convex_quads(); returns an array shaped like points.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    quad = np.asarray(obb_corners, dtype=np.float64)
+    a = quad[..., None, :, :]
+    ab = (np.roll(quad, -1, axis=-2) - quad)[..., None, :, :]
+    p = pts[..., :, None, :]
+    denom = (ab[..., 0] * ab[..., 0]) + (ab[..., 1] * ab[..., 1])
+    degenerate = denom <= 1e-12
+    t = ((p[..., 0] - a[..., 0]) * ab[..., 0] + (p[..., 1] - a[..., 1]) * ab[..., 1]) / np.where(degenerate, 1.0, denom)
+    t = np.where(degenerate, 0.0, np.clip(t, 0.0, 1.0))
+    proj = a + (ab * t[..., None])                     # (..., N, 4, 2)
+    d = proj - p
+    dist_sq = (d[..., 0] * d[..., 0]) + (d[..., 1] * d[..., 1])
+    best = np.argmin(dist_sq, axis=-1)
+    return np.take_along_axis(proj, best[..., None, None], axis=-2)[..., 0, :]
+
+
+def clamp_points_to_obb(
+    points: np.ndarray,
+    obb_corners: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Project points outside the OBB onto its perimeter.
+
+    Returns (clamped_points, was_clamped) for (N, 2) / (4, 2) or
+    (S, N, 2) / (S, 4, 2) inputs.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    inside = points_in_convex_quads(pts, obb_corners)
+    if inside.all():
+        return pts.copy(), ~inside
+    projected = project_points_to_obb_perimeter(pts, obb_corners)
+    return np.where(inside[..., None], pts, projected), ~inside
+
+
 def apply_obb_geometry(
     crop_512: np.ndarray,
     metadata: dict,
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from backend.bv_utils import debug_io as dio
+from backend.data.audit_dataset import AuditReport, check_fallback_rate
+
+
+class PredictionLogTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.debug_dir = os.path.join(self._tmpdir.name, "debug")
+        self.log_path = os.path.join(self.debug_dir, "prediction_log_t.jsonl")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_append_rotates_by_size_and_reads_in_order(self):
+        for idx in range(30):
+            dio.append_jsonl(self.log_path, {"i": idx, "pad": "x" * 40}, max_bytes=200, backups=2)
+        self.assertLessEqual(os.path.getsize(self.log_path), 200)
+        self.assertTrue(os.path.exists(f"{self.log_path}.2"))
+        self.assertFalse(os.path.exists(f"{self.log_path}.3"))
+        rows = dio.read_jsonl(self.log_path, backups=2)
+        indices = [row["i"] for row in rows]
+        self.assertEqual(indices, sorted(indices))
+        self.assertEqual(indices[-1], 29)
+        self.assertEqual([row["i"] for row in dio.read_jsonl(self.log_path, max_entries=3)], [27, 28, 29])
+
+    def test_reader_skips_truncated_last_line(self):
+        dio.append_jsonl(self.log_path, {"i": 0})
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write('{"i": 1, "detection_')
+        self.assertEqual(dio.read_jsonl(self.log_path), [{"i": 0}])
+
+    def test_legacy_json_array_is_migrated_once(self):
+        legacy_path = os.path.join(self.debug_dir, "prediction_log_t.json")
+        dio.write_json(legacy_path, [{"i": 0}, {"i": 1}])
+        dio.append_prediction_log(self.log_path, {"i": 2})
+        self.assertFalse(os.path.exists(legacy_path))
+        self.assertTrue(os.path.exists(f"{legacy_path}.bak"))
+        self.assertEqual([row["i"] for row in dio.read_prediction_log(self.log_path)], [0, 1, 2])
+
+    def test_fallback_rate_reads_jsonl_and_legacy_logs(self):
+        project_root = self._tmpdir.name
+        dio.write_json(
+            os.path.join(self.debug_dir, "prediction_log_t.json"),
+            [{"detection_method": "opencv_contours"}] * 3,
+        )
+        dio.append_prediction_log(self.log_path, {"detection_method": "yolo_obb"})
+        report = AuditReport("t")
+        check_fallback_rate(project_root, "t", report)
+        self.assertEqual(report.issues[0]["level"], "WARN")
+        self.assertIn("(3/4)", report.issues[0]["message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
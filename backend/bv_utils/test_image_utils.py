@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from backend.bv_utils.image_utils import HAS_PIL, LazyImage, load_image
+
+
+def _smooth_rgb(h, w, seed=0):
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 255, size=(max(2, h // 100), max(2, w // 100), 3), dtype=np.uint8)
+    return cv2.resize(coarse, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def _pil_reference_bgr(path, orientation):
+    """EXIF-corrected BGR through PIL's own transpose and RGB conversion."""
+    from PIL import Image
+
+    pil_img = Image.open(path)
+    method = {
+        2: Image.Transpose.FLIP_LEFT_RIGHT,
+        3: Image.Transpose.ROTATE_180,
+        4: Image.Transpose.FLIP_TOP_BOTTOM,
+        5: Image.Transpose.TRANSPOSE,
+        6: Image.Transpose.ROTATE_270,
+        7: Image.Transpose.TRANSVERSE,
+        8: Image.Transpose.ROTATE_90,
+    }.get(orientation)
+    if method is not None:
+        pil_img = pil_img.transpose(method)
+    return cv2.cvtColor(np.array(pil_img.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow not installed")
+class LoadImageOrientationTests(unittest.TestCase):
+    def test_every_orientation_matches_pil_for_jpeg_and_png(self):
+        from PIL import Image
+
+        rng = np.random.default_rng(3)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for ext, mode in (("jpg", "RGB"), ("jpg", "L"), ("png", "RGBA"), ("png", "P")):
+                array = rng.integers(0, 255, size=(37, 53, 3), dtype=np.uint8)
+                for orientation in range(1, 9):
+                    pil_img = Image.fromarray(array).convert(mode)
+                    exif = pil_img.getexif()
+                    exif[274] = orientation
+                    path = os.path.join(tmpdir, f"{mode}_{orientation}.{ext}")
+                    pil_img.save(path, exif=exif.tobytes())
+                    with self.subTest(ext=ext, mode=mode, orientation=orientation):
+                        img, w, h = load_image(path)
+                        np.testing.assert_array_equal(img, _pil_reference_bgr(path, orientation))
+                        self.assertEqual((w, h), (img.shape[1], img.shape[0]))
+                        self.assertTrue(img.flags.writeable and img.flags.c_contiguous)
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow not installed")
+class LazyImageTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _save(self, name, array, orientation=None):
+        from PIL import Image
+
+        path = os.path.join(self._tmpdir.name, name)
+        pil_img = Image.fromarray(array)
+        kwargs = {}
+        if orientation is not None:
+            exif = pil_img.getexif()
+            exif[274] = orientation
+            kwargs["exif"] = exif.tobytes()
+        pil_img.save(path, **kwargs)
+        return path
+
+    def test_jpeg_detector_image_is_decoded_at_reduced_resolution(self):
+        path = self._save("rotated.jpg", _smooth_rgb(2000, 3000), orientation=6)
+        image = LazyImage(path, max_dim=700)
+        # Orientation 6 swaps the stored 3000x2000 to 2000x3000.
+        self.assertEqual((image.width, image.height), (2000, 3000))
+        self.assertEqual((image.detector_width, image.detector_height), (int(2000 * 700 / 3000), 700))
+        detector = image.detector_image()
+        self.assertIsNone(image._full)
+        self.assertEqual(detector.shape, (700, image.detector_width, 3))
+
+        full, w, h = load_image(path)
+        self.assertEqual((w, h), (image.width, image.height))
+        reference = cv2.resize(full, (image.detector_width, image.detector_height), interpolation=cv2.INTER_AREA)
+        self.assertLess(np.abs(reference.astype(np.int16) - detector).mean(), 2.0)
+        np.testing.assert_array_equal(image.full_image(), full)
+
+    def test_formats_without_reduced_decode_match_full_resize(self):
+        path = self._save("plain.png", _smooth_rgb(900, 1200, seed=1))
+        image = LazyImage(path, max_dim=500)
+        full, _, _ = load_image(path)
+        np.testing.assert_array_equal(
+            image.detector_image(),
+            cv2.resize(full, (image.detector_width, image.detector_height), interpolation=cv2.INTER_AREA),
+        )
+
+    def test_small_image_shares_one_decode(self):
+        path = self._save("small.jpg", _smooth_rgb(300, 400, seed=2))
+        image = LazyImage(path, max_dim=500)
+        self.assertEqual(image.scale, 1.0)
+        self.assertIs(image.detector_image(), image.full_image())
+
+    def test_unreadable_file_has_no_dimensions(self):
+        path = os.path.join(self._tmpdir.name, "broken.jpg")
+        with open(path, "wb") as f:
+            f.write(b"not an image")
+        image = LazyImage(path)
+        self.assertEqual((image.width, image.height), (0, 0))
+        self.assertIsNone(image.detector_image())
+
+
+if __name__ == "__main__":
+    unittest.main()
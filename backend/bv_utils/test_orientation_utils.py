@@ -1,6 +1,7 @@
 import math
 import unittest
 
+import cv2
 import numpy as np
 
 from backend.bv_utils import orientation_utils as ou
@@ -96,5 +97,171 @@ class OrientationTransformTests(unittest.TestCase):
         self.assert_round_trip_close(landmarks, restored_legacy, tolerance=1.1)
 
 
+class SelectOrientationCandidateTests(unittest.TestCase):
+    TEMPLATE = {
+        1: {"x_mean": 100.0, "y_mean": 256.0, "x_std": 20.0, "y_std": 20.0},
+        2: {"x_mean": 400.0, "y_mean": 256.0, "x_std": 20.0, "y_std": 20.0},
+    }
+
+    @staticmethod
+    def _mirrored_predict_fn(crop):
+        # Head landmark follows the bright column so the flipped crop mirrors it.
+        head_x = float(np.argmax(crop[0, :, 0]))
+        return [
+            {"id": 1, "x": head_x, "y": 256.0},
+            {"id": 2, "x": 511.0 - head_x, "y": 256.0},
+        ]
+
+    def test_precomputed_candidates_match_select_orientation(self):
+        crop = np.zeros((512, 512, 3), dtype=np.uint8)
+        crop[:, 420] = 255
+        expected = ou.select_orientation(
+            crop,
+            self._mirrored_predict_fn,
+            target_orientation="left",
+            landmark_template=self.TEMPLATE,
+            head_id=1,
+            tail_id=2,
+        )
+        flipped = self._mirrored_predict_fn(crop[:, ::-1])
+        actual = ou.select_orientation_from_candidates(
+            self._mirrored_predict_fn(crop),
+            lambda: flipped,
+            target_orientation="left",
+            landmark_template=self.TEMPLATE,
+            head_id=1,
+            tail_id=2,
+        )
+        self.assertEqual(expected, actual)
+        self.assertTrue(actual[1])
+
+    def test_flipped_candidate_not_requested_without_orientation_cues(self):
+        self.assertFalse(ou.select_orientation_requires_flipped())
+
+        def _unexpected():
+            raise AssertionError("flipped candidate should not be evaluated")
+
+        landmarks, was_flipped, debug = ou.select_orientation_from_candidates(
+            [{"id": 1, "x": 10.0, "y": 20.0}],
+            _unexpected,
+        )
+        self.assertEqual(landmarks, [{"id": 1, "x": 10.0, "y": 20.0}])
+        self.assertFalse(was_flipped)
+        self.assertFalse(debug["candidate_b_evaluated"])
+
+
+class CropLocalExtractionTests(unittest.TestCase):
+    def test_crop_local_matches_full_image_warp(self):
+        rng = np.random.default_rng(7)
+        cases = 0
+        for shape in ((613, 877, 3), (480, 641), (400, 530, 4)):
+            image = rng.integers(0, 256, size=shape, dtype=np.uint8)
+            img_h, img_w = shape[:2]
+            for _ in range(12):
+                corners = build_obb(
+                    rng.uniform(-40.0, img_w + 40.0),
+                    rng.uniform(-40.0, img_h + 40.0),
+                    rng.uniform(20.0, img_w * 0.8),
+                    rng.uniform(15.0, img_h * 0.5),
+                    rng.uniform(-89.0, 89.0),
+                )
+                try:
+                    full_crop, full_meta = ou.extract_obb_crop(image, corners, crop_local=False)
+                except ValueError:
+                    continue
+                local_crop, local_meta = ou.extract_obb_crop(image, corners)
+                self.assertTrue(np.array_equal(full_crop, local_crop))
+                self.assertEqual(full_meta, local_meta)
+                cases += 1
+        self.assertGreater(cases, 20)
+
+
+def _scalar_map_to_original(points, meta, was_flipped, image_shape):
+    """The per-point map_to_original from before vectorization (reference only)."""
+    size = ou.STANDARD_SIZE
+    sx = float(meta.get("scale_x", meta.get("scale", 1.0))) or 1.0
+    sy = float(meta.get("scale_y", meta.get("scale", 1.0))) or 1.0
+    ox, oy = meta["crop_origin"]
+    angle = float(meta.get("rotation", 0.0))
+    pad_left, pad_top, _, _ = ou._get_standardized_padding(meta, sx=sx, sy=sy)
+    img_h, img_w = image_shape
+    effective_flip = bool(was_flipped) ^ bool(meta.get("canonical_flip_applied", False))
+    rotated_180 = bool(meta.get("rotated_180", False))
+    use_exact_affine = bool(meta.get("obb_deskewed")) and meta.get("affine_M") is not None
+    if use_exact_affine:
+        m_inv = cv2.invertAffineTransform(np.array(meta["affine_M"], dtype=np.float64))
+    cos_a = float(np.cos(np.radians(-angle)))
+    sin_a = float(np.sin(np.radians(-angle)))
+    c = size / 2.0
+
+    def mirror(v):
+        return max(0.0, min(float(size - 1), (size - 1) - float(v)))
+
+    mapped = []
+    for x, y in points:
+        x_s = max(0.0, min(float(size - 1), float(x)))
+        y_s = max(0.0, min(float(size - 1), float(y)))
+        if effective_flip:
+            x_s = mirror(x_s)
+        if rotated_180:
+            x_s, y_s = mirror(x_s), mirror(y_s)
+        if use_exact_affine:
+            x_rot = (x_s - pad_left) / sx + float(ox)
+            y_rot = (y_s - pad_top) / sy + float(oy)
+            x_o = m_inv[0, 0] * x_rot + m_inv[0, 1] * y_rot + m_inv[0, 2]
+            y_o = m_inv[1, 0] * x_rot + m_inv[1, 1] * y_rot + m_inv[1, 2]
+        else:
+            if abs(angle) > 1e-9:
+                x_s, y_s = (c + (x_s - c) * cos_a - (y_s - c) * sin_a,
+                            c + (x_s - c) * sin_a + (y_s - c) * cos_a)
+            x_o = (x_s - pad_left) / sx + float(ox)
+            y_o = (y_s - pad_top) / sy + float(oy)
+        x_o = max(0.0, min(float(img_w - 1), x_o))
+        y_o = max(0.0, min(float(img_h - 1), y_o))
+        mapped.append((round(x_o, 1), round(y_o, 1)))
+    return mapped
+
+
+class VectorizedMappingTests(unittest.TestCase):
+    def test_batched_mapping_matches_scalar_reference(self):
+        rng = np.random.default_rng(3)
+        image = rng.integers(0, 256, size=(600, 800, 3), dtype=np.uint8)
+        metas = []
+        for cx, cy, angle in ((220.0, 180.0, 23.0), (560.0, 390.0, -61.0), (400.0, 300.0, 88.0)):
+            _, meta = ou.extract_standardized_obb_crop(image, build_obb(cx, cy, 260.0, 110.0, angle))
+            metas.append(meta)
+        metas[1]["canonical_flip_applied"] = True
+        metas[2]["rotated_180"] = True
+        # Legacy crops without an affine take the center-rotation path.
+        legacy = {key: value for key, value in metas[0].items() if key != "affine_M"}
+        legacy.update({"obb_deskewed": False, "rotation": 31.0})
+        metas.append(legacy)
+        points = rng.uniform(-10.0, 520.0, size=(len(metas), 6, 2))
+        flips = [False, True, True, True]
+
+        mapped = ou.map_points_to_original(points, metas, was_flipped=flips, image_shape=(600, 800))
+        self.assertEqual(mapped.shape, (len(metas), 6, 2))
+        for idx, meta in enumerate(metas):
+            expected = _scalar_map_to_original(points[idx], meta, flips[idx], (600, 800))
+            self.assertEqual(
+                expected,
+                [(round(float(x), 1), round(float(y), 1)) for x, y in mapped[idx]],
+            )
+
+    def test_clamp_points_to_obb_matches_scalar_helpers(self):
+        rng = np.random.default_rng(5)
+        corners = np.array([build_obb(200.0, 150.0, 180.0, 60.0, 35.0), build_obb(90.0, 80.0, 50.0, 40.0, -10.0)])
+        points = rng.uniform(0.0, 320.0, size=(2, 9, 2))
+        clamped, was_clamped = ou.clamp_points_to_obb(points, corners)
+        for s in range(2):
+            quad = corners[s].tolist()
+            for n in range(9):
+                point = tuple(points[s, n])
+                inside = ou.point_in_convex_quad(point, quad)
+                expected = point if inside else ou.project_point_to_obb_perimeter(point, quad)
+                self.assertEqual(bool(was_clamped[s, n]), not inside)
+                self.assertEqual(tuple(clamped[s, n]), tuple(expected))
+
+
 if __name__ == "__main__":
     unittest.main()
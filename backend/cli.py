@@ -12,6 +12,10 @@ Example:
     biovision_backend predict /path/to/root model_name image.jpg
     biovision_backend hardware_probe
     biovision_backend super_annotator
+
+Built-in commands:
+    biovision_backend importtime [script ...] [--json] [--top N]
+        Cold-start import time of each script (see importtime_report.py).
 """
 import sys
 import runpy
@@ -24,6 +28,7 @@ SCRIPT_MAP = {
     "export_yolo_dataset": "data.export_yolo_dataset",
     "train_shape_model": "training.train_shape_model",
     "train_cnn_model": "training.train_cnn_model",
+    "quantize_cnn_model": "training.quantize_cnn_model",
     "predict": "inference.predict",
     "predict_worker": "inference.predict_worker",
     "shape_tester": "inference.shape_tester",
@@ -39,6 +44,15 @@ if len(sys.argv) < 2:
     sys.exit(1)
 
 script_name = sys.argv[1]
+
+if script_name == "importtime":
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    from importtime_report import main as importtime_main
+
+    sys.exit(importtime_main(SCRIPT_MAP, __file__, sys.argv[2:]))
+
 if script_name not in SCRIPT_MAP:
     print(f"Unknown script: {script_name}", file=sys.stderr)
     print(f"Available: {', '.join(sorted(SCRIPT_MAP.keys()))}", file=sys.stderr)
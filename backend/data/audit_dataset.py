@@ -23,6 +23,13 @@ import os
 import sys
 from datetime import datetime
 
+import sys as _sys, os as _os
+_BACKEND_ROOT = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
+if _BACKEND_ROOT not in _sys.path:
+    _sys.path.insert(0, _BACKEND_ROOT)
+
+import bv_utils.debug_io as dio
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Result helpers
@@ -274,15 +281,15 @@ def check_fallback_rate(project_root: str, tag: str, report: AuditReport,
     fallback instead of YOLO, emit a warning.
     """
     debug_dir = os.path.join(project_root, "debug")
-    log_path = os.path.join(debug_dir, f"prediction_log_{tag}.json")
+    log_path = os.path.join(debug_dir, f"prediction_log_{tag}.jsonl")
+    legacy_path = os.path.join(debug_dir, f"prediction_log_{tag}.json")
 
-    if not os.path.exists(log_path):
-        report.info("fallback_rate", f"prediction_log_{tag}.json not found — skipping fallback check")
+    if not (os.path.exists(log_path) or os.path.exists(f"{log_path}.1") or os.path.exists(legacy_path)):
+        report.info("fallback_rate", f"prediction_log_{tag}.jsonl not found — skipping fallback check")
         return
 
     try:
-        with open(log_path, "r", encoding="utf-8") as f:
-            entries = json.load(f)
+        entries = dio.read_prediction_log(log_path)
     except Exception as exc:
         report.warn("fallback_rate", f"Could not parse prediction log: {exc}")
         return
@@ -15,7 +15,7 @@ _BACKEND_ROOT = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
 if _BACKEND_ROOT not in _sys.path:
     _sys.path.insert(0, _BACKEND_ROOT)
 
-from bv_utils.image_utils import load_image, safe_imread, safe_imwrite
+from bv_utils.image_utils import LazyImage, safe_imread, safe_imwrite
 import bv_utils.orientation_utils as ou
 
 
@@ -705,15 +705,15 @@ def json_to_dlib_xml(project_root, tag, test_split=0.2, seed=42, max_dim=1500,
         img_filename = data.get("imageFilename")
         img_path = _resolve_image_path(images_dir, img_filename)
 
-        img, w, h = load_image(img_path)
+        # Only the max_dim-bounded copy is used, so oversized JPEGs are decoded
+        # at reduced resolution instead of in full and resized.
+        source = LazyImage(img_path, max_dim=max_dim)
+        img = source.detector_image()
         if img is None:
             raise RuntimeError(f"Could not read: {img_path}")
 
-        scale = 1.0
-        if max(w, h) > max_dim:
-            scale = max_dim / max(w, h)
-            img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
-            w, h = img.shape[1], img.shape[0]
+        scale = source.scale
+        h, w = img.shape[:2]
 
         base = _ascii_safe_base(os.path.splitext(img_filename)[0])
         corrected_path = os.path.join(corrected_dir, f"{base}.png")
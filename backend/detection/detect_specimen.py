@@ -2,6 +2,9 @@ import json
 import math
 import os
 import sys
+import threading
+import time
+from collections import OrderedDict
 
 import numpy as np
 
@@ -276,8 +279,132 @@ def _parse_obb_boxes(result, margin=20, max_specimens=20, orientation_policy=Non
     return _class_agnostic_dedup(parsed)
 
 
+# ── YOLO detector registry ────────────────────────────────────────────────────
+# Loaded YOLO models are reused across calls. Entries are keyed by absolute model
+# path and validated against the file's (mtime, size) on every lookup, so a
+# retrained checkpoint written to the same path is picked up automatically.
+
+MAX_CACHED_DETECTORS = 4
+
+_DETECTOR_REGISTRY = OrderedDict()
+_DETECTOR_LOCK = threading.Lock()
+_DETECTOR_STATS = {
+    "hits": 0,
+    "misses": 0,
+    "loads": 0,
+    "invalidations": 0,
+    "evictions": 0,
+    "total_load_s": 0.0,
+    "last_load_s": None,
+}
+
+
+def _detector_file_signature(model_path):
+    try:
+        st = os.stat(model_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get_yolo_detector(model_path):
+    """
+    Return a loaded ultralytics YOLO model for model_path, reusing a cached one.
+
+    Returns None when ultralytics is unavailable or the file does not exist.
+    """
+    try:
+        from ultralytics import YOLO
+    except Exception:
+        return None
+
+    if not model_path or not os.path.exists(model_path):
+        return None
+
+    key = os.path.abspath(model_path)
+    signature = _detector_file_signature(key)
+    with _DETECTOR_LOCK:
+        entry = _DETECTOR_REGISTRY.get(key)
+        if entry is not None:
+            if entry["signature"] == signature:
+                _DETECTOR_REGISTRY.move_to_end(key)
+                _DETECTOR_STATS["hits"] += 1
+                return entry["model"]
+            del _DETECTOR_REGISTRY[key]
+            _DETECTOR_STATS["invalidations"] += 1
+        _DETECTOR_STATS["misses"] += 1
+
+        started = time.perf_counter()
+        model = YOLO(key)
+        load_s = time.perf_counter() - started
+        _DETECTOR_STATS["loads"] += 1
+        _DETECTOR_STATS["total_load_s"] += load_s
+        _DETECTOR_STATS["last_load_s"] = load_s
+
+        _DETECTOR_REGISTRY[key] = {"model": model, "signature": signature, "load_s": load_s}
+        while len(_DETECTOR_REGISTRY) > MAX_CACHED_DETECTORS:
+            _DETECTOR_REGISTRY.popitem(last=False)
+            _DETECTOR_STATS["evictions"] += 1
+        return model
+
+
+def invalidate_yolo_detector(model_path=None):
+    """Drop the cached detector for model_path (or every cached detector when None)."""
+    with _DETECTOR_LOCK:
+        if model_path is None:
+            dropped = len(_DETECTOR_REGISTRY)
+            _DETECTOR_REGISTRY.clear()
+        else:
+            dropped = 1 if _DETECTOR_REGISTRY.pop(os.path.abspath(model_path), None) is not None else 0
+        _DETECTOR_STATS["invalidations"] += dropped
+        return dropped
+
+
+def yolo_detector_stats():
+    with _DETECTOR_LOCK:
+        lookups = _DETECTOR_STATS["hits"] + _DETECTOR_STATS["misses"]
+        loads = _DETECTOR_STATS["loads"]
+        return {
+            "entries": len(_DETECTOR_REGISTRY),
+            "max_entries": MAX_CACHED_DETECTORS,
+            "hits": _DETECTOR_STATS["hits"],
+            "misses": _DETECTOR_STATS["misses"],
+            "hit_rate": round(_DETECTOR_STATS["hits"] / lookups, 4) if lookups else None,
+            "loads": loads,
+            "invalidations": _DETECTOR_STATS["invalidations"],
+            "evictions": _DETECTOR_STATS["evictions"],
+            "total_load_s": round(_DETECTOR_STATS["total_load_s"], 3),
+            "mean_load_s": round(_DETECTOR_STATS["total_load_s"] / loads, 3) if loads else None,
+            "last_load_s": (
+                round(_DETECTOR_STATS["last_load_s"], 3)
+                if _DETECTOR_STATS["last_load_s"] is not None
+                else None
+            ),
+            "models": list(_DETECTOR_REGISTRY.keys()),
+        }
+
+
+def _detector_source(image):
+    """
+    Normalize a detector input: a file path, or an in-memory BGR ndarray.
+
+    Arrays go to ultralytics directly (no temp-file round-trip); grayscale and
+    BGRA inputs are converted to 3-channel BGR uint8.
+    """
+    if not isinstance(image, np.ndarray):
+        return image
+    arr = image
+    if arr.dtype != np.uint8:
+        arr = np.clip(arr, 0, 255).astype(np.uint8)
+    if arr.ndim == 2:
+        arr = np.repeat(arr[:, :, None], 3, axis=2)
+    elif arr.ndim == 3 and arr.shape[2] == 4:
+        arr = arr[:, :, :3]
+    return np.ascontiguousarray(arr)
+
+
 def detect_with_yolo(
-    image_path,
+    image,
     model_path,
     conf_threshold=0.25,
     margin=20,
@@ -286,12 +413,8 @@ def detect_with_yolo(
     detection_preset="balanced",
     imgsz=None,
 ):
-    try:
-        from ultralytics import YOLO
-    except Exception:
-        return None
-
-    if not model_path or not os.path.exists(model_path):
+    model = get_yolo_detector(model_path)
+    if model is None:
         return None
 
     resolved = _resolve_obb_detection_preset(
@@ -301,9 +424,8 @@ def detect_with_yolo(
         detection_preset=detection_preset,
         imgsz=imgsz,
     )
-    model = YOLO(model_path)
     results = model.predict(
-        image_path,
+        _detector_source(image),
         conf=float(resolved["conf"]),
         iou=float(resolved["iou"]),
         imgsz=int(resolved["imgsz"]),
@@ -323,7 +445,7 @@ def detect_with_yolo(
 
 
 def detect_multiple_with_yolo(
-    image_path,
+    image,
     model_path,
     conf_threshold=0.25,
     margin=20,
@@ -333,12 +455,8 @@ def detect_multiple_with_yolo(
     detection_preset="balanced",
     imgsz=None,
 ):
-    try:
-        from ultralytics import YOLO
-    except Exception:
-        return None
-
-    if not model_path or not os.path.exists(model_path):
+    model = get_yolo_detector(model_path)
+    if model is None:
         return None
 
     resolved = _resolve_obb_detection_preset(
@@ -355,8 +473,7 @@ def detect_multiple_with_yolo(
         "task": "obb",
         "verbose": False,
     }
-    model = YOLO(model_path)
-    results = model.predict(image_path, **predict_kwargs)
+    results = model.predict(_detector_source(image), **predict_kwargs)
     if not results:
         return None
 
@@ -371,7 +488,7 @@ def detect_multiple_with_yolo(
 
 
 def detect_specimen(
-    image_path,
+    image,
     margin=20,
     yolo_model_path=None,
     orientation_policy=None,
@@ -381,7 +498,7 @@ def detect_specimen(
     imgsz=None,
 ):
     return detect_with_yolo(
-        image_path,
+        image,
         yolo_model_path,
         conf_threshold=conf_threshold,
         margin=margin,
@@ -393,7 +510,7 @@ def detect_specimen(
 
 
 def detect_multiple_specimens(
-    image_path,
+    image,
     min_area_ratio=0.02,
     yolo_model_path=None,
     margin=20,
@@ -406,7 +523,7 @@ def detect_multiple_specimens(
 ):
     del min_area_ratio
     boxes = detect_multiple_with_yolo(
-        image_path,
+        image,
         yolo_model_path,
         conf_threshold=conf_threshold,
         margin=margin,
@@ -1,6 +1,14 @@
 import math
+import os
+import sys
+import tempfile
+import types
 import unittest
+from unittest import mock
 
+import numpy as np
+
+from backend.detection import detect_specimen
 from backend.detection.detect_specimen import canonicalize_detector_obb_corners
 
 
@@ -61,5 +69,65 @@ class CanonicalizeDetectorObbCornersTests(unittest.TestCase):
         self.assertCanonical(actual)
 
 
+class YoloDetectorRegistryTests(unittest.TestCase):
+    def setUp(self):
+        detect_specimen.invalidate_yolo_detector()
+        self.loaded = []
+        self.sources = []
+        test = self
+
+        class FakeYolo:
+            def __init__(self, path):
+                test.loaded.append(path)
+
+            def predict(self, source, **kwargs):
+                test.sources.append(source)
+                return []
+
+        fake_yolo = FakeYolo
+
+        self.modules = mock.patch.dict(sys.modules, {"ultralytics": types.SimpleNamespace(YOLO=fake_yolo)})
+        self.modules.start()
+        self.addCleanup(self.modules.stop)
+        self.addCleanup(detect_specimen.invalidate_yolo_detector)
+
+    def test_reuses_detector_until_weights_change(self):
+        loads_before = detect_specimen.yolo_detector_stats()["loads"]
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, "session_obb_detector.pt")
+            with open(model_path, "wb") as f:
+                f.write(b"v1")
+            first = detect_specimen.get_yolo_detector(model_path)
+            self.assertIs(detect_specimen.get_yolo_detector(model_path), first)
+            self.assertEqual(len(self.loaded), 1)
+
+            with open(model_path, "wb") as f:
+                f.write(b"v2-retrained")
+            self.assertIsNot(detect_specimen.get_yolo_detector(model_path), first)
+            self.assertEqual(len(self.loaded), 2)
+
+            detect_specimen.invalidate_yolo_detector(model_path)
+            detect_specimen.get_yolo_detector(model_path)
+            self.assertEqual(len(self.loaded), 3)
+            self.assertIsNone(detect_specimen.get_yolo_detector(os.path.join(tmp, "missing.pt")))
+
+        stats = detect_specimen.yolo_detector_stats()
+        self.assertEqual(stats["loads"] - loads_before, 3)
+        self.assertGreaterEqual(stats["hits"], 1)
+        self.assertIsNotNone(stats["hit_rate"])
+
+    def test_ndarray_input_is_passed_to_detector(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, "session_obb_detector.pt")
+            with open(model_path, "wb") as f:
+                f.write(b"weights")
+            gray = np.zeros((40, 60), dtype=np.uint8)
+            result = detect_specimen.detect_multiple_specimens(gray, yolo_model_path=model_path)
+        self.assertFalse(result["ok"])
+        self.assertEqual(len(self.sources), 1)
+        self.assertIsInstance(self.sources[0], np.ndarray)
+        self.assertEqual(self.sources[0].shape, (40, 60, 3))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Cold-start import cost of each biovision_backend script.
+
+    biovision_backend importtime [script ...] [--json] [--top N]
+
+Every SCRIPT_MAP entry (or just the named ones) is imported in a fresh
+interpreter by re-invoking the dispatcher with --probe, so the numbers include
+interpreter start-up effects and the report also works for the frozen
+PyInstaller build. Importing a script module runs its top-level code only, not
+its __main__ block.
+
+Per script the report lists the wall time of the import, which heavy
+dependencies it pulled in and, outside frozen builds, the modules with the
+largest self time from `python -X importtime`.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = (
+    "torch",
+    "torchvision",
+    "dlib",
+    "ultralytics",
+    "onnxruntime",
+    "onnx",
+    "cv2",
+    "PIL",
+    "sklearn",
+    "numpy",
+)
+DEFAULT_TOP = 8
+PROBE_TIMEOUT_S = 300
+
+
+def probe(module_name: str) -> dict:
+    """Import module_name in this (fresh) interpreter and describe the cost."""
+    started = time.perf_counter()
+    error = None
+    try:
+        __import__(module_name)
+    except BaseException as exc:  # SystemExit / missing optional deps count as results too
+        error = f"{type(exc).__name__}: {exc}"
+    return {
+        "module": module_name,
+        "import_s": round(time.perf_counter() - started, 4),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+        "modules_loaded": len(sys.modules),
+        "error": error,
+    }
+
+
+def _probe_command(cli_path: str, module_name: str) -> list[str]:
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "importtime", "--probe", module_name]
+    return [sys.executable, "-X", "importtime", cli_path, "importtime", "--probe", module_name]
+
+
+def _parse_importtime(stderr: str, top: int) -> list[dict]:
+    """Modules with the largest self time from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue  # header line
+        rows.append({
+            "module": parts[2].strip(),
+            "self_ms": round(self_us / 1000.0, 2),
+            "cumulative_ms": round(cumulative_us / 1000.0, 2),
+        })
+    rows.sort(key=lambda row: row["self_ms"], reverse=True)
+    return rows[: max(0, int(top))]
+
+
+def run_report(script_map: dict, cli_path: str, names=None, top: int = DEFAULT_TOP) -> dict:
+    scripts = []
+    for name in names or sorted(script_map):
+        module_name = script_map[name]
+        started = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                _probe_command(cli_path, module_name),
+                capture_output=True,
+                text=True,
+                timeout=PROBE_TIMEOUT_S,
+            )
+        except subprocess.TimeoutExpired:
+            scripts.append({"script": name, "module": module_name, "error": "timeout"})
+            continue
+        entry = {"script": name, "process_s": round(time.perf_counter() - started, 4)}
+        result_line = next(
+            (line for line in reversed(proc.stdout.splitlines()) if line.startswith("{")),
+            None,
+        )
+        if result_line is None:
+            entry.update({"module": module_name, "error": (proc.stderr.strip().splitlines() or ["no output"])[-1]})
+        else:
+            entry.update(json.loads(result_line))
+        if not getattr(sys, "frozen", False):
+            entry["slowest_imports"] = _parse_importtime(proc.stderr, top)
+        scripts.append(entry)
+    return {
+        "python": sys.version.split()[0],
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "scripts": scripts,
+    }
+
+
+def _print_table(report: dict) -> None:
+    print(f"{'script':<22} {'import_s':>9} {'process_s':>10}  heavy modules")
+    for entry in report["scripts"]:
+        heavy = ", ".join(entry.get("heavy_modules") or [])
+        line = f"{entry['script']:<22} {entry.get('import_s', float('nan')):>9.3f} {entry.get('process_s', float('nan')):>10.3f}  {heavy}"
+        if entry.get("error"):
+            line += f"  [error: {entry['error']}]"
+        print(line)
+        for row in entry.get("slowest_imports") or []:
+            print(f"{'':<22} {row['self_ms'] / 1000.0:>9.3f}   {row['module']}")
+
+
+def main(script_map: dict, cli_path: str, argv: list[str]) -> int:
+    if argv[:1] == ["--probe"]:
+        if len(argv) < 2:
+            print("Usage: importtime --probe <module>", file=sys.stderr)
+            return 1
+        print(json.dumps(probe(argv[1])))
+        return 0
+
+    as_json = "--json" in argv
+    top = DEFAULT_TOP
+    names = []
+    idx = 0
+    while idx < len(argv):
+        arg = argv[idx]
+        if arg == "--top" and idx + 1 < len(argv):
+            top = int(argv[idx + 1])
+            idx += 2
+            continue
+        if not arg.startswith("--"):
+            names.append(arg)
+        idx += 1
+    unknown = [name for name in names if name not in script_map]
+    if unknown:
+        print(f"Unknown script: {', '.join(unknown)}", file=sys.stderr)
+        print(f"Available: {', '.join(sorted(script_map))}", file=sys.stderr)
+        return 1
+
+    report = run_report(script_map, os.path.abspath(cli_path), names, top=top)
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_table(report)
+    return 0
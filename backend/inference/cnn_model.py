@@ -0,0 +1,145 @@
+"""
+CNN landmark model definition used at inference time.
+
+Backbone (torchvision) + deconvolution heatmap head + soft-argmax decoder, with
+the same parameter layout as train_cnn_model's CNNLandmarkPredictor so its
+state dicts load strictly. Kept out of inference.predict so that importing the
+predictor entry points (dlib models, ONNX Runtime sessions, the worker) does
+not pull in torch/torchvision; _load_cnn_model imports this module only when an
+eager torch model is actually needed.
+"""
+
+import torch
+import torch.nn as nn
+from torchvision import models as tv_models
+
+from inference.heatmap_confidence import heatmap_confidence
+
+
+def _resolve_cnn_variant(requested_variant):
+    variant = str(requested_variant or "efficientnet_b0").strip().lower()
+    aliases = {
+        "simplebase": "resnet50",
+        "efficientnet": "efficientnet_b0",
+        "efficientnet-b0": "efficientnet_b0",
+        "mobilenet": "mobilenet_v3_large",
+        "mobilenetv3": "mobilenet_v3_large",
+        "mobilenet-v3-large": "mobilenet_v3_large",
+        "resnet": "resnet50",
+        "resnet-50": "resnet50",
+        "hrnet": "hrnet_w32",
+        "hrnet-w32": "hrnet_w32",
+        "simplebaseline": "resnet50",
+    }
+    return aliases.get(variant, variant)
+
+
+def _build_cnn_backbone(variant):
+    v = _resolve_cnn_variant(variant)
+    fallback_reason = None
+    if v == "efficientnet_b0":
+        backbone = tv_models.efficientnet_b0(weights=None)
+        return backbone.features, 1280, v, fallback_reason
+    if v == "mobilenet_v3_large":
+        backbone = tv_models.mobilenet_v3_large(weights=None)
+        return backbone.features, 960, v, fallback_reason
+    if v == "resnet50":
+        backbone = tv_models.resnet50(weights=None)
+        features = nn.Sequential(
+            backbone.conv1,
+            backbone.bn1,
+            backbone.relu,
+            backbone.maxpool,
+            backbone.layer1,
+            backbone.layer2,
+            backbone.layer3,
+            backbone.layer4,
+        )
+        return features, 2048, v, fallback_reason
+    if v == "hrnet_w32":
+        ctor = getattr(tv_models, "hrnet_w32", None)
+        if ctor is not None:
+            try:
+                backbone = ctor(weights=None)
+                if hasattr(backbone, "features"):
+                    return backbone.features, 2048, v, fallback_reason
+                fallback_reason = "torchvision_hrnet_features_unavailable_fallback_resnet50"
+            except Exception as exc:
+                fallback_reason = f"hrnet_unavailable_fallback_resnet50:{exc}"
+        else:
+            fallback_reason = "torchvision_hrnet_missing_fallback_resnet50"
+        features, feat_dim, _, _ = _build_cnn_backbone("resnet50")
+        return features, feat_dim, "resnet50", fallback_reason
+
+    fallback_reason = f"unknown_variant_{v}_fallback_efficientnet_b0"
+    features, feat_dim, _, _ = _build_cnn_backbone("efficientnet_b0")
+    return features, feat_dim, "efficientnet_b0", fallback_reason
+
+
+def _spatial_soft_argmax_2d(heatmaps, beta=25.0):
+    b, k, h, w = heatmaps.shape
+    logits = heatmaps.view(b, k, -1) * float(beta)
+    probs = torch.softmax(logits, dim=-1)
+    xs = torch.linspace(0.0, 1.0, steps=w, device=heatmaps.device, dtype=heatmaps.dtype)
+    ys = torch.linspace(0.0, 1.0, steps=h, device=heatmaps.device, dtype=heatmaps.dtype)
+    gy, gx = torch.meshgrid(ys, xs, indexing="ij")
+    gx = gx.reshape(1, 1, -1)
+    gy = gy.reshape(1, 1, -1)
+    exp_x = torch.sum(probs * gx, dim=-1)
+    exp_y = torch.sum(probs * gy, dim=-1)
+    coords = torch.stack([exp_x, exp_y], dim=-1)
+    return coords.reshape(b, k * 2)
+
+
+class CNNLandmarkPredictor(nn.Module):
+    """Backbone + deconvolution heatmap head + soft-argmax decoder."""
+    def __init__(
+        self,
+        n_landmarks,
+        model_variant="efficientnet_b0",
+        head_type="heatmap_deconv",
+        deconv_layers=3,
+        deconv_filters=256,
+        softargmax_beta=25.0,
+    ):
+        super().__init__()
+        features, feat_dim, resolved_variant, fallback_reason = _build_cnn_backbone(model_variant)
+        self.features = features
+        self.n_landmarks = int(n_landmarks)
+        self.head_type = "heatmap_deconv"
+        self.softargmax_beta = float(softargmax_beta)
+        self.deconv_layers = int(max(1, deconv_layers))
+        self.deconv_filters = int(max(32, deconv_filters))
+        self.model_variant = resolved_variant
+        self.variant_fallback_reason = fallback_reason
+
+        layers = []
+        in_ch = feat_dim
+        for _ in range(self.deconv_layers):
+            layers.extend(
+                [
+                    nn.ConvTranspose2d(
+                        in_ch,
+                        self.deconv_filters,
+                        kernel_size=4,
+                        stride=2,
+                        padding=1,
+                        bias=False,
+                    ),
+                    nn.BatchNorm2d(self.deconv_filters),
+                    nn.ReLU(inplace=True),
+                ]
+            )
+            in_ch = self.deconv_filters
+        self.deconv = nn.Sequential(*layers)
+        self.heatmap_head = nn.Conv2d(in_ch, self.n_landmarks, kernel_size=1, stride=1, padding=0)
+
+    def forward(self, x, return_confidence=False):
+        x = self.features(x)
+        up = self.deconv(x)
+        heatmaps = self.heatmap_head(up)
+        coords = _spatial_soft_argmax_2d(heatmaps, beta=self.softargmax_beta)
+        if return_confidence:
+            peak_prob, entropy = heatmap_confidence(heatmaps, beta=self.softargmax_beta)
+            return coords, peak_prob, entropy
+        return coords
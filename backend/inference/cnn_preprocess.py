@@ -0,0 +1,86 @@
+"""
+CNN input preprocessing shared by inference and train_cnn_model's evaluation loaders.
+
+Crops are normalized with the ImageNet statistics the backbones were trained
+with, i.e. exactly ToTensor() + Normalize(mean, std), but straight from uint8
+into one preallocated float32 buffer: no PIL round trip, no intermediate
+float HWC copies, and no resize when the crop is already STANDARD_SIZE.
+
+Layouts:
+    "nchw"  contiguous (N, 3, H, W); what ONNX Runtime and DataLoader collation expect
+    "nhwc"  contiguous (N, H, W, 3), the natural cv2 layout. cnn_input_tensor()
+            exposes it as an NCHW-shaped torch tensor in channels_last memory
+            format without copying, which the eager CPU convolutions run faster on.
+"""
+
+import cv2
+import numpy as np
+
+STANDARD_SIZE = 512  # same crop size as orientation_utils.STANDARD_SIZE
+CNN_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+CNN_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+# (x / 255 - mean) / std == x * _SCALE + _OFFSET, per RGB channel.
+_SCALE = (1.0 / (255.0 * CNN_STD)).astype(np.float32)
+_OFFSET = (-CNN_MEAN / CNN_STD).astype(np.float32)
+# Source channel in a BGR crop for each RGB output channel.
+_BGR_TO_RGB = (2, 1, 0)
+
+CNN_LAYOUTS = ("nchw", "nhwc")
+
+
+def normalize_crops(crops, *, bgr=True, layout="nchw", size=STANDARD_SIZE, out=None):
+    """
+    Normalize uint8 crops (HxWx3, BGR by default) into a float32 RGB batch.
+
+    Crops that are not size x size are resized (bilinear) first. `out` may be a
+    preallocated float32 array of the requested layout with room for len(crops).
+    """
+    if layout not in CNN_LAYOUTS:
+        raise ValueError(f"Unknown CNN input layout: {layout!r} (expected one of {', '.join(CNN_LAYOUTS)})")
+    size = int(size)
+    n = len(crops)
+    shape = (n, 3, size, size) if layout == "nchw" else (n, size, size, 3)
+    if out is None:
+        out = np.empty(shape, dtype=np.float32)
+    elif out.dtype != np.float32 or out.shape[0] < n or out.shape[1:] != shape[1:]:
+        raise ValueError(f"out must be float32 with shape (>={n}, {', '.join(map(str, shape[1:]))})")
+    if layout == "nhwc":
+        # One interleaved RGB row at a time keeps the inner loop unit-stride.
+        row_scale = np.tile(_SCALE, size)
+        row_offset = np.tile(_OFFSET, size)
+    for idx, crop in enumerate(crops):
+        if crop.shape[:2] != (size, size):
+            crop = cv2.resize(crop, (size, size), interpolation=cv2.INTER_LINEAR)
+        if layout == "nhwc":
+            rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB) if bgr else np.ascontiguousarray(crop)
+            dst = out[idx].reshape(size, size * 3)
+            np.multiply(rgb.reshape(size, size * 3), row_scale, out=dst, casting="unsafe")
+            np.add(dst, row_offset, out=dst)
+        else:
+            for ch in range(3):
+                src = crop[:, :, _BGR_TO_RGB[ch] if bgr else ch]
+                np.multiply(src, _SCALE[ch], out=out[idx, ch], casting="unsafe")
+                out[idx, ch] += _OFFSET[ch]
+    return out[:n]
+
+
+def cnn_input_tensor(crops, *, bgr=True, channels_last=True, size=STANDARD_SIZE):
+    """(N, 3, H, W) torch float tensor for crops; channels_last memory format by default."""
+    import torch
+
+    if channels_last:
+        return torch.from_numpy(normalize_crops(crops, bgr=bgr, layout="nhwc", size=size)).permute(0, 3, 1, 2)
+    return torch.from_numpy(normalize_crops(crops, bgr=bgr, layout="nchw", size=size))
+
+
+class NormalizeCrop:
+    """Dataset transform: one uint8 HxWx3 crop -> normalized (3, H, W) float tensor."""
+
+    def __init__(self, *, bgr=False, size=STANDARD_SIZE):
+        self.bgr = bool(bgr)
+        self.size = int(size)
+
+    def __call__(self, img):
+        import torch
+
+        return torch.from_numpy(normalize_crops([img], bgr=self.bgr, layout="nchw", size=self.size)[0])
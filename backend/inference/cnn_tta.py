@@ -0,0 +1,127 @@
+"""
+Test-time augmentation (TTA) for CNN landmark predictions.
+
+Each 512x512 crop is expanded into K geometric perturbations (identity, mirror,
+small rotations and scales, all inside the CNN training augmentation envelope).
+The K x N perturbed crops go through the model together, every prediction is
+mapped back into the unperturbed crop frame, and the K candidates per landmark
+are fused with a median. The median distance of the candidates to the fused
+point ("dispersion", crop pixels) is reported per landmark as a confidence
+signal: well-localized landmarks barely move under small perturbations.
+
+Mirrored candidates need bilateral landmark pairs swapped back, mirroring the
+channel swap train_cnn_model applies to flipped training samples.
+"""
+
+import cv2
+import numpy as np
+
+# (name, rotation degrees, scale, mirror). K selects the first K entries.
+TTA_PERTURBATIONS = (
+    ("identity", 0.0, 1.0, False),
+    ("flip", 0.0, 1.0, True),
+    ("rotate_pos", 6.0, 1.0, False),
+    ("rotate_neg", -6.0, 1.0, False),
+    ("scale_up", 0.0, 1.05, False),
+    ("scale_down", 0.0, 0.95, False),
+)
+MAX_TTA_K = len(TTA_PERTURBATIONS)
+
+
+def resolve_tta_k(value):
+    """Normalize a request/CLI TTA setting (None, bool or int) to K (0 = off)."""
+    if value is None or value is False:
+        return 0
+    if value is True:
+        return MAX_TTA_K
+    k = int(value)
+    if k <= 1:
+        return 0
+    return min(k, MAX_TTA_K)
+
+
+def build_tta_transforms(k, size):
+    """Forward and inverse 2x3 affine matrices for the first k perturbations of a size x size crop."""
+    center = ((size - 1) / 2.0, (size - 1) / 2.0)
+    mirror = np.array([[-1.0, 0.0, size - 1.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    transforms = []
+    for name, angle, scale, flip in TTA_PERTURBATIONS[:k]:
+        forward = np.vstack([cv2.getRotationMatrix2D(center, angle, scale), [0.0, 0.0, 1.0]])
+        if flip:
+            forward = forward @ mirror
+        transforms.append({
+            "name": name,
+            "flip": bool(flip),
+            "warp": bool(angle or scale != 1.0),
+            "forward": forward[:2],
+            "inverse": np.linalg.inv(forward)[:2],
+        })
+    return transforms
+
+
+def perturb_crops(crops, transforms):
+    """K perturbed copies of each crop, crop-major: [c0_t0, c0_t1, ..., c1_t0, ...]."""
+    out = []
+    for crop in crops:
+        h, w = crop.shape[:2]
+        for transform in transforms:
+            if transform["warp"]:
+                img = cv2.warpAffine(
+                    crop,
+                    transform["forward"],
+                    (w, h),
+                    flags=cv2.INTER_LINEAR,
+                    borderMode=cv2.BORDER_REPLICATE,
+                )
+            elif transform["flip"]:
+                img = cv2.flip(crop, 1)
+            else:
+                img = crop
+            out.append(img)
+    return out
+
+
+def fuse_tta_points(points, transforms, swap_index=None):
+    """
+    Map perturbed-frame predictions back and fuse them.
+
+    points: (N, K, L, 2) crop-pixel predictions on the perturbed crops.
+    swap_index: optional length-L permutation applied to mirrored candidates
+        (bilateral pair swap).
+    Returns (fused (N, L, 2), dispersion (N, L)).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    mapped = np.empty_like(points)
+    for k, transform in enumerate(transforms):
+        inverse = transform["inverse"]
+        candidate = points[:, k] @ inverse[:, :2].T + inverse[:, 2]
+        if transform["flip"] and swap_index is not None:
+            candidate = candidate[:, swap_index]
+        mapped[:, k] = candidate
+    fused = np.median(mapped, axis=1)
+    dispersion = np.median(np.linalg.norm(mapped - fused[:, None], axis=-1), axis=1)
+    return fused, dispersion
+
+
+def fuse_tta_values(values, transforms, swap_index=None):
+    """
+    Median of per-landmark values over the K candidates.
+
+    values: (N, K, L, ...) per-candidate values in perturbed landmark order;
+    mirrored candidates are re-paired with swap_index like fuse_tta_points.
+    Returns (N, L, ...).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if swap_index is not None:
+        values = values.copy()
+        for k, transform in enumerate(transforms):
+            if transform["flip"]:
+                values[:, k] = values[:, k][:, swap_index]
+    return np.median(values, axis=1)
+
+
+def bilateral_swap_index(landmark_ids, pair_swap):
+    """Permutation over landmark_ids swapping bilateral partners; None when nothing swaps."""
+    position = {int(lm_id): idx for idx, lm_id in enumerate(landmark_ids)}
+    index = [position.get(int(pair_swap.get(int(lm_id), lm_id)), idx) for idx, lm_id in enumerate(landmark_ids)]
+    return None if index == list(range(len(landmark_ids))) else np.asarray(index, dtype=np.intp)
@@ -0,0 +1,31 @@
+"""
+Per-landmark confidence from the CNN heatmap head.
+
+The soft-argmax decoder turns each landmark heatmap into a spatial probability
+distribution softmax(beta * heatmap) and returns its expectation. The same
+distribution also says how sure the model is:
+
+    peak_prob  max probability of any heatmap cell. A sharp, single peak puts
+               a large share of the mass on one cell; a flat or multi-modal map
+               spreads it out.
+    entropy    Shannon entropy of the distribution divided by log(H * W), so
+               0 = all mass on one cell and 1 = uniform over the whole crop.
+
+Both are computed inside CNNLandmarkPredictor.forward(return_confidence=True)
+from the heatmap tensor of that forward, and are exported as the extra
+"peak_prob" / "entropy" outputs of the ONNX graph.
+"""
+
+import math
+
+
+def heatmap_confidence(heatmaps, beta=25.0):
+    """(B, K, H, W) heatmaps -> (peak_prob (B, K), entropy (B, K)) torch tensors."""
+    import torch
+
+    b, k, h, w = heatmaps.shape
+    log_probs = torch.log_softmax(heatmaps.reshape(b, k, -1) * float(beta), dim=-1)
+    probs = torch.exp(log_probs)
+    peak_prob = torch.amax(probs, dim=-1)
+    entropy = -torch.sum(probs * log_probs, dim=-1) / math.log(max(2, h * w))
+    return peak_prob, entropy
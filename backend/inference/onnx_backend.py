@@ -0,0 +1,223 @@
+"""
+ONNX export and ONNX Runtime execution for CNN landmark models.
+
+train_cnn_model can export the full CNNLandmarkPredictor graph (backbone,
+deconvolution heatmap head and soft-argmax decoder) to models/cnn_{tag}.onnx
+next to cnn_{tag}.pth. At inference time _load_cnn_model prefers an ONNX
+Runtime session when onnxruntime is installed and the .onnx file is at least as
+new as the weights, and falls back to eager torch otherwise.
+
+The graph takes a normalized float32 NCHW batch ("image", dynamic batch axis)
+and returns the flat normalized [x0, y0, x1, y1, ...] coordinates ("coords"),
+exactly like CNNLandmarkPredictor.forward(), plus the per-landmark heatmap
+confidence ("peak_prob", "entropy", each (N, K)) of forward(return_confidence=True).
+Graphs exported before the confidence outputs existed still load; they report
+no confidence until re-exported.
+
+quantize_cnn_onnx() derives an int8 graph (models/cnn_{tag}.int8.onnx) from the
+float export by post-training static quantization of the backbone convolutions
+(QLinearConv). The deconvolution head stays float32: ONNX Runtime has no int8
+ConvTranspose kernel on CPU, so quantizing it only adds dequantize overhead.
+The soft-argmax decoder also stays float32; quantizing its softmax collapses
+the heatmap peak.
+"""
+
+import copy
+import importlib.util
+import os
+
+import numpy as np
+
+ONNX_OPSET = 17
+ONNX_INPUT_NAME = "image"
+ONNX_OUTPUT_NAME = "coords"
+ONNX_CONFIDENCE_OUTPUT_NAMES = ("peak_prob", "entropy")
+# Max |torch - onnxruntime| in normalized coords accepted at export (~0.05 px at 512).
+ONNX_PARITY_TOLERANCE = 1e-4
+# Op types quantized in the int8 graph (backbone convolutions only, see module docstring).
+INT8_OP_TYPES = ("Conv",)
+
+# onnxruntime itself is imported when the first session is created.
+_onnxruntime_available = importlib.util.find_spec("onnxruntime") is not None
+
+
+def onnx_model_path(project_root, tag):
+    return os.path.join(project_root, "models", f"cnn_{tag}.onnx")
+
+
+def onnx_int8_model_path(project_root, tag):
+    return os.path.join(project_root, "models", f"cnn_{tag}.int8.onnx")
+
+
+def onnx_runtime_available():
+    return _onnxruntime_available
+
+
+def is_onnx_model_current(onnx_path, weights_path):
+    """True when onnx_path exists and is not older than the torch weights it was exported from."""
+    try:
+        onnx_mtime = os.path.getmtime(onnx_path)
+    except OSError:
+        return False
+    try:
+        return onnx_mtime >= os.path.getmtime(weights_path)
+    except OSError:
+        return True
+
+
+def export_cnn_onnx(model, onnx_path, *, image_size, opset=ONNX_OPSET):
+    """
+    Export a CNN landmark model (eval mode, CPU) to onnx_path.
+
+    Writes to a temporary file first so a failed export never leaves a partial
+    graph that inference would pick up. Requires the `onnx` package.
+    """
+    import torch
+
+    class _ConfidenceGraph(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, x):
+            return self.inner(x, return_confidence=True)
+
+    model = _ConfidenceGraph(copy.deepcopy(model).to("cpu").eval()).eval()
+    output_names = [ONNX_OUTPUT_NAME, *ONNX_CONFIDENCE_OUTPUT_NAMES]
+    dummy = torch.zeros(1, 3, int(image_size), int(image_size), dtype=torch.float32)
+    tmp_path = f"{onnx_path}.tmp"
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (dummy,),
+                tmp_path,
+                input_names=[ONNX_INPUT_NAME],
+                output_names=output_names,
+                dynamic_axes={name: {0: "batch"} for name in [ONNX_INPUT_NAME, *output_names]},
+                opset_version=int(opset),
+                dynamo=False,
+            )
+        os.replace(tmp_path, onnx_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return onnx_path
+
+
+def onnx_parity_max_abs_diff(model, onnx_path, *, image_size, batch_size=2, seed=0):
+    """Max |torch - onnxruntime| over a random normalized batch."""
+    import torch
+
+    rng = np.random.default_rng(seed)
+    batch = rng.standard_normal((batch_size, 3, int(image_size), int(image_size))).astype(np.float32)
+    with torch.no_grad():
+        expected = copy.deepcopy(model).to("cpu").eval()(torch.from_numpy(batch)).numpy()
+    actual = OnnxLandmarkModel(onnx_path)(batch)
+    return float(np.max(np.abs(actual - expected)))
+
+
+class _BatchCalibrationReader:
+    """Feeds normalized NCHW batches to the onnxruntime static-quantization calibrator."""
+
+    def __init__(self, batches):
+        self._batches = iter(batches)
+
+    def get_next(self):
+        batch = next(self._batches, None)
+        if batch is None:
+            return None
+        return {ONNX_INPUT_NAME: np.ascontiguousarray(batch, dtype=np.float32)}
+
+
+def quantize_cnn_onnx(float_path, int8_path, calibration_batches):
+    """
+    Write an int8 copy of the float graph at float_path to int8_path.
+
+    calibration_batches: iterable of normalized float32 (N, 3, H, W) batches
+    (e.g. the session's training crops) used to pick activation ranges.
+    Weights are quantized per output channel; activations per tensor (uint8).
+    """
+    if not _onnxruntime_available:
+        raise RuntimeError("onnxruntime is not installed.")
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+
+    tmp_path = f"{int8_path}.tmp"
+    prep_path = f"{int8_path}.prep.onnx"
+    source_path = float_path
+    try:
+        try:
+            from onnxruntime.quantization.shape_inference import quant_pre_process
+
+            quant_pre_process(float_path, prep_path, skip_symbolic_shape=True)
+            source_path = prep_path
+        except Exception:
+            # Pre-processing (constant folding / shape inference) only helps; quantize the raw graph.
+            source_path = float_path
+        quantize_static(
+            source_path,
+            tmp_path,
+            _BatchCalibrationReader(calibration_batches),
+            quant_format=QuantFormat.QOperator,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method=CalibrationMethod.MinMax,
+            op_types_to_quantize=list(INT8_OP_TYPES),
+        )
+        os.replace(tmp_path, int8_path)
+    finally:
+        for path in (tmp_path, prep_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return int8_path
+
+
+class OnnxLandmarkModel:
+    """ONNX Runtime session with the CNNLandmarkPredictor calling convention (numpy in/out)."""
+
+    backend = "onnxruntime"
+
+    def __init__(self, onnx_path, *, model_variant=None, intra_op_threads=None, precision="float32"):
+        if not _onnxruntime_available:
+            raise RuntimeError("onnxruntime is not installed.")
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = int(intra_op_threads)
+        self.onnx_path = onnx_path
+        self.model_variant = model_variant
+        self.precision = precision
+        if precision == "int8":
+            self.backend = "onnxruntime_int8"
+        self.session = ort.InferenceSession(
+            onnx_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        output_names = {output.name for output in self.session.get_outputs()}
+        self.has_confidence = all(name in output_names for name in ONNX_CONFIDENCE_OUTPUT_NAMES)
+
+    def __call__(self, batch):
+        """batch: float32 (N, 3, H, W) normalized RGB -> (N, 2K) normalized coords."""
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run([ONNX_OUTPUT_NAME], {ONNX_INPUT_NAME: batch})[0]
+
+    def run_with_confidence(self, batch):
+        """(coords (N, 2K), peak_prob (N, K), entropy (N, K)); confidence is None for older graphs."""
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        if not self.has_confidence:
+            return self.session.run([ONNX_OUTPUT_NAME], {ONNX_INPUT_NAME: batch})[0], None, None
+        coords, peak_prob, entropy = self.session.run(
+            [ONNX_OUTPUT_NAME, *ONNX_CONFIDENCE_OUTPUT_NAMES], {ONNX_INPUT_NAME: batch}
+        )
+        return coords, peak_prob, entropy
+
+    @property
+    def estimated_bytes(self):
+        try:
+            return os.path.getsize(self.onnx_path)
+        except OSError:
+            return 0
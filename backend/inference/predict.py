@@ -2,11 +2,12 @@ import sys
 import os
 import json
 import hashlib
+import importlib.util
 import math
-import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
 from datetime import datetime
-import dlib
 import cv2
 import numpy as np
 
@@ -15,22 +16,48 @@ _BACKEND_ROOT = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
 if _BACKEND_ROOT not in _sys.path:
     _sys.path.insert(0, _BACKEND_ROOT)
 
-from detection.detect_specimen import detect_specimen
-from bv_utils.image_utils import load_image
+from detection.detect_specimen import detect_multiple_specimens, detect_specimen
+from bv_utils.image_utils import LazyImage
 import bv_utils.orientation_utils as ou
 import bv_utils.debug_io as dio
+from inference.prefetch import DEFAULT_PREFETCH_DEPTH, DEFAULT_PREFETCH_WORKERS, PrefetchPipeline
+from inference.stage_timing import NULL_TIMER
+from inference.cnn_preprocess import cnn_input_tensor, normalize_crops
+from inference.cnn_tta import (
+    bilateral_swap_index,
+    build_tta_transforms,
+    fuse_tta_points,
+    fuse_tta_values,
+    perturb_crops,
+    resolve_tta_k,
+)
+from inference.onnx_backend import (
+    OnnxLandmarkModel,
+    is_onnx_model_current,
+    onnx_int8_model_path,
+    onnx_model_path,
+    onnx_runtime_available,
+)
+from inference.prediction_cache import (
+    DEFAULT_PREDICTION_CACHE_BYTES,
+    file_content_hash,
+    open_prediction_cache,
+    prediction_cache_key,
+)
 
 STANDARD_SIZE = ou.STANDARD_SIZE
+# Upper bound on crops per CNN forward in batched inference (bounds activation memory).
+CNN_MAX_BATCH_SIZE = 32
 
-# Optional torch / torchvision for CNN predictor
-try:
-    import torch
-    import torch.nn as nn
-    from torchvision import models as tv_models
-    from torchvision import transforms as tv_transforms
-    _torch_available = True
-except ImportError:
-    _torch_available = False
+# Heavy backends are imported on first use, not at module import: dlib when a
+# dlib predictor is loaded, torch/torchvision (inference.cnn_model) when an
+# eager CNN model is loaded or run, onnxruntime when an ONNX session is created
+# and ultralytics when a detector/SAM model is needed. A dlib-only or ONNX-only
+# call therefore never pays for torch.
+_torch_available = (
+    importlib.util.find_spec("torch") is not None
+    and importlib.util.find_spec("torchvision") is not None
+)
 
 
 def _load_first_part_names_from_xml(xml_path):
@@ -356,9 +383,11 @@ def _get_sam2_model():
 
 def _infer_ultralytics_device():
     try:
-        if _torch_available and torch.cuda.is_available():
+        import torch
+
+        if torch.cuda.is_available():
             return 0
-        if _torch_available and getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+        if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
             return "mps"
     except Exception:
         pass
@@ -491,7 +520,14 @@ def _sam2_mask_for_box(image_bgr, box):
         return None
 
 
-def _build_inference_metadata(orientation_debug, *, clamped_landmark_count=0, box_source=None):
+def _build_inference_metadata(
+    orientation_debug,
+    *,
+    clamped_landmark_count=0,
+    box_source=None,
+    tta=None,
+    landmark_confidence=None,
+):
     """
     Build a stable metadata payload describing canonicalization + orientation choice.
     """
@@ -538,6 +574,8 @@ def _build_inference_metadata(orientation_debug, *, clamped_landmark_count=0, bo
         "orientation_warning": debug.get("orientation_warning"),
         "clamped_landmark_count": clamp_count,
         "box_source": box_source,
+        "tta": tta,
+        "landmark_confidence": landmark_confidence,
         "landmark_health_warning": (
             {
                 "code": "high_clamp_count",
@@ -551,6 +589,51 @@ def _build_inference_metadata(orientation_debug, *, clamped_landmark_count=0, bo
     }
 
 
+def _resolve_directional_target(target_orientation, orientation_policy):
+    resolved_target = target_orientation
+    if resolved_target not in ("left", "right"):
+        resolved_target = str((orientation_policy or {}).get("targetOrientation", "")).strip().lower()
+        if resolved_target not in ("left", "right"):
+            resolved_target = None
+    return resolved_target
+
+
+def _orientation_requires_flipped_candidate(
+    *,
+    orientation_policy,
+    canonicalization_debug,
+    target_orientation,
+    landmark_template,
+    orientation_hint,
+):
+    """
+    Return True when _predict_with_orientation_lock will evaluate the flipped crop.
+
+    Mirrors the branch order of _predict_with_orientation_lock so batched callers
+    can schedule the flipped candidate in the same forward as the primary crop.
+    """
+    orientation_mode = ou.get_orientation_mode(orientation_policy or {})
+    if orientation_mode == "directional":
+        if orientation_hint in ("left", "right"):
+            return False
+        return ou.select_orientation_requires_flipped(
+            target_orientation=_resolve_directional_target(target_orientation, orientation_policy),
+            landmark_template=landmark_template,
+        )
+    if orientation_mode == "bilateral" and orientation_hint in ("up", "down"):
+        return False
+    if ou.should_lock_orientation_from_canonicalization(
+        canonicalization_debug,
+        policy=orientation_policy,
+    ):
+        return False
+    return ou.select_orientation_requires_flipped(
+        target_orientation=target_orientation,
+        landmark_template=landmark_template,
+        orientation_hint_original=orientation_hint,
+    )
+
+
 def _predict_with_orientation_lock(
     *,
     crop_512,
@@ -562,11 +645,28 @@ def _predict_with_orientation_lock(
     head_landmark_id,
     tail_landmark_id,
     orientation_hint,
+    candidate_predictions=None,
 ):
+    """
+    Predict landmarks on crop_512 honoring the session orientation policy.
+
+    candidate_predictions optionally carries already-decoded {"primary", "flipped"}
+    landmark lists (batched inference); missing candidates fall back to predict_fn.
+    """
+    def _predict_primary():
+        if isinstance(candidate_predictions, dict):
+            return candidate_predictions.get("primary") or []
+        return predict_fn(crop_512) or []
+
+    def _predict_flipped():
+        if isinstance(candidate_predictions, dict) and candidate_predictions.get("flipped") is not None:
+            return candidate_predictions["flipped"]
+        return predict_fn(cv2.flip(crop_512, 1))
+
     orientation_mode = ou.get_orientation_mode(orientation_policy or {})
     if orientation_mode == "directional":
         if orientation_hint in ("left", "right"):
-            primary = predict_fn(crop_512) or []
+            primary = _predict_primary()
             direction_source = None
             direction_conf = None
             if isinstance(canonicalization_debug, dict):
@@ -588,15 +688,11 @@ def _predict_with_orientation_lock(
         # Legacy detector path: no orientation hint available.
         # Re-enable dual-candidate template/orientation scoring so directional
         # models do not silently mirror right-facing specimens.
-        resolved_target = target_orientation
-        if resolved_target not in ("left", "right"):
-            resolved_target = str((orientation_policy or {}).get("targetOrientation", "")).strip().lower()
-            if resolved_target not in ("left", "right"):
-                resolved_target = None
+        resolved_target = _resolve_directional_target(target_orientation, orientation_policy)
 
-        landmarks_512, was_flipped, orientation_debug = ou.select_orientation(
-            crop_512,
-            predict_fn,
+        landmarks_512, was_flipped, orientation_debug = ou.select_orientation_from_candidates(
+            _predict_primary(),
+            _predict_flipped,
             target_orientation=resolved_target,
             landmark_template=landmark_template,
             head_id=head_landmark_id,
@@ -616,7 +712,7 @@ def _predict_with_orientation_lock(
         return landmarks_512, was_flipped, orientation_debug
 
     if orientation_mode == "bilateral" and orientation_hint in ("up", "down"):
-        primary = predict_fn(crop_512) or []
+        primary = _predict_primary()
         direction_source = None
         direction_conf = None
         if isinstance(canonicalization_debug, dict):
@@ -640,7 +736,7 @@ def _predict_with_orientation_lock(
         policy=orientation_policy,
     )
     if lock_orientation:
-        primary = predict_fn(crop_512) or []
+        primary = _predict_primary()
         direction_source = None
         direction_conf = None
         if isinstance(canonicalization_debug, dict):
@@ -659,9 +755,9 @@ def _predict_with_orientation_lock(
             "orientation_hint": orientation_hint,
         }
 
-    landmarks_512, was_flipped, orientation_debug = ou.select_orientation(
-        crop_512,
-        predict_fn,
+    landmarks_512, was_flipped, orientation_debug = ou.select_orientation_from_candidates(
+        _predict_primary(),
+        _predict_flipped,
         target_orientation=target_orientation,
         landmark_template=landmark_template,
         head_id=head_landmark_id,
@@ -674,141 +770,6 @@ def _predict_with_orientation_lock(
     return landmarks_512, was_flipped, orientation_debug
 
 
-# ── CNN Landmark Predictor (configurable backbone) ─────────────────────────
-if _torch_available:
-    def _resolve_cnn_variant(requested_variant):
-        variant = str(requested_variant or "efficientnet_b0").strip().lower()
-        aliases = {
-            "simplebase": "resnet50",
-            "efficientnet": "efficientnet_b0",
-            "efficientnet-b0": "efficientnet_b0",
-            "mobilenet": "mobilenet_v3_large",
-            "mobilenetv3": "mobilenet_v3_large",
-            "mobilenet-v3-large": "mobilenet_v3_large",
-            "resnet": "resnet50",
-            "resnet-50": "resnet50",
-            "hrnet": "hrnet_w32",
-            "hrnet-w32": "hrnet_w32",
-            "simplebaseline": "resnet50",
-        }
-        return aliases.get(variant, variant)
-
-
-    def _build_cnn_backbone(variant):
-        v = _resolve_cnn_variant(variant)
-        fallback_reason = None
-        if v == "efficientnet_b0":
-            backbone = tv_models.efficientnet_b0(weights=None)
-            return backbone.features, 1280, v, fallback_reason
-        if v == "mobilenet_v3_large":
-            backbone = tv_models.mobilenet_v3_large(weights=None)
-            return backbone.features, 960, v, fallback_reason
-        if v == "resnet50":
-            backbone = tv_models.resnet50(weights=None)
-            features = nn.Sequential(
-                backbone.conv1,
-                backbone.bn1,
-                backbone.relu,
-                backbone.maxpool,
-                backbone.layer1,
-                backbone.layer2,
-                backbone.layer3,
-                backbone.layer4,
-            )
-            return features, 2048, v, fallback_reason
-        if v == "hrnet_w32":
-            ctor = getattr(tv_models, "hrnet_w32", None)
-            if ctor is not None:
-                try:
-                    backbone = ctor(weights=None)
-                    if hasattr(backbone, "features"):
-                        return backbone.features, 2048, v, fallback_reason
-                    fallback_reason = "torchvision_hrnet_features_unavailable_fallback_resnet50"
-                except Exception as exc:
-                    fallback_reason = f"hrnet_unavailable_fallback_resnet50:{exc}"
-            else:
-                fallback_reason = "torchvision_hrnet_missing_fallback_resnet50"
-            features, feat_dim, _, _ = _build_cnn_backbone("resnet50")
-            return features, feat_dim, "resnet50", fallback_reason
-
-        fallback_reason = f"unknown_variant_{v}_fallback_efficientnet_b0"
-        features, feat_dim, _, _ = _build_cnn_backbone("efficientnet_b0")
-        return features, feat_dim, "efficientnet_b0", fallback_reason
-
-
-    def _spatial_soft_argmax_2d(heatmaps, beta=25.0):
-        b, k, h, w = heatmaps.shape
-        logits = heatmaps.view(b, k, -1) * float(beta)
-        probs = torch.softmax(logits, dim=-1)
-        xs = torch.linspace(0.0, 1.0, steps=w, device=heatmaps.device, dtype=heatmaps.dtype)
-        ys = torch.linspace(0.0, 1.0, steps=h, device=heatmaps.device, dtype=heatmaps.dtype)
-        gy, gx = torch.meshgrid(ys, xs, indexing="ij")
-        gx = gx.reshape(1, 1, -1)
-        gy = gy.reshape(1, 1, -1)
-        exp_x = torch.sum(probs * gx, dim=-1)
-        exp_y = torch.sum(probs * gy, dim=-1)
-        coords = torch.stack([exp_x, exp_y], dim=-1)
-        return coords.reshape(b, k * 2)
-
-
-    class CNNLandmarkPredictor(nn.Module):
-        """Backbone + deconvolution heatmap head + soft-argmax decoder."""
-        def __init__(
-            self,
-            n_landmarks,
-            model_variant="efficientnet_b0",
-            head_type="heatmap_deconv",
-            deconv_layers=3,
-            deconv_filters=256,
-            softargmax_beta=25.0,
-        ):
-            super().__init__()
-            features, feat_dim, resolved_variant, fallback_reason = _build_cnn_backbone(model_variant)
-            self.features = features
-            self.n_landmarks = int(n_landmarks)
-            self.head_type = "heatmap_deconv"
-            self.softargmax_beta = float(softargmax_beta)
-            self.deconv_layers = int(max(1, deconv_layers))
-            self.deconv_filters = int(max(32, deconv_filters))
-            self.model_variant = resolved_variant
-            self.variant_fallback_reason = fallback_reason
-
-            layers = []
-            in_ch = feat_dim
-            for _ in range(self.deconv_layers):
-                layers.extend(
-                    [
-                        nn.ConvTranspose2d(
-                            in_ch,
-                            self.deconv_filters,
-                            kernel_size=4,
-                            stride=2,
-                            padding=1,
-                            bias=False,
-                        ),
-                        nn.BatchNorm2d(self.deconv_filters),
-                        nn.ReLU(inplace=True),
-                    ]
-                )
-                in_ch = self.deconv_filters
-            self.deconv = nn.Sequential(*layers)
-            self.heatmap_head = nn.Conv2d(in_ch, self.n_landmarks, kernel_size=1, stride=1, padding=0)
-
-        def forward(self, x):
-            x = self.features(x)
-            up = self.deconv(x)
-            heatmaps = self.heatmap_head(up)
-            return _spatial_soft_argmax_2d(heatmaps, beta=self.softargmax_beta)
-
-    _CNN_TRANSFORM = tv_transforms.Compose([
-        tv_transforms.ToPILImage(),
-        tv_transforms.Resize((STANDARD_SIZE, STANDARD_SIZE)),
-        tv_transforms.ToTensor(),
-        tv_transforms.Normalize(mean=[0.485, 0.456, 0.406],
-                                std=[0.229, 0.224, 0.225]),
-    ])
-
-
 def map_landmarks_to_original(
     landmarks_512,
     crop_meta,
@@ -836,55 +797,73 @@ def map_landmarks_to_original(
     ]
 
 
-def _clamp_landmarks_to_box(landmarks, box, *, image_shape=None):
-    if not isinstance(box, dict):
-        return landmarks, 0, []
-
+def _box_obb_corners(box):
     obb_corners = box.get("obbCorners") or box.get("obb_corners")
-    use_obb = isinstance(obb_corners, list) and len(obb_corners) == 4
-    img_h = img_w = None
+    return obb_corners if isinstance(obb_corners, list) and len(obb_corners) == 4 else None
+
+
+def _clamp_points_to_boxes(points, boxes, *, image_shape=None):
+    """
+    Array form of _clamp_landmarks_to_box for S specimens: (S, N, 2) points with
+    one box each -> (clamped, was_clamped) shaped (S, N, 2) / (S, N).
+
+    Points outside a box's OBB are projected onto its perimeter (AABB clamp when
+    the box has no OBB corners), then clipped to the image bounds. No rounding.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    clamped = pts.copy()
+    was_clamped = np.zeros(pts.shape[:-1], dtype=bool)
+    obb_corners = [_box_obb_corners(box) if isinstance(box, dict) else None for box in boxes]
+    if pts.shape[1] and obb_corners and all(corners is not None for corners in obb_corners):
+        clamped, was_clamped = ou.clamp_points_to_obb(pts, np.asarray(obb_corners, dtype=np.float64))
+    else:
+        for idx, box in enumerate(boxes):
+            if not isinstance(box, dict):
+                continue
+            if obb_corners[idx] is not None:
+                clamped[idx], was_clamped[idx] = ou.clamp_points_to_obb(pts[idx], obb_corners[idx])
+                continue
+            left = float(box.get("left", 0.0))
+            top = float(box.get("top", 0.0))
+            right = float(box.get("right", left + float(box.get("width", 0.0))))
+            bottom = float(box.get("bottom", top + float(box.get("height", 0.0))))
+            clamped[idx, :, 0] = np.maximum(left, np.minimum(right, pts[idx, :, 0]))
+            clamped[idx, :, 1] = np.maximum(top, np.minimum(bottom, pts[idx, :, 1]))
+            was_clamped[idx] = np.any(clamped[idx] != pts[idx], axis=-1)
+
     if isinstance(image_shape, (list, tuple)) and len(image_shape) >= 2:
-        img_h = int(image_shape[0])
-        img_w = int(image_shape[1])
-
-    left = float(box.get("left", 0.0))
-    top = float(box.get("top", 0.0))
-    right = float(box.get("right", left + float(box.get("width", 0.0))))
-    bottom = float(box.get("bottom", top + float(box.get("height", 0.0))))
-
-    clamped = []
-    clamped_ids = []
-    clamped_count = 0
-    for lm in landmarks or []:
-        x = float(lm.get("x", 0.0))
-        y = float(lm.get("y", 0.0))
-        new_x, new_y = x, y
-        was_clamped = False
-        if use_obb:
-            if not ou.point_in_convex_quad((x, y), obb_corners):
-                new_x, new_y = ou.project_point_to_obb_perimeter((x, y), obb_corners)
-                was_clamped = True
-        else:
-            clamped_x = max(left, min(right, x))
-            clamped_y = max(top, min(bottom, y))
-            was_clamped = (clamped_x != x) or (clamped_y != y)
-            new_x, new_y = clamped_x, clamped_y
-
-        if img_w is not None and img_w > 0:
-            new_x = max(0.0, min(float(img_w - 1), new_x))
-        if img_h is not None and img_h > 0:
-            new_y = max(0.0, min(float(img_h - 1), new_y))
-
-        if was_clamped:
-            clamped_count += 1
-            clamped_ids.append(int(lm.get("id", -1)))
-        clamped.append({
-            "id": int(lm["id"]),
-            "x": int(round(new_x)),
-            "y": int(round(new_y)),
-        })
+        img_h, img_w = int(image_shape[0]), int(image_shape[1])
+        valid = np.array([isinstance(box, dict) for box in boxes], dtype=bool)[:, None]
+        if img_w > 0:
+            clamped[..., 0] = np.where(valid, np.maximum(0.0, np.minimum(float(img_w - 1), clamped[..., 0])), clamped[..., 0])
+        if img_h > 0:
+            clamped[..., 1] = np.where(valid, np.maximum(0.0, np.minimum(float(img_h - 1), clamped[..., 1])), clamped[..., 1])
+    return clamped, was_clamped
+
+
+def _clamp_points_to_box(points, box, *, image_shape=None):
+    """Single-specimen _clamp_points_to_boxes: (N, 2) points -> (clamped, was_clamped)."""
+    pts = np.asarray(points, dtype=np.float64).reshape(1, -1, 2)
+    clamped, was_clamped = _clamp_points_to_boxes(pts, [box], image_shape=image_shape)
+    return clamped[0], was_clamped[0]
 
-    return clamped, clamped_count, clamped_ids
+
+def _clamp_landmarks_to_box(landmarks, box, *, image_shape=None):
+    if not isinstance(box, dict):
+        return landmarks, 0, []
+    landmarks = list(landmarks or [])
+    points = [[float(lm.get("x", 0.0)), float(lm.get("y", 0.0))] for lm in landmarks]
+    clamped, was_clamped = _clamp_points_to_box(points, box, image_shape=image_shape)
+    clamped_ids = [
+        int(lm.get("id", -1))
+        for lm, flag in zip(landmarks, was_clamped.tolist())
+        if flag
+    ]
+    result = [
+        {"id": int(lm["id"]), "x": int(round(x)), "y": int(round(y))}
+        for lm, (x, y) in zip(landmarks, clamped.tolist())
+    ]
+    return result, len(clamped_ids), clamped_ids
 
 
 def _normalize_input_boxes(input_boxes, scale=1.0, image_w=None, image_h=None):
@@ -959,12 +938,12 @@ def save_prediction_log(debug_dir, tag, log_entry, predictor_type="dlib"):
     """Append prediction logs to model-specific debug location (and dlib legacy path)."""
     project_root = os.path.abspath(os.path.join(debug_dir, os.pardir))
     model_key = str(predictor_type or "dlib").strip().lower()
-    dio.append_model_prediction_log(project_root, model_key, tag, log_entry, max_entries=2000)
+    dio.append_model_prediction_log(project_root, model_key, tag, log_entry)
 
-    # Preserve legacy debug file for dlib-compatible tooling.
+    # Preserve legacy debug file for dlib-compatible tooling (audit_dataset).
     if model_key == "dlib":
-        log_path = os.path.join(debug_dir, f"prediction_log_{tag}.json")
-        dio.append_json_array(log_path, log_entry, max_entries=2000)
+        log_path = os.path.join(debug_dir, f"prediction_log_{tag}.jsonl")
+        dio.append_prediction_log(log_path, log_entry)
 
 
 def _make_dlib_predict_fn(predictor, rect, index_to_original):
@@ -975,17 +954,178 @@ def _make_dlib_predict_fn(predictor, rect, index_to_original):
     return _predict
 
 
+def _cnn_forward(model, crops_512):
+    """
+    Run the CNN (eager torch or ONNX Runtime) on BGR crops.
+
+    Returns ((N, 2K) normalized coords, (N, K, 2) [peak_prob, entropy] or None).
+    Confidence is None for ONNX graphs exported before the confidence outputs existed.
+    """
+    if str(getattr(model, "backend", "")).startswith("onnxruntime"):
+        coords, peak_prob, entropy = model.run_with_confidence(normalize_crops(crops_512))
+    else:
+        import torch
+
+        batch = cnn_input_tensor(crops_512, channels_last=True)
+        with torch.no_grad():
+            coords, peak_prob, entropy = (t.cpu().numpy() for t in model(batch, return_confidence=True))
+    if peak_prob is None or entropy is None:
+        return coords, None
+    return coords, np.stack([peak_prob, entropy], axis=-1)
+
+
 def _make_cnn_predict_fn(model, landmark_ids):
     def _predict(crop_512):
-        img_rgb = cv2.cvtColor(crop_512, cv2.COLOR_BGR2RGB)
-        img_tensor = _CNN_TRANSFORM(img_rgb).unsqueeze(0)
-        with torch.no_grad():
-            coords = model(img_tensor)[0].cpu().numpy()
-        return _cnn_landmarks_from_coords(coords, landmark_ids, flip=False)
+        coords, confidence = _cnn_forward(model, [crop_512])
+        return _cnn_landmarks_from_coords(
+            coords[0], landmark_ids, flip=False, confidence=None if confidence is None else confidence[0]
+        )
 
     return _predict
 
 
+def _make_batch_predict_fn(predict_fn):
+    """Fallback batch predictor for backends without a native batched forward (dlib)."""
+    def _predict_batch(crops_512):
+        return [predict_fn(crop) for crop in crops_512]
+
+    return _predict_batch
+
+
+def _make_cnn_batch_predict_fn(model, landmark_ids, max_batch_size=CNN_MAX_BATCH_SIZE, tta_k=0, swap_index=None):
+    """
+    Batched CNN predictor: list of 512x512 BGR crops -> list of landmark lists.
+
+    All crops are stacked into one tensor and run in a single forward (chunked by
+    max_batch_size to bound activation memory on large trays).
+
+    With tta_k > 1 every crop is expanded into tta_k perturbations that share the
+    same batched forward; the median-fused landmarks carry a "tta_dispersion"
+    (crop pixels) each. swap_index re-pairs bilateral landmarks of mirrored candidates.
+    Heatmap confidence ("peak_prob", "entropy") is attached per landmark when the
+    model provides it; under TTA it is the median over the candidates.
+    """
+    max_batch_size = max(1, int(max_batch_size))
+    tta_k = resolve_tta_k(tta_k)
+    transforms = build_tta_transforms(tta_k, STANDARD_SIZE) if tta_k else None
+
+    def _forward(crops_512):
+        coords, confidence = [], []
+        for start in range(0, len(crops_512), max_batch_size):
+            chunk_coords, chunk_confidence = _cnn_forward(model, crops_512[start:start + max_batch_size])
+            coords.append(chunk_coords)
+            confidence.append(chunk_confidence)
+        if any(chunk is None for chunk in confidence):
+            return np.concatenate(coords, axis=0), None
+        return np.concatenate(coords, axis=0), np.concatenate(confidence, axis=0)
+
+    def _predict_batch(crops_512):
+        if not crops_512:
+            return []
+        if transforms is None:
+            coords, confidence = _forward(crops_512)
+            return [
+                _cnn_landmarks_from_coords(
+                    row, landmark_ids, flip=False, confidence=None if confidence is None else confidence[idx]
+                )
+                for idx, row in enumerate(coords)
+            ]
+        coords, confidence = _forward(perturb_crops(crops_512, transforms))
+        denom = float(max(1, STANDARD_SIZE - 1))
+        points = coords.reshape(len(crops_512), len(transforms), -1, 2) * denom
+        fused, dispersion = fuse_tta_points(points, transforms, swap_index)
+        fused = np.clip(fused, 0.0, float(STANDARD_SIZE - 1))
+        if confidence is not None:
+            confidence = fuse_tta_values(
+                confidence.reshape(len(crops_512), len(transforms), -1, 2), transforms, swap_index
+            )
+        results = []
+        for idx in range(len(crops_512)):
+            lms = [
+                {"id": lm_id, "x": float(x), "y": float(y), "tta_dispersion": round(float(d), 3)}
+                for lm_id, (x, y), d in zip(landmark_ids, fused[idx].tolist(), dispersion[idx].tolist())
+            ]
+            if confidence is not None:
+                _attach_landmark_confidence(lms, confidence[idx])
+            results.append(lms)
+        return results
+
+    return _predict_batch
+
+
+def _context_predict_fns(ctx, tta_k=0):
+    """
+    (predict_fn, batch_predict_fn) for a loaded context, with CNN TTA when tta_k > 1.
+
+    TTA predictors are built once per K and cached on the context. Other
+    predictor types ignore tta_k.
+    """
+    tta_k = resolve_tta_k(tta_k)
+    if not tta_k or ctx.get("predictor_type") != "cnn":
+        return ctx["predict_fn"], ctx["batch_predict_fn"]
+    cache = ctx.setdefault("tta_predict_fns", {})
+    fns = cache.get(tta_k)
+    if fns is None:
+        swap_index = None
+        policy = ctx.get("orientation_policy") or {}
+        if ou.get_orientation_mode(policy) == "bilateral":
+            swap_index = bilateral_swap_index(
+                ctx["landmark_ids"],
+                ou.build_pair_swap_map(ou.get_bilateral_pairs(policy)),
+            )
+        batch_fn = _make_cnn_batch_predict_fn(
+            ctx["model"], ctx["landmark_ids"], tta_k=tta_k, swap_index=swap_index
+        )
+        fns = cache[tta_k] = (lambda crop_512: batch_fn([crop_512])[0], batch_fn)
+    return fns
+
+
+def _tta_metadata(landmarks_512):
+    """Per-landmark TTA dispersion summary (crop pixels) for inference_metadata, or None."""
+    dispersion = {
+        int(lm["id"]): float(lm["tta_dispersion"])
+        for lm in landmarks_512 or []
+        if lm.get("tta_dispersion") is not None
+    }
+    if not dispersion:
+        return None
+    worst_id = max(dispersion, key=dispersion.get)
+    return {
+        "dispersion_px": {str(lm_id): value for lm_id, value in sorted(dispersion.items())},
+        "mean_dispersion_px": round(float(np.mean(list(dispersion.values()))), 3),
+        "max_dispersion_px": dispersion[worst_id],
+        "max_dispersion_landmark_id": worst_id,
+    }
+
+
+def _landmark_confidence_metadata(landmarks_512):
+    """
+    Heatmap confidence summary for inference_metadata, or None (dlib, older ONNX graphs).
+
+    min_peak_prob / max_entropy are the per-specimen sort keys for review queues.
+    """
+    scored = [
+        (int(lm["id"]), float(lm["peak_prob"]), float(lm["entropy"]))
+        for lm in landmarks_512 or []
+        if lm.get("peak_prob") is not None and lm.get("entropy") is not None
+    ]
+    if not scored:
+        return None
+    scored.sort()
+    peak = np.array([row[1] for row in scored])
+    entropy = np.array([row[2] for row in scored])
+    worst = int(np.argmax(entropy))
+    return {
+        "peak_prob": {str(lm_id): value for lm_id, value, _ in scored},
+        "entropy": {str(lm_id): value for lm_id, _, value in scored},
+        "min_peak_prob": float(peak.min()),
+        "mean_peak_prob": float(f"{float(peak.mean()):.4g}"),
+        "max_entropy": float(entropy.max()),
+        "mean_entropy": round(float(entropy.mean()), 5),
+        "least_confident_landmark_id": scored[worst][0],
+    }
+
+
 def _ensure_obb_box_geometry(box, *, context="box", image_shape=None):
     if not isinstance(box, dict):
         raise ValueError(f"{context} must be a dict")
@@ -1021,21 +1161,57 @@ def _ensure_obb_box_geometry(box, *, context="box", image_shape=None):
     return normalized
 
 
-def _load_and_resize_for_inference(image_path, max_dim=1500):
-    img_original, orig_w, orig_h = load_image(image_path)
-    if img_original is None:
+def _open_inference_image(image_path, max_dim=1500):
+    """
+    Open an image for detection + cropping without decoding it yet.
+
+    The detector gets a reduced-resolution decode (see LazyImage) and the
+    full-resolution image is only decoded when a box actually needs a crop, so
+    requests with provided boxes skip the detector decode and fully cached
+    images skip the full-resolution one.
+    """
+    image = LazyImage(image_path, max_dim=max_dim)
+    if image.width <= 0 or image.height <= 0:
         raise RuntimeError(f"Could not read: {image_path}")
+    return image
+
+
+def _detector_pixels(detector_img, timer=NULL_TIMER):
+    """ndarray for a detector image given as an array or a LazyImage (decoded under the "decode" stage)."""
+    if hasattr(detector_img, "detector_image"):
+        with timer.stage("decode"):
+            pixels = detector_img.detector_image()
+        if pixels is None:
+            raise RuntimeError(f"Could not read: {detector_img.path}")
+        return pixels
+    return detector_img
+
+
+def _full_res_pixels(img_original, timer=NULL_TIMER):
+    """ndarray for a full-resolution image given as an array or a LazyImage (decoded under the "decode" stage)."""
+    if hasattr(img_original, "full_image"):
+        with timer.stage("decode"):
+            pixels = img_original.full_image()
+        if pixels is None:
+            raise RuntimeError(f"Could not read: {img_original.path}")
+        return pixels
+    return img_original
 
-    scale = 1.0
-    detector_w, detector_h = orig_w, orig_h
-    img_detector = img_original
-    if max(orig_w, orig_h) > max_dim:
-        scale = max_dim / max(orig_w, orig_h)
-        detector_w = int(orig_w * scale)
-        detector_h = int(orig_h * scale)
-        img_detector = cv2.resize(img_original, (detector_w, detector_h), interpolation=cv2.INTER_AREA)
 
-    return img_original, img_detector, orig_w, orig_h, scale, detector_w, detector_h
+def _load_and_resize_for_inference(image_path, max_dim=1500):
+    """Eager variant of _open_inference_image(): both resolutions decoded up front."""
+    image = _open_inference_image(image_path, max_dim=max_dim)
+    img_original = _full_res_pixels(image)
+    img_detector = _detector_pixels(image)
+    return (
+        img_original,
+        img_detector,
+        image.width,
+        image.height,
+        image.scale,
+        image.detector_width,
+        image.detector_height,
+    )
 
 
 def _detect_single_obb_box(
@@ -1050,56 +1226,46 @@ def _detect_single_obb_box(
     input_box=None,
     original_w=None,
     original_h=None,
+    timer=NULL_TIMER,
 ):
-    temp_path = None
-    try:
-        if input_box is not None:
-            normalized = _normalize_input_box(
-                input_box,
-                scale=1.0,
-                image_w=original_w,
-                image_h=original_h,
-            )
-            return _ensure_obb_box_geometry(
-                normalized,
-                context="input_box",
-                image_shape=(original_h, original_w),
-            )
-
-        if not yolo_model_path:
-            raise RuntimeError("OBB detector required: no detector model path was provided.")
-
-        detection_path = image_path
-        if scale != 1.0:
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".png")
-            os.close(temp_fd)
-            cv2.imwrite(temp_path, detector_img)
-            detection_path = temp_path
-
-        detected = detect_specimen(
-            detection_path,
-            margin=20,
-            yolo_model_path=yolo_model_path,
-            orientation_policy=orientation_policy,
-        )
-        if detected is None:
-            raise RuntimeError("OBB detector produced no detections.")
-        detected = _ensure_obb_box_geometry(
-            detected,
-            context="detected box",
-            image_shape=(detector_h, detector_w),
+    if input_box is not None:
+        normalized = _normalize_input_box(
+            input_box,
+            scale=1.0,
+            image_w=original_w,
+            image_h=original_h,
         )
-        if scale != 1.0:
-            detected = _scale_box_to_original(detected, scale)
-        detected = _ensure_obb_box_geometry(
-            detected,
-            context="detected box (original space)",
+        return _ensure_obb_box_geometry(
+            normalized,
+            context="input_box",
             image_shape=(original_h, original_w),
         )
-        return detected
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+
+    if not yolo_model_path:
+        raise RuntimeError("OBB detector required: no detector model path was provided.")
+
+    # The (possibly downscaled) detector image goes to YOLO as an ndarray.
+    detected = detect_specimen(
+        _detector_pixels(detector_img, timer),
+        margin=20,
+        yolo_model_path=yolo_model_path,
+        orientation_policy=orientation_policy,
+    )
+    if detected is None:
+        raise RuntimeError("OBB detector produced no detections.")
+    detected = _ensure_obb_box_geometry(
+        detected,
+        context="detected box",
+        image_shape=(detector_h, detector_w),
+    )
+    if scale != 1.0:
+        detected = _scale_box_to_original(detected, scale)
+    detected = _ensure_obb_box_geometry(
+        detected,
+        context="detected box (original space)",
+        image_shape=(original_h, original_w),
+    )
+    return detected
 
 
 def _detect_multi_obb_boxes(
@@ -1115,6 +1281,7 @@ def _detect_multi_obb_boxes(
     min_area_ratio=0.02,
     original_w=None,
     original_h=None,
+    timer=NULL_TIMER,
 ):
     if isinstance(input_boxes, list) and input_boxes:
         normalized_boxes = _normalize_input_boxes(
@@ -1135,49 +1302,181 @@ def _detect_multi_obb_boxes(
     if not yolo_model_path:
         raise RuntimeError("OBB detector required: no detector model path was provided.")
 
-    temp_path = None
-    try:
-        detection_path = image_path
+    detection_result = detect_multiple_specimens(
+        _detector_pixels(detector_img, timer),
+        min_area_ratio=min_area_ratio,
+        yolo_model_path=yolo_model_path,
+        orientation_policy=orientation_policy,
+    )
+    detected_boxes = detection_result.get("boxes", []) if isinstance(detection_result, dict) else []
+    if not detected_boxes:
+        raise RuntimeError("OBB detector produced no detections.")
+
+    boxes_original = []
+    for idx, box in enumerate(detected_boxes):
+        normalized = _ensure_obb_box_geometry(
+            box,
+            context=f"detected_boxes[{idx}]",
+            image_shape=(detector_h, detector_w),
+        )
         if scale != 1.0:
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".png")
-            os.close(temp_fd)
-            cv2.imwrite(temp_path, detector_img)
-            detection_path = temp_path
-
-        detection_result = detect_multiple_specimens(
-            detection_path,
-            min_area_ratio=min_area_ratio,
-            yolo_model_path=yolo_model_path,
-            orientation_policy=orientation_policy,
+            normalized = _scale_box_to_original(normalized, scale)
+        normalized = _ensure_obb_box_geometry(
+            normalized,
+            context=f"detected_boxes[{idx}] (original space)",
+            image_shape=(original_h, original_w),
         )
-        detected_boxes = detection_result.get("boxes", []) if isinstance(detection_result, dict) else []
-        if not detected_boxes:
-            raise RuntimeError("OBB detector produced no detections.")
-
-        boxes_original = []
-        for idx, box in enumerate(detected_boxes):
-            normalized = _ensure_obb_box_geometry(
-                box,
-                context=f"detected_boxes[{idx}]",
-                image_shape=(detector_h, detector_w),
-            )
-            if scale != 1.0:
-                normalized = _scale_box_to_original(normalized, scale)
-            normalized = _ensure_obb_box_geometry(
-                normalized,
-                context=f"detected_boxes[{idx}] (original space)",
-                image_shape=(original_h, original_w),
-            )
-            boxes_original.append(normalized)
+        boxes_original.append(normalized)
 
-        return {
-            "boxes": boxes_original,
-            "detection_method": detection_result.get("detection_method", "yolo_obb"),
-            "fallback_reason": detection_result.get("error"),
-        }
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+    return {
+        "boxes": boxes_original,
+        "detection_method": detection_result.get("detection_method", "yolo_obb"),
+        "fallback_reason": detection_result.get("error"),
+    }
+
+
+def _prepare_obb_inference_crop(img_original, box, orientation_policy, timer=NULL_TIMER):
+    """Extract the standardized (and canonicalized) 512x512 crop for one OBB box."""
+    orientation_hint = _resolve_orientation_hint_from_box(
+        box,
+        min_confidence=0.25,
+        min_dx_ratio=0.06,
+    )
+    apply_leveling = (orientation_policy.get("obbLevelingMode", "on") == "on")
+    with timer.stage("crop"):
+        cropped, crop_meta = ou.extract_standardized_obb_crop(
+            _full_res_pixels(img_original, timer),
+            box["obbCorners"],
+            apply_leveling=apply_leveling,
+        )
+        cropped, crop_meta, canonicalization_debug = ou.apply_obb_geometry(
+            cropped,
+            crop_meta,
+            int(box.get("class_id", 0)),
+            orientation_policy,
+        )
+    if isinstance(canonicalization_debug, dict):
+        canonicalization_debug["source"] = "obb_geometry"
+    return {
+        "crop_512": cropped,
+        "crop_meta": crop_meta,
+        "canonicalization_debug": canonicalization_debug,
+        "orientation_hint": orientation_hint,
+    }
+
+
+def _mapped_landmark_dicts(landmarks_512, mapped_points):
+    """Pair mapped (N, 2) points with landmark ids, rounded like map_landmarks_to_original."""
+    return [
+        {"id": int(lm["id"]), "x": float(round(float(x), 1)), "y": float(round(float(y), 1))}
+        for lm, (x, y) in zip(landmarks_512, np.asarray(mapped_points).tolist())
+    ]
+
+
+def _build_obb_result(
+    *,
+    prepared,
+    box,
+    was_flipped,
+    orientation_debug,
+    mapped_landmarks,
+    clamped_points,
+    was_clamped,
+    orig_h,
+    orig_w,
+    detector_scale,
+    detector_w,
+    detector_h,
+    landmarks_512=None,
+):
+    if isinstance(orientation_debug, dict):
+        orientation_debug["canonicalization"] = prepared["canonicalization_debug"]
+        orientation_debug["was_flipped"] = bool(was_flipped)
+        orientation_debug["orientation_hint"] = prepared["orientation_hint"]
+        orientation_debug["orientation_hint_raw"] = box.get("orientation_hint")
+
+    clamped_landmark_ids = [
+        int(lm["id"])
+        for lm, flag in zip(mapped_landmarks, np.asarray(was_clamped).tolist())
+        if flag
+    ]
+    clamped_landmark_count = len(clamped_landmark_ids)
+    landmarks = sorted(
+        (
+            {"id": int(lm["id"]), "x": int(round(x)), "y": int(round(y))}
+            for lm, (x, y) in zip(mapped_landmarks, np.asarray(clamped_points).tolist())
+        ),
+        key=lambda lm: lm["id"],
+    )
+    return {
+        "landmarks": landmarks,
+        "detected_box": dict(box),
+        "orientation_hint": box.get("orientation_hint"),
+        "orientation_debug": orientation_debug,
+        "inference_metadata": _build_inference_metadata(
+            orientation_debug,
+            clamped_landmark_count=clamped_landmark_count,
+            box_source=box.get("detection_method", "provided_obb"),
+            tta=_tta_metadata(landmarks_512),
+            landmark_confidence=_landmark_confidence_metadata(landmarks_512),
+        ),
+        "clamped_landmark_count": clamped_landmark_count,
+        "clamped_landmark_ids": clamped_landmark_ids,
+        "pre_clamp_landmarks": mapped_landmarks if clamped_landmark_count > 0 else None,
+        "resolution_debug": {
+            "detector_image_size": {"width": int(detector_w), "height": int(detector_h)},
+            "original_image_size": {"width": int(orig_w), "height": int(orig_h)},
+            "detector_scale": float(detector_scale),
+            "crop_extracted_from_original": True,
+            "crop_box_obb_corners": [
+                [float(point[0]), float(point[1])]
+                for point in (box.get("obbCorners") or [])
+            ] if isinstance(box.get("obbCorners"), list) else None,
+        },
+    }
+
+
+def _finalize_obb_inference(
+    *,
+    prepared,
+    box,
+    landmarks_512,
+    was_flipped,
+    orientation_debug,
+    orig_h,
+    orig_w,
+    detector_scale,
+    detector_w,
+    detector_h,
+):
+    """Map crop-space landmarks back to the original image and build the box result."""
+    mapped_landmarks = map_landmarks_to_original(
+        landmarks_512,
+        prepared["crop_meta"],
+        1.0,
+        was_flipped,
+        image_shape=(orig_h, orig_w),
+    )
+    clamped_points, was_clamped = _clamp_points_to_box(
+        [[lm["x"], lm["y"]] for lm in mapped_landmarks],
+        box,
+        image_shape=(orig_h, orig_w),
+    )
+    return _build_obb_result(
+        prepared=prepared,
+        box=box,
+        was_flipped=was_flipped,
+        orientation_debug=orientation_debug,
+        mapped_landmarks=mapped_landmarks,
+        clamped_points=clamped_points,
+        was_clamped=was_clamped,
+        orig_h=orig_h,
+        orig_w=orig_w,
+        detector_scale=detector_scale,
+        detector_w=detector_w,
+        detector_h=detector_h,
+        landmarks_512=landmarks_512,
+    )
 
 
 def _run_obb_inference_on_box(
@@ -1195,85 +1494,353 @@ def _run_obb_inference_on_box(
     landmark_template,
     head_landmark_id,
     tail_landmark_id,
+    timer=NULL_TIMER,
 ):
-    orientation_hint = _resolve_orientation_hint_from_box(
-        box,
-        min_confidence=0.25,
-        min_dx_ratio=0.06,
+    prepared = _prepare_obb_inference_crop(img_original, box, orientation_policy, timer=timer)
+    with timer.stage("select_orientation"):
+        landmarks_512, was_flipped, orientation_debug = _predict_with_orientation_lock(
+            crop_512=prepared["crop_512"],
+            predict_fn=timer.wrap("model", predict_fn),
+            orientation_policy=orientation_policy,
+            canonicalization_debug=prepared["canonicalization_debug"],
+            target_orientation=target_orientation,
+            landmark_template=landmark_template,
+            head_landmark_id=head_landmark_id,
+            tail_landmark_id=tail_landmark_id,
+            orientation_hint=prepared["orientation_hint"],
+        )
+    with timer.stage("map"):
+        return _finalize_obb_inference(
+            prepared=prepared,
+            box=box,
+            landmarks_512=landmarks_512,
+            was_flipped=was_flipped,
+            orientation_debug=orientation_debug,
+            orig_h=orig_h,
+            orig_w=orig_w,
+            detector_scale=detector_scale,
+            detector_w=detector_w,
+            detector_h=detector_h,
+        )
+
+
+def _prepare_obb_batch(
+    img_original,
+    boxes,
+    *,
+    orientation_policy,
+    target_orientation,
+    landmark_template,
+    timer=NULL_TIMER,
+):
+    """
+    Prepare standardized crops for all boxes of one image for a batched forward.
+
+    Returns (prepared_boxes, batch_crops). Each prepared box records the index of
+    its primary crop (and flipped candidate, when orientation selection needs it)
+    inside batch_crops.
+    """
+    prepared_boxes = []
+    batch_crops = []
+    for box in boxes:
+        prepared = _prepare_obb_inference_crop(img_original, box, orientation_policy, timer=timer)
+        prepared["primary_index"] = len(batch_crops)
+        batch_crops.append(prepared["crop_512"])
+        prepared["flipped_index"] = None
+        if _orientation_requires_flipped_candidate(
+            orientation_policy=orientation_policy,
+            canonicalization_debug=prepared["canonicalization_debug"],
+            target_orientation=target_orientation,
+            landmark_template=landmark_template,
+            orientation_hint=prepared["orientation_hint"],
+        ):
+            prepared["flipped_index"] = len(batch_crops)
+            with timer.stage("crop"):
+                batch_crops.append(cv2.flip(prepared["crop_512"], 1))
+        prepared_boxes.append(prepared)
+    return prepared_boxes, batch_crops
+
+
+def _finalize_obb_batch(
+    *,
+    boxes,
+    prepared_boxes,
+    batch_predictions,
+    orig_h,
+    orig_w,
+    detector_scale,
+    detector_w,
+    detector_h,
+    orientation_policy,
+    predict_fn,
+    target_orientation,
+    landmark_template,
+    head_landmark_id,
+    tail_landmark_id,
+    timer=NULL_TIMER,
+):
+    """
+    Run orientation selection + mapping on decoded batch predictions.
+
+    Unflip/unscale/uncrop/inverse-affine and box clamping run once over an
+    (S, N, 2) array for all specimens of the image when they share a landmark
+    layout; otherwise each specimen is mapped on its own.
+    """
+    selections = []
+    # Fallback forwards issued during orientation selection count as model time.
+    timed_predict_fn = timer.wrap("model", predict_fn)
+    for box, prepared in zip(boxes, prepared_boxes):
+        flipped_index = prepared["flipped_index"]
+        candidate_predictions = {
+            "primary": batch_predictions[prepared["primary_index"]],
+            "flipped": batch_predictions[flipped_index] if flipped_index is not None else None,
+        }
+        with timer.stage("select_orientation"):
+            selections.append(_predict_with_orientation_lock(
+                crop_512=prepared["crop_512"],
+                predict_fn=timed_predict_fn,
+                orientation_policy=orientation_policy,
+                canonicalization_debug=prepared["canonicalization_debug"],
+                target_orientation=target_orientation,
+                landmark_template=landmark_template,
+                head_landmark_id=head_landmark_id,
+                tail_landmark_id=tail_landmark_id,
+                orientation_hint=prepared["orientation_hint"],
+                candidate_predictions=candidate_predictions,
+            ))
+    geometry = dict(
+        orig_h=orig_h,
+        orig_w=orig_w,
+        detector_scale=detector_scale,
+        detector_w=detector_w,
+        detector_h=detector_h,
     )
-    apply_leveling = (orientation_policy.get("obbLevelingMode", "on") == "on")
-    cropped, crop_meta = ou.extract_standardized_obb_crop(
-        img_original,
-        box["obbCorners"],
-        apply_leveling=apply_leveling,
+    with timer.stage("map"):
+        return _map_obb_selections(boxes, prepared_boxes, selections, geometry)
+
+
+def _map_obb_selections(boxes, prepared_boxes, selections, geometry):
+    """Map the selected crop-space landmarks of one image back to original coordinates."""
+    orig_h, orig_w = geometry["orig_h"], geometry["orig_w"]
+    landmark_counts = {len(landmarks_512) for landmarks_512, _, _ in selections}
+    if len(selections) < 2 or len(landmark_counts) != 1 or 0 in landmark_counts:
+        return [
+            _finalize_obb_inference(
+                prepared=prepared,
+                box=box,
+                landmarks_512=landmarks_512,
+                was_flipped=was_flipped,
+                orientation_debug=orientation_debug,
+                **geometry,
+            )
+            for box, prepared, (landmarks_512, was_flipped, orientation_debug)
+            in zip(boxes, prepared_boxes, selections)
+        ]
+
+    points_512 = np.array(
+        [[[float(lm["x"]), float(lm["y"])] for lm in landmarks_512] for landmarks_512, _, _ in selections],
+        dtype=np.float64,
     )
-    cropped, crop_meta, canonicalization_debug = ou.apply_obb_geometry(
-        cropped,
-        crop_meta,
-        int(box.get("class_id", 0)),
-        orientation_policy,
+    mapped = ou.map_points_to_original(
+        points_512,
+        [prepared["crop_meta"] for prepared in prepared_boxes],
+        was_flipped=[was_flipped for _, was_flipped, _ in selections],
+        image_shape=(orig_h, orig_w),
     )
-    if isinstance(canonicalization_debug, dict):
-        canonicalization_debug["source"] = "obb_geometry"
+    mapped_landmarks = [
+        _mapped_landmark_dicts(landmarks_512, mapped[idx])
+        for idx, (landmarks_512, _, _) in enumerate(selections)
+    ]
+    # Clamp on the 0.1 px-rounded coordinates, as the per-specimen path does.
+    rounded = np.array(
+        [[[lm["x"], lm["y"]] for lm in specimen] for specimen in mapped_landmarks],
+        dtype=np.float64,
+    )
+    clamped, was_clamped = _clamp_points_to_boxes(rounded, boxes, image_shape=(orig_h, orig_w))
+    return [
+        _build_obb_result(
+            prepared=prepared,
+            box=box,
+            was_flipped=was_flipped,
+            orientation_debug=orientation_debug,
+            mapped_landmarks=mapped_landmarks[idx],
+            clamped_points=clamped[idx],
+            was_clamped=was_clamped[idx],
+            landmarks_512=landmarks_512,
+            **geometry,
+        )
+        for idx, (box, prepared, (landmarks_512, was_flipped, orientation_debug))
+        in enumerate(zip(boxes, prepared_boxes, selections))
+    ]
 
-    landmarks_512, was_flipped, orientation_debug = _predict_with_orientation_lock(
-        crop_512=cropped,
-        predict_fn=predict_fn,
+
+def _enable_prediction_cache(ctx, max_bytes=DEFAULT_PREDICTION_CACHE_BYTES):
+    """
+    Attach the project's on-disk prediction cache to a loaded context (max_bytes=0 disables).
+
+    Entries are scoped to the content hash of the model file, so opening a
+    retrained model drops the entries of the previous one.
+    """
+    if not max_bytes:
+        ctx.pop("prediction_cache", None)
+        return None
+    cache = open_prediction_cache(ctx["project_root"], max_bytes)
+    if ctx.get("prediction_cache") is not cache:
+        ctx["prediction_namespace"] = cache.namespace(
+            ctx["predictor_type"], ctx["tag"], file_content_hash(ctx["model_path"])
+        )
+        ctx["prediction_cache"] = cache
+    return cache
+
+
+def _prediction_cache_params(ctx, tta_k=0):
+    """Inference settings besides image, box and model that change a box's prediction."""
+    return {
+        "predictor_backend": ctx.get("predictor_backend"),
+        "tta_k": resolve_tta_k(tta_k) if ctx.get("predictor_type") == "cnn" else 0,
+        "orientation_policy": ctx.get("orientation_policy") or {},
+    }
+
+
+def _prepare_obb_batch_with_cache(ctx, image_path, img_original, boxes, *, tta_k=0, use_cache=True, timer=NULL_TIMER):
+    """
+    _prepare_obb_batch for the boxes of one image that have no cached prediction.
+
+    Returns a dict with "pending_boxes" / "prepared_boxes" / "batch_crops" (the
+    boxes that still need a forward) plus the per-box "cached_predictions"
+    (None for misses) and "cache_keys" consumed by _finalize_obb_batch_with_cache.
+    Without a prediction cache on ctx every box is pending.
+    """
+    cache = ctx.get("prediction_cache") if use_cache else None
+    cache_keys = [None] * len(boxes)
+    cached_predictions = [None] * len(boxes)
+    if cache is not None and boxes:
+        with timer.stage("cache"):
+            image_hash = file_content_hash(image_path)
+            params = _prediction_cache_params(ctx, tta_k)
+            for idx, box in enumerate(boxes):
+                cache_keys[idx] = prediction_cache_key(image_hash, box, params)
+                cached_predictions[idx] = cache.get(ctx["prediction_namespace"], cache_keys[idx])
+    pending_boxes = [box for box, cached in zip(boxes, cached_predictions) if cached is None]
+    prepared_boxes, batch_crops = _prepare_obb_batch(
+        img_original,
+        pending_boxes,
+        orientation_policy=ctx["orientation_policy"],
+        target_orientation=ctx["target_orientation"],
+        landmark_template=ctx["landmark_template"],
+        timer=timer,
+    )
+    return {
+        "boxes": boxes,
+        "pending_boxes": pending_boxes,
+        "prepared_boxes": prepared_boxes,
+        "batch_crops": batch_crops,
+        "cached_predictions": cached_predictions,
+        "cache_keys": cache_keys,
+        "cache_hits": sum(cached is not None for cached in cached_predictions),
+    }
+
+
+def _finalize_obb_batch_with_cache(ctx, state, batch_predictions, *, predict_fn, timer=NULL_TIMER):
+    """
+    _finalize_obb_batch for the pending boxes of a _prepare_obb_batch_with_cache state,
+    merged with the cached predictions in box order. Fresh predictions are stored.
+    """
+    fresh = []
+    if state["pending_boxes"]:
+        fresh = _finalize_obb_batch(
+            boxes=state["pending_boxes"],
+            prepared_boxes=state["prepared_boxes"],
+            batch_predictions=batch_predictions,
+            orig_h=state["orig_h"],
+            orig_w=state["orig_w"],
+            detector_scale=state["scale"],
+            detector_w=state["detector_w"],
+            detector_h=state["detector_h"],
+            orientation_policy=ctx["orientation_policy"],
+            predict_fn=predict_fn,
+            target_orientation=ctx["target_orientation"],
+            landmark_template=ctx["landmark_template"],
+            head_landmark_id=ctx["head_landmark_id"],
+            tail_landmark_id=ctx["tail_landmark_id"],
+            timer=timer,
+        )
+    cache = ctx.get("prediction_cache")
+    fresh_iter = iter(fresh)
+    obb_predictions = []
+    for box, key, cached in zip(state["boxes"], state["cache_keys"], state["cached_predictions"]):
+        if cached is not None:
+            # The key ignores box fields that do not affect the landmarks (ids, labels).
+            cached["detected_box"] = dict(box)
+            cached["orientation_hint"] = box.get("orientation_hint")
+            if isinstance(cached.get("inference_metadata"), dict):
+                cached["inference_metadata"]["box_source"] = box.get("detection_method", "provided_obb")
+            obb_predictions.append(cached)
+            continue
+        obb_prediction = next(fresh_iter)
+        if cache is not None and key is not None:
+            with timer.stage("cache"):
+                try:
+                    cache.put(ctx["prediction_namespace"], key, obb_prediction)
+                except OSError as exc:
+                    print(f"Warning: could not write prediction cache entry: {exc}", file=sys.stderr)
+        obb_predictions.append(obb_prediction)
+    return obb_predictions
+
+
+def _run_obb_inference_on_boxes_batched(
+    *,
+    img_original,
+    boxes,
+    orig_h,
+    orig_w,
+    detector_scale,
+    detector_w,
+    detector_h,
+    orientation_policy,
+    predict_fn,
+    batch_predict_fn,
+    target_orientation,
+    landmark_template,
+    head_landmark_id,
+    tail_landmark_id,
+    timer=NULL_TIMER,
+):
+    """
+    Batched counterpart of _run_obb_inference_on_box for all boxes of one image.
+
+    Every standardized crop (plus its flipped candidate when orientation selection
+    needs one) goes through batch_predict_fn in a single call; orientation
+    selection then runs on the decoded coordinates. Per-box results match
+    _run_obb_inference_on_box.
+    """
+    prepared_boxes, batch_crops = _prepare_obb_batch(
+        img_original,
+        boxes,
+        orientation_policy=orientation_policy,
+        target_orientation=target_orientation,
+        landmark_template=landmark_template,
+        timer=timer,
+    )
+    with timer.stage("model"):
+        batch_predictions = batch_predict_fn(batch_crops) if batch_crops else []
+    return _finalize_obb_batch(
+        boxes=boxes,
+        prepared_boxes=prepared_boxes,
+        batch_predictions=batch_predictions,
+        orig_h=orig_h,
+        orig_w=orig_w,
+        detector_scale=detector_scale,
+        detector_w=detector_w,
+        detector_h=detector_h,
         orientation_policy=orientation_policy,
-        canonicalization_debug=canonicalization_debug,
+        predict_fn=predict_fn,
         target_orientation=target_orientation,
         landmark_template=landmark_template,
         head_landmark_id=head_landmark_id,
         tail_landmark_id=tail_landmark_id,
-        orientation_hint=orientation_hint,
-    )
-    if isinstance(orientation_debug, dict):
-        orientation_debug["canonicalization"] = canonicalization_debug
-        orientation_debug["was_flipped"] = bool(was_flipped)
-        orientation_debug["orientation_hint"] = orientation_hint
-        orientation_debug["orientation_hint_raw"] = box.get("orientation_hint")
-
-    mapped_landmarks = map_landmarks_to_original(
-        landmarks_512,
-        crop_meta,
-        1.0,
-        was_flipped,
-        image_shape=(orig_h, orig_w),
-    )
-    pre_clamp_landmarks = [
-        {"id": int(lm["id"]), "x": float(lm["x"]), "y": float(lm["y"])}
-        for lm in mapped_landmarks
-    ]
-    landmarks, clamped_landmark_count, clamped_landmark_ids = _clamp_landmarks_to_box(
-        mapped_landmarks,
-        box,
-        image_shape=(orig_h, orig_w),
+        timer=timer,
     )
-    landmarks = sorted(landmarks, key=lambda lm: lm["id"])
-    return {
-        "landmarks": landmarks,
-        "detected_box": dict(box),
-        "orientation_hint": box.get("orientation_hint"),
-        "orientation_debug": orientation_debug,
-        "inference_metadata": _build_inference_metadata(
-            orientation_debug,
-            clamped_landmark_count=clamped_landmark_count,
-            box_source=box.get("detection_method", "provided_obb"),
-        ),
-        "clamped_landmark_count": clamped_landmark_count,
-        "clamped_landmark_ids": clamped_landmark_ids,
-        "pre_clamp_landmarks": pre_clamp_landmarks if clamped_landmark_count > 0 else None,
-        "resolution_debug": {
-            "detector_image_size": {"width": int(detector_w), "height": int(detector_h)},
-            "original_image_size": {"width": int(orig_w), "height": int(orig_h)},
-            "detector_scale": float(detector_scale),
-            "crop_extracted_from_original": True,
-            "crop_box_obb_corners": [
-                [float(point[0]), float(point[1])]
-                for point in (box.get("obbCorners") or [])
-            ] if isinstance(box.get("obbCorners"), list) else None,
-        },
-    }
 
 
 def predict_image(project_root, tag, image_path, yolo_model_path=None, input_box=None):
@@ -1325,13 +1892,15 @@ def predict_image(project_root, tag, image_path, yolo_model_path=None, input_box
 
     print("PROGRESS 10 loading_model", file=sys.stderr)
 
-    img_original, img_detector, orig_w, orig_h, scale, detector_w, detector_h = _load_and_resize_for_inference(image_path)
+    image = _open_inference_image(image_path)
+    orig_w, orig_h = image.width, image.height
+    scale, detector_w, detector_h = image.scale, image.detector_width, image.detector_height
     img_hash = hashlib.md5(open(image_path, 'rb').read(1000)).hexdigest()[:8]
 
     print("PROGRESS 30 detecting", file=sys.stderr)
     detected = _detect_single_obb_box(
         image_path,
-        img_detector,
+        image,
         scale,
         detector_w,
         detector_h,
@@ -1342,13 +1911,15 @@ def predict_image(project_root, tag, image_path, yolo_model_path=None, input_box
         original_h=orig_h,
     )
 
+    import dlib
+
     # Run dlib on the standardized 512x512 image (full-image rect)
     rect = dlib.rectangle(0, 0, STANDARD_SIZE, STANDARD_SIZE)
     predictor = dlib.shape_predictor(predictor_path)
     predict_fn = _make_dlib_predict_fn(predictor, rect, index_to_original)
     print("PROGRESS 65 predicting", file=sys.stderr)
     obb_prediction = _run_obb_inference_on_box(
-        img_original=img_original,
+        img_original=image,
         box=detected,
         orig_h=orig_h,
         orig_w=orig_w,
@@ -1449,10 +2020,12 @@ def predict_multi_specimen(
         head_landmark_id = _resolve_head_landmark_id(project_root, None)
 
     print("PROGRESS 10 loading_model", file=sys.stderr)
-    img_original, img_detector, orig_w, orig_h, scale, detector_w, detector_h = _load_and_resize_for_inference(image_path)
+    image = _open_inference_image(image_path)
+    orig_w, orig_h = image.width, image.height
+    scale, detector_w, detector_h = image.scale, image.detector_width, image.detector_height
     detection_result = _detect_multi_obb_boxes(
         image_path,
-        img_detector,
+        image,
         scale,
         detector_w,
         detector_h,
@@ -1476,6 +2049,8 @@ def predict_multi_specimen(
             "detection_method": detection_result.get("detection_method", "yolo_obb"),
         }
 
+    import dlib
+
     # Load dlib predictor
     predictor = dlib.shape_predictor(predictor_path)
     rect = dlib.rectangle(0, 0, STANDARD_SIZE, STANDARD_SIZE)
@@ -1487,7 +2062,7 @@ def predict_multi_specimen(
         pct = 40 + int(45 * (box_idx / max(len(detected_boxes), 1)))
         print(f"PROGRESS {pct} predicting", file=sys.stderr)
         obb_prediction = _run_obb_inference_on_box(
-            img_original=img_original,
+            img_original=image,
             box=box,
             orig_h=orig_h,
             orig_w=orig_w,
@@ -1549,18 +2124,16 @@ def predict_multi_specimen(
 
 # ── CNN inference paths ────────────────────────────────────────────────────────
 
-def _load_cnn_model(project_root, tag):
+def _load_cnn_model(project_root, tag, prefer_onnx=True):
     """
     Load CNN model + config + orientation metadata.
 
+    prefer_onnx=False always returns the eager torch model (used to re-export
+    and to measure the float reference when quantizing).
+
     Returns:
         (model, landmark_ids, target_orientation, landmark_template, head_landmark_id, tail_landmark_id)
     """
-    if not _torch_available:
-        raise RuntimeError(
-            "torch/torchvision not installed. Cannot use CNN predictor. "
-            "Install with: pip install torch torchvision"
-        )
     modeldir = os.path.join(project_root, "models")
     model_path = os.path.join(modeldir, f"cnn_{tag}.pth")
     config_path = os.path.join(modeldir, f"cnn_{tag}_config.json")
@@ -1589,22 +2162,49 @@ def _load_cnn_model(project_root, tag):
     deconv_filters = int(config["cnn_deconv_filters"])
     softargmax_beta = float(config["cnn_softargmax_beta"])
 
-    state = torch.load(model_path, map_location="cpu")
-    try:
-        model = CNNLandmarkPredictor(
-            n_landmarks,
-            model_variant=model_variant,
-            head_type="heatmap_deconv",
-            deconv_layers=deconv_layers,
-            deconv_filters=deconv_filters,
-            softargmax_beta=softargmax_beta,
-        )
-        model.load_state_dict(state, strict=True)
-    except Exception as exc:
-        raise RuntimeError(
-            f"This CNN model predates the heatmap-head format and must be retrained. ({exc})"
-        ) from exc
-    model.eval()
+    # Prefer the exported ONNX graph (no eager torch on the hot path) when it is
+    # at least as new as the weights; anything else falls back to torch. Models
+    # switched to int8 by quantize_cnn_model use the quantized graph instead.
+    model = None
+    onnx_candidates = [(onnx_model_path(project_root, tag), "float32")]
+    if str(config.get("inference_precision", "float32")).strip().lower() == "int8":
+        onnx_candidates.insert(0, (onnx_int8_model_path(project_root, tag), "int8"))
+    if prefer_onnx and onnx_runtime_available():
+        for onnx_path, precision in onnx_candidates:
+            if not is_onnx_model_current(onnx_path, model_path):
+                continue
+            try:
+                model = OnnxLandmarkModel(onnx_path, model_variant=model_variant, precision=precision)
+                break
+            except Exception as exc:
+                print(f"Warning: could not load ONNX model {onnx_path}: {exc}", file=sys.stderr)
+    if model is None:
+        if not _torch_available:
+            raise RuntimeError(
+                "torch/torchvision not installed. Cannot use CNN predictor. "
+                "Install with: pip install torch torchvision"
+            )
+        import torch
+        from inference.cnn_model import CNNLandmarkPredictor
+
+        state = torch.load(model_path, map_location="cpu")
+        try:
+            model = CNNLandmarkPredictor(
+                n_landmarks,
+                model_variant=model_variant,
+                head_type="heatmap_deconv",
+                deconv_layers=deconv_layers,
+                deconv_filters=deconv_filters,
+                softargmax_beta=softargmax_beta,
+            )
+            model.load_state_dict(state, strict=True)
+        except Exception as exc:
+            raise RuntimeError(
+                f"This CNN model predates the heatmap-head format and must be retrained. ({exc})"
+            ) from exc
+        # Inputs arrive channels_last (cnn_input_tensor); matching weights avoid
+        # per-layer layout conversions in the CPU convolutions.
+        model.eval().to(memory_format=torch.channels_last)
 
     # Load orientation / template data from id_mapping (same as dlib path)
     target_orientation = None
@@ -1628,8 +2228,20 @@ def _load_cnn_model(project_root, tag):
     return model, landmark_ids, target_orientation, landmark_template, head_landmark_id, tail_landmark_id
 
 
-def _cnn_landmarks_from_coords(coords_np, landmark_ids, flip=False):
-    """Convert flat CNN output coords to landmark dicts, optionally un-flipping X."""
+def _attach_landmark_confidence(landmarks, confidence):
+    """Add "peak_prob"/"entropy" from a (K, 2) confidence row to landmark dicts (in place)."""
+    for lm, (peak_prob, entropy) in zip(landmarks, np.asarray(confidence).tolist()):
+        lm["peak_prob"] = float(f"{float(peak_prob):.4g}")
+        lm["entropy"] = round(float(entropy), 5)
+    return landmarks
+
+
+def _cnn_landmarks_from_coords(coords_np, landmark_ids, flip=False, confidence=None):
+    """
+    Convert flat CNN output coords to landmark dicts, optionally un-flipping X.
+
+    confidence: optional (K, 2) [peak_prob, entropy] rows, attached per landmark.
+    """
     denom = float(max(1, STANDARD_SIZE - 1))
     lms = []
     for i, lm_id in enumerate(landmark_ids):
@@ -1640,6 +2252,8 @@ def _cnn_landmarks_from_coords(coords_np, landmark_ids, flip=False):
         x = max(0.0, min(float(STANDARD_SIZE - 1), x))
         y = max(0.0, min(float(STANDARD_SIZE - 1), y))
         lms.append({"id": lm_id, "x": x, "y": y})
+    if confidence is not None:
+        _attach_landmark_confidence(lms, confidence)
     return lms
 
 
@@ -1660,12 +2274,14 @@ def predict_cnn_image(project_root, tag, image_path, yolo_model_path=None, input
     model, landmark_ids, target_orientation, landmark_template, head_landmark_id, tail_landmark_id = \
         _load_cnn_model(project_root, tag)
 
-    img_original, img_detector, orig_w, orig_h, scale, detector_w, detector_h = _load_and_resize_for_inference(image_path)
+    image = _open_inference_image(image_path)
+    orig_w, orig_h = image.width, image.height
+    scale, detector_w, detector_h = image.scale, image.detector_width, image.detector_height
 
     print("PROGRESS 30 detecting", file=sys.stderr)
     detected = _detect_single_obb_box(
         image_path,
-        img_detector,
+        image,
         scale,
         detector_w,
         detector_h,
@@ -1679,7 +2295,7 @@ def predict_cnn_image(project_root, tag, image_path, yolo_model_path=None, input
     print("PROGRESS 65 predicting", file=sys.stderr)
     predict_fn = _make_cnn_predict_fn(model, landmark_ids)
     obb_prediction = _run_obb_inference_on_box(
-        img_original=img_original,
+        img_original=image,
         box=detected,
         orig_h=orig_h,
         orig_w=orig_w,
@@ -1710,6 +2326,7 @@ def predict_cnn_image(project_root, tag, image_path, yolo_model_path=None, input
         "fallback_reason": fallback_reason,
         "predictor_type": "cnn",
         "predictor_variant": getattr(model, "model_variant", None),
+        "predictor_backend": getattr(model, "backend", "torch"),
         "orientation_hint": obb_prediction["orientation_hint"],
         "orientation_debug": orientation_debug,
         "inference_metadata": obb_prediction["inference_metadata"],
@@ -1722,6 +2339,7 @@ def predict_cnn_image(project_root, tag, image_path, yolo_model_path=None, input
         "image": os.path.basename(image_path),
         "predictor_type": "cnn",
         "predictor_variant": getattr(model, "model_variant", None),
+        "predictor_backend": getattr(model, "backend", "torch"),
         "num_landmarks": len(landmarks),
         "landmarks": landmarks,
         "detected_box": detected,
@@ -1763,10 +2381,12 @@ def predict_cnn_multi_specimen(
     model, landmark_ids, target_orientation, landmark_template, head_landmark_id, tail_landmark_id = \
         _load_cnn_model(project_root, tag)
 
-    img_original, img_detector, orig_w, orig_h, scale, detector_w, detector_h = _load_and_resize_for_inference(image_path)
+    image = _open_inference_image(image_path)
+    orig_w, orig_h = image.width, image.height
+    scale, detector_w, detector_h = image.scale, image.detector_width, image.detector_height
     detection_result = _detect_multi_obb_boxes(
         image_path,
-        img_detector,
+        image,
         scale,
         detector_w,
         detector_h,
@@ -1797,24 +2417,24 @@ def predict_cnn_multi_specimen(
     specimens = []
     clamp_debug = []
     predict_fn = _make_cnn_predict_fn(model, landmark_ids)
-    for box_idx, box in enumerate(detected_boxes):
-        pct = 40 + int(45 * (box_idx / max(len(detected_boxes), 1)))
-        print(f"PROGRESS {pct} predicting", file=sys.stderr)
-        obb_prediction = _run_obb_inference_on_box(
-            img_original=img_original,
-            box=box,
-            orig_h=orig_h,
-            orig_w=orig_w,
-            detector_scale=scale,
-            detector_w=detector_w,
-            detector_h=detector_h,
-            orientation_policy=orientation_policy,
-            predict_fn=predict_fn,
-            target_orientation=target_orientation,
-            landmark_template=landmark_template,
-            head_landmark_id=head_landmark_id,
-            tail_landmark_id=tail_landmark_id,
-        )
+    print("PROGRESS 40 predicting", file=sys.stderr)
+    obb_predictions = _run_obb_inference_on_boxes_batched(
+        img_original=image,
+        boxes=detected_boxes,
+        orig_h=orig_h,
+        orig_w=orig_w,
+        detector_scale=scale,
+        detector_w=detector_w,
+        detector_h=detector_h,
+        orientation_policy=orientation_policy,
+        predict_fn=predict_fn,
+        batch_predict_fn=_make_cnn_batch_predict_fn(model, landmark_ids),
+        target_orientation=target_orientation,
+        landmark_template=landmark_template,
+        head_landmark_id=head_landmark_id,
+        tail_landmark_id=tail_landmark_id,
+    )
+    for box_idx, obb_prediction in enumerate(obb_predictions):
         specimens.append({
             "box": obb_prediction["detected_box"],
             "landmarks": obb_prediction["landmarks"],
@@ -1848,6 +2468,7 @@ def predict_cnn_multi_specimen(
         "fallback_reason": fallback_reason,
         "predictor_type": "cnn",
         "predictor_variant": getattr(model, "model_variant", None),
+        "predictor_backend": getattr(model, "backend", "torch"),
     }
 
     log_entry = {
@@ -1865,12 +2486,472 @@ def predict_cnn_multi_specimen(
     return result
 
 
+# ── Reusable model contexts + folder inference ───────────────────────────────
+
+def _landmark_model_path(project_root, tag, predictor_type):
+    if predictor_type == "cnn":
+        return os.path.join(project_root, "models", f"cnn_{tag}.pth")
+    return os.path.join(project_root, "models", f"predictor_{tag}.dat")
+
+
+def _file_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _landmark_model_mtime(project_root, tag, predictor_type):
+    """
+    mtimes of every file that decides how a loaded context predicts (None for missing ones).
+
+    For CNN models that is the weights plus the config (inference_precision,
+    switched by quantize_cnn_model --enable/--disable) and the exported float
+    and int8 ONNX graphs, so a worker notices a precision change or a fresh
+    --export-onnx without waiting for the context to be evicted.
+    """
+    model_path = _landmark_model_path(project_root, tag, predictor_type)
+    if predictor_type != "cnn":
+        return (_file_mtime(model_path),)
+    config_path = os.path.join(os.path.dirname(model_path), f"cnn_{tag}_config.json")
+    return tuple(
+        _file_mtime(path)
+        for path in (
+            model_path,
+            config_path,
+            onnx_model_path(project_root, tag),
+            onnx_int8_model_path(project_root, tag),
+        )
+    )
+
+
+def _load_dlib_inference_context(project_root, tag):
+    debug_dir = os.path.join(project_root, "debug")
+    predictor_path = os.path.join(project_root, "models", f"predictor_{tag}.dat")
+    id_mapping_path = os.path.join(debug_dir, f"id_mapping_{tag}.json")
+    if not os.path.exists(predictor_path):
+        raise FileNotFoundError(f"Model not found: {predictor_path}")
+
+    orientation_policy = {}
+    try:
+        orientation_policy = ou.load_orientation_policy(project_root)
+    except Exception:
+        orientation_policy = {}
+
+    id_mapping = {}
+    index_to_original = {}
+    target_orientation = None
+    landmark_template = {}
+    head_landmark_id = None
+    tail_landmark_id = _resolve_tail_landmark_id(project_root, None)
+    if os.path.exists(id_mapping_path):
+        with open(id_mapping_path, "r", encoding="utf-8") as handle:
+            id_mapping = json.load(handle)
+        index_to_original = _resolve_dlib_index_mapping(project_root, tag, id_mapping)
+        target_orientation = id_mapping.get("training_config", {}).get("target_orientation")
+        landmark_template = {
+            int(k): v for k, v in id_mapping.get("landmark_template", {}).items()
+        }
+        head_landmark_id = _resolve_head_landmark_id(project_root, id_mapping)
+        tail_landmark_id = _resolve_tail_landmark_id(project_root, id_mapping)
+    else:
+        head_landmark_id = _resolve_head_landmark_id(project_root, None)
+
+    import dlib
+
+    rect = dlib.rectangle(0, 0, STANDARD_SIZE, STANDARD_SIZE)
+    predictor = dlib.shape_predictor(predictor_path)
+    predict_fn = _make_dlib_predict_fn(predictor, rect, index_to_original)
+    return {
+        "project_root": project_root,
+        "tag": tag,
+        "predictor_type": "dlib",
+        "model_path": predictor_path,
+        "model_mtime": _landmark_model_mtime(project_root, tag, "dlib"),
+        # The in-memory regression forest is roughly the size of the .dat file.
+        "estimated_bytes": os.path.getsize(predictor_path),
+        "orientation_policy": orientation_policy,
+        "predict_fn": predict_fn,
+        "batch_predict_fn": _make_batch_predict_fn(predict_fn),
+        "target_orientation": target_orientation,
+        "landmark_template": landmark_template,
+        "head_landmark_id": head_landmark_id,
+        "tail_landmark_id": tail_landmark_id,
+    }
+
+
+def _load_cnn_inference_context(project_root, tag):
+    orientation_policy = {}
+    try:
+        orientation_policy = ou.load_orientation_policy(project_root)
+    except Exception:
+        orientation_policy = {}
+
+    model, landmark_ids, target_orientation, landmark_template, head_landmark_id, tail_landmark_id = _load_cnn_model(
+        project_root,
+        tag,
+    )
+    model_path = _landmark_model_path(project_root, tag, "cnn")
+    return {
+        "project_root": project_root,
+        "tag": tag,
+        "predictor_type": "cnn",
+        "predictor_variant": getattr(model, "model_variant", None),
+        "predictor_backend": getattr(model, "backend", "torch"),
+        "model_path": model_path,
+        "model_mtime": _landmark_model_mtime(project_root, tag, "cnn"),
+        "estimated_bytes": (
+            model.estimated_bytes
+            if isinstance(model, OnnxLandmarkModel)
+            else sum(tensor.numel() * tensor.element_size() for tensor in model.state_dict().values())
+        ),
+        "orientation_policy": orientation_policy,
+        "model": model,
+        "landmark_ids": landmark_ids,
+        "predict_fn": _make_cnn_predict_fn(model, landmark_ids),
+        "batch_predict_fn": _make_cnn_batch_predict_fn(model, landmark_ids),
+        "target_orientation": target_orientation,
+        "landmark_template": landmark_template,
+        "head_landmark_id": head_landmark_id,
+        "tail_landmark_id": tail_landmark_id,
+    }
+
+
+def _load_inference_context(project_root, tag, predictor_type="dlib"):
+    """Load a landmark model once into a reusable context (predict fns + orientation metadata)."""
+    if str(predictor_type) == "cnn":
+        return _load_cnn_inference_context(project_root, tag)
+    return _load_dlib_inference_context(project_root, tag)
+
+
+# YOLO detection runs on prefetch threads; one detector forward at a time.
+_DETECTION_LOCK = threading.Lock()
+
+
+def _prepare_specimens_with_context(
+    ctx,
+    image_path,
+    *,
+    input_boxes=None,
+    yolo_model_path=None,
+    min_area_ratio=0.02,
+    tta_k=0,
+    timer=NULL_TIMER,
+):
+    """
+    Open one image, resolve its OBB boxes and standardize every crop.
+
+    This is the model-free half of _predict_specimens_with_context(), safe to run
+    on a prefetch thread. The decoded image is not kept; the returned state only
+    holds the crops that still need a forward pass plus mapping metadata. Boxes
+    with an entry in the context's prediction cache are not cropped at all, and
+    the full-resolution image is only decoded if some box is.
+    """
+    # Only the header is read here; the pixels decode lazily in detect/crop,
+    # which time that under "decode" as well.
+    with timer.stage("decode"):
+        image = _open_inference_image(image_path)
+        orig_w, orig_h = image.width, image.height
+        scale, detector_w, detector_h = image.scale, image.detector_width, image.detector_height
+    detect_kwargs = dict(
+        yolo_model_path=yolo_model_path,
+        orientation_policy=ctx["orientation_policy"],
+        input_boxes=input_boxes,
+        min_area_ratio=min_area_ratio,
+        original_w=orig_w,
+        original_h=orig_h,
+        timer=timer,
+    )
+    if input_boxes:
+        with timer.stage("detect"):
+            detection_result = _detect_multi_obb_boxes(
+                image_path, image, scale, detector_w, detector_h, **detect_kwargs
+            )
+    else:
+        with _DETECTION_LOCK, timer.stage("detect"):
+            detection_result = _detect_multi_obb_boxes(
+                image_path, image, scale, detector_w, detector_h, **detect_kwargs
+            )
+    state = _prepare_obb_batch_with_cache(
+        ctx,
+        image_path,
+        image,
+        detection_result["boxes"],
+        tta_k=tta_k,
+        timer=timer,
+    )
+    state.update({
+        "image_path": image_path,
+        "orig_w": orig_w,
+        "orig_h": orig_h,
+        "scale": scale,
+        "detector_w": detector_w,
+        "detector_h": detector_h,
+        "detection_result": detection_result,
+    })
+    return state
+
+
+def _finish_specimens_with_context(ctx, state, timer=NULL_TIMER, tta_k=0):
+    """Run the batched forward for a prepared image and build its result dict."""
+    batch_crops = state["batch_crops"]
+    predict_fn, batch_predict_fn = _context_predict_fns(ctx, tta_k)
+    with timer.stage("model"):
+        batch_predictions = batch_predict_fn(batch_crops) if batch_crops else []
+    obb_predictions = _finalize_obb_batch_with_cache(
+        ctx, state, batch_predictions, predict_fn=predict_fn, timer=timer
+    )
+    specimens = [
+        {
+            "box": obb_prediction["detected_box"],
+            "landmarks": obb_prediction["landmarks"],
+            "num_landmarks": len(obb_prediction["landmarks"]),
+            "orientation_debug": obb_prediction["orientation_debug"],
+            "inference_metadata": obb_prediction["inference_metadata"],
+            "resolution_debug": obb_prediction["resolution_debug"],
+            "mask_outline": None,
+        }
+        for obb_prediction in obb_predictions
+    ]
+    detection_result = state["detection_result"]
+    return {
+        "image": state["image_path"],
+        "specimens": specimens,
+        "num_specimens": len(specimens),
+        "image_dimensions": {"width": state["orig_w"], "height": state["orig_h"]},
+        "inference_scale": state["scale"],
+        "detection_method": detection_result.get("detection_method", "yolo_obb"),
+        "fallback_reason": detection_result.get("fallback_reason"),
+        "predictor_type": ctx["predictor_type"],
+        "predictor_variant": ctx.get("predictor_variant"),
+        "predictor_backend": ctx.get("predictor_backend"),
+    }
+
+
+def _predict_specimens_with_context(
+    ctx,
+    image_path,
+    *,
+    input_boxes=None,
+    yolo_model_path=None,
+    min_area_ratio=0.02,
+    timer=NULL_TIMER,
+):
+    """Multi-specimen prediction for one image against an already-loaded context."""
+    state = _prepare_specimens_with_context(
+        ctx,
+        image_path,
+        input_boxes=input_boxes,
+        yolo_model_path=yolo_model_path,
+        min_area_ratio=min_area_ratio,
+        timer=timer,
+    )
+    return _finish_specimens_with_context(ctx, state, timer=timer)
+
+
+FOLDER_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+
+def _iter_folder_inputs(source):
+    """
+    Resolve a folder-inference source into [{"image_path", "boxes"}] entries.
+
+    source may be a directory (images directly inside it, sorted by name) or a
+    manifest file: .txt (one image path per line), .jsonl (one object per line
+    with image_path and optional boxes) or .json (list of paths or such objects).
+    Relative manifest paths resolve against the manifest's directory.
+    """
+    if os.path.isdir(source):
+        return [
+            {"image_path": os.path.join(source, name), "boxes": None}
+            for name in sorted(os.listdir(source))
+            if name.lower().endswith(FOLDER_IMAGE_EXTENSIONS)
+            and os.path.isfile(os.path.join(source, name))
+        ]
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"Folder inference source not found: {source}")
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    ext = os.path.splitext(source)[1].lower()
+    with open(source, "r", encoding="utf-8") as f:
+        if ext == ".json":
+            raw_entries = json.load(f)
+            if not isinstance(raw_entries, list):
+                raise ValueError("JSON manifest must be a list of image paths or objects.")
+        elif ext == ".jsonl":
+            raw_entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            raw_entries = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+    entries = []
+    for raw in raw_entries:
+        if isinstance(raw, str):
+            image_path, boxes = raw, None
+        elif isinstance(raw, dict) and raw.get("image_path"):
+            image_path, boxes = str(raw["image_path"]), raw.get("boxes")
+        else:
+            raise ValueError(f"Invalid manifest entry: {raw!r}")
+        if not os.path.isabs(image_path):
+            image_path = os.path.join(base_dir, image_path)
+        entries.append({"image_path": image_path, "boxes": boxes if isinstance(boxes, list) else None})
+    return entries
+
+
+def _load_folder_resume_state(output_path):
+    """
+    Return abspaths already predicted successfully in a partially written JSONL file.
+
+    Everything after the last complete, parseable line (e.g. a record cut off by a
+    crash) is truncated so appended records start on a clean line. A complete
+    final record that only lacks its newline is kept and the newline added.
+    """
+    completed = set()
+    if not output_path or not os.path.exists(output_path):
+        return completed
+    good_end = 0
+    missing_newline = False
+    with open(output_path, "rb") as f:
+        data = f.read()
+    for raw_line in data.splitlines(keepends=True):
+        try:
+            record = json.loads(raw_line.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            break
+        if not raw_line.endswith(b"\n"):
+            if not isinstance(record, dict):
+                break  # e.g. a bare number cut short
+            missing_newline = True
+        good_end += len(raw_line)
+        if isinstance(record, dict) and record.get("ok") and record.get("image_path"):
+            completed.add(os.path.abspath(record["image_path"]))
+    if good_end < len(data):
+        with open(output_path, "r+b") as f:
+            f.truncate(good_end)
+    elif missing_newline:
+        with open(output_path, "ab") as f:
+            f.write(b"\n")
+    return completed
+
+
+def predict_folder(
+    project_root,
+    tag,
+    source,
+    output_path=None,
+    *,
+    predictor_type="dlib",
+    yolo_model_path=None,
+    resume=True,
+    context=None,
+    on_record=None,
+    prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+    prefetch_workers=DEFAULT_PREFETCH_WORKERS,
+    tta_k=0,
+    prediction_cache_bytes=DEFAULT_PREDICTION_CACHE_BYTES,
+):
+    """
+    Predict landmarks for every image of a directory or manifest in one process.
+
+    The model is loaded once (or taken from context) and each image's result is
+    appended to output_path as one JSON line as soon as it completes; with
+    output_path=None records stream to stdout. With resume=True, images that
+    already have an ok record in output_path are skipped, so an interrupted run
+    picks up where it stopped. Failed images are recorded with ok=false and
+    retried on the next resume; the latest record for an image wins.
+
+    Image decode and crop standardization for the next prefetch_depth images
+    run on prefetch_workers threads while the current image is predicted
+    (prefetch_depth=0 runs everything inline). Records are still written in
+    input order.
+
+    tta_k > 1 enables CNN test-time augmentation (see inference.cnn_tta).
+
+    Per-box predictions are reused from <project_root>/cache/predictions when the
+    image bytes, box and model are unchanged (see inference.prediction_cache);
+    prediction_cache_bytes bounds its size and 0 disables it.
+
+    on_record(record, index, total) is called after each image.
+    Returns a run summary dict.
+    """
+    entries = _iter_folder_inputs(source)
+    completed = _load_folder_resume_state(output_path) if (resume and output_path) else set()
+    if context is None:
+        context = _load_inference_context(project_root, tag, predictor_type)
+    cache = _enable_prediction_cache(context, prediction_cache_bytes)
+
+    started = time.perf_counter()
+    processed = failed = 0
+    total = len(entries)
+    pending = [
+        (index, entry)
+        for index, entry in enumerate(entries)
+        if os.path.abspath(entry["image_path"]) not in completed
+    ]
+    skipped = total - len(pending)
+
+    def _prepare(indexed_entry):
+        _, entry = indexed_entry
+        return _prepare_specimens_with_context(
+            context,
+            entry["image_path"],
+            input_boxes=entry.get("boxes"),
+            yolo_model_path=yolo_model_path,
+            tta_k=tta_k,
+        )
+
+    pipeline = PrefetchPipeline(_prepare, depth=prefetch_depth, workers=prefetch_workers)
+    if output_path:
+        out_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(out_dir, exist_ok=True)
+        out = open(output_path, "a" if resume else "w", encoding="utf-8")
+    else:
+        out = sys.stdout
+    try:
+        for (index, entry), state, prepare_error in pipeline.iterate(pending):
+            record = {"index": index, "image_path": entry["image_path"]}
+            try:
+                if prepare_error is not None:
+                    raise prepare_error
+                record["result"] = _finish_specimens_with_context(context, state, tta_k=tta_k)
+                record["ok"] = True
+                processed += 1
+            except Exception as exc:
+                record["ok"] = False
+                record["error"] = str(exc)
+                failed += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if on_record is not None:
+                on_record(record, index, total)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "source": source,
+        "output_path": output_path,
+        "predictor_type": context["predictor_type"],
+        "total": total,
+        "processed": processed,
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_s": round(elapsed, 3),
+        "images_per_sec": round((processed + failed) / elapsed, 3) if elapsed > 0 else None,
+        "prefetch": pipeline.stats(),
+        "prediction_cache": cache.stats() if cache is not None else None,
+    }
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 4:
         print(
             "Usage: python predict.py <project_root> <tag> <image_path> "
             "[--multi] [--yolo-model <path>] "
-            "[--boxes-json <path>] [--obb-json <path>] [--predictor-type dlib|cnn]"
+            "[--boxes-json <path>] [--obb-json <path>] [--predictor-type dlib|cnn]\n"
+            "       python predict.py <project_root> <tag> <folder_or_manifest> --folder "
+            "[--output <results.jsonl>] [--no-resume] [--prefetch-depth N] [--prefetch-workers N] "
+            "[--yolo-model <path>] [--predictor-type dlib|cnn] [--tta K] [--prediction-cache-mb MB]"
         )
         sys.exit(1)
 
@@ -1891,6 +2972,56 @@ if __name__ == "__main__":
         if idx + 1 < len(sys.argv):
             predictor_type = sys.argv[idx + 1]
 
+    if "--folder" in sys.argv:
+        output_path = None
+        if "--output" in sys.argv:
+            idx = sys.argv.index("--output")
+            if idx + 1 < len(sys.argv) and sys.argv[idx + 1] != "-":
+                output_path = sys.argv[idx + 1]
+        prefetch_depth = DEFAULT_PREFETCH_DEPTH
+        if "--prefetch-depth" in sys.argv:
+            idx = sys.argv.index("--prefetch-depth")
+            if idx + 1 < len(sys.argv):
+                prefetch_depth = int(sys.argv[idx + 1])
+        prefetch_workers = DEFAULT_PREFETCH_WORKERS
+        if "--prefetch-workers" in sys.argv:
+            idx = sys.argv.index("--prefetch-workers")
+            if idx + 1 < len(sys.argv):
+                prefetch_workers = int(sys.argv[idx + 1])
+        tta_k = 0
+        if "--tta" in sys.argv:
+            idx = sys.argv.index("--tta")
+            if idx + 1 < len(sys.argv):
+                tta_k = int(sys.argv[idx + 1])
+        prediction_cache_bytes = DEFAULT_PREDICTION_CACHE_BYTES
+        if "--prediction-cache-mb" in sys.argv:
+            idx = sys.argv.index("--prediction-cache-mb")
+            if idx + 1 < len(sys.argv):
+                prediction_cache_bytes = int(float(sys.argv[idx + 1]) * 1024 * 1024)
+
+        def _report_folder_progress(record, index, total):
+            pct = 10 + int(85 * ((index + 1) / max(total, 1)))
+            print(f"PROGRESS {pct} predicting", file=sys.stderr)
+
+        print("PROGRESS 5 loading_model", file=sys.stderr)
+        summary = predict_folder(
+            project_root,
+            tag,
+            image_path,
+            output_path,
+            predictor_type=predictor_type,
+            yolo_model_path=yolo_model_path,
+            resume="--no-resume" not in sys.argv,
+            on_record=_report_folder_progress,
+            prefetch_depth=prefetch_depth,
+            prefetch_workers=prefetch_workers,
+            tta_k=tta_k,
+            prediction_cache_bytes=prediction_cache_bytes,
+        )
+        print("PROGRESS 100 done", file=sys.stderr)
+        print(json.dumps({"summary": summary}))
+        sys.exit(0)
+
     input_boxes = None
     if "--boxes-json" in sys.argv:
         idx = sys.argv.index("--boxes-json")
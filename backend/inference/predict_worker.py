@@ -2,46 +2,170 @@
 """
 Persistent landmark inference worker for batch inference UX.
 
-Loads a dlib/CNN landmark model once and reuses it across repeated image
-prediction requests. This worker only supports the current inference-page flow:
-multi-specimen landmarking from provided OBB boxes.
+Keeps recently used dlib/CNN landmark models loaded (LRU-bounded) and reuses
+them across repeated image prediction requests. Supports the inference-page flow
+(multi-specimen landmarking from provided OBB boxes) and streaming folder runs.
+
+Per-stage timings are opt-in (--profile or a request "profile" field) and come
+back in debug.timings; "timing_summary" returns the session-level aggregate.
+
+Responses are compact by default: the per-specimen orientation/resolution debug
+blocks and debug.clamp_debug are only included when a request sets "debug": true
+(or the worker runs with --debug-payloads). A request's "landmark_encoding"
+selects how landmarks are returned (see inference.result_transport): "objects"
+(default), "packed" float32 rows in base64, or "mmap" rows appended to the
+--results-file memory map with only the offset sent on stdout.
+
+CNN test-time augmentation is requested with "tta": K (or --tta K for every
+request); fused landmarks report their dispersion in inference_metadata.tta.
+
+Per-box predictions are cached on disk under <project_root>/cache/predictions
+(see inference.prediction_cache): boxes whose image bytes, corners and model are
+unchanged skip cropping and the forward pass. --prediction-cache-mb bounds the
+cache (0 disables it) and a request can bypass it with "use_cache": false.
 """
 
+import argparse
 import json
 import os
+import queue
 import sys
+import threading
+import time
 import traceback
-
-import dlib
+from collections import OrderedDict
 
 _BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if _BACKEND_ROOT not in sys.path:
     sys.path.insert(0, _BACKEND_ROOT)
 
-import bv_utils.orientation_utils as ou
+from inference.cnn_tta import MAX_TTA_K, resolve_tta_k
 from inference.predict import (
-    STANDARD_SIZE,
+    _context_predict_fns,
     _detect_multi_obb_boxes,
-    _load_and_resize_for_inference,
-    _load_cnn_model,
-    _make_cnn_predict_fn,
-    _make_dlib_predict_fn,
-    _resolve_dlib_index_mapping,
-    _resolve_head_landmark_id,
-    _resolve_tail_landmark_id,
-    _run_obb_inference_on_box,
+    _enable_prediction_cache,
+    _finalize_obb_batch_with_cache,
+    _landmark_model_mtime,
+    _load_inference_context,
+    _open_inference_image,
+    _prepare_obb_batch_with_cache,
+    predict_folder,
 )
+from inference.prediction_cache import DEFAULT_PREDICTION_CACHE_BYTES
+from inference.prefetch import DEFAULT_PREFETCH_DEPTH, DEFAULT_PREFETCH_WORKERS
+from inference.result_transport import (
+    ResultsFile,
+    encode_packed_buffer,
+    pack_landmarks,
+    resolve_landmark_encoding,
+)
+from inference.stage_timing import PROFILE_LEVELS, TimingAggregator, make_stage_timer, resolve_profile_level
 
 
 def _send(obj):
-    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n")
     sys.stdout.flush()
 
 
+class ModelContextCache:
+    """
+    LRU cache of loaded model contexts, bounded by entry count and estimated memory.
+
+    Contexts are keyed by (project_root, tag, predictor_type). An entry whose model
+    files changed on disk since it was loaded (retrained under the same tag, CNN
+    precision switched or ONNX re-exported; see _landmark_model_mtime) is
+    dropped on lookup and counted as an invalidation.
+    """
+
+    def __init__(self, max_entries=3, max_bytes=2 * 1024 ** 3):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def estimated_bytes(self):
+        return sum(int(ctx.get("estimated_bytes", 0)) for ctx in self._entries.values())
+
+    def get(self, key, model_mtime=None):
+        ctx = self._entries.get(key)
+        if ctx is not None and model_mtime is not None and ctx.get("model_mtime") != model_mtime:
+            del self._entries[key]
+            self.invalidations += 1
+            ctx = None
+        if ctx is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return ctx
+
+    def put(self, key, ctx):
+        self._entries[key] = ctx
+        self._entries.move_to_end(key)
+        # The newest entry is always kept, even if it alone exceeds max_bytes.
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self.estimated_bytes > self.max_bytes)
+        ):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "estimated_bytes": self.estimated_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "keys": [
+                {"tag": key[1], "predictor_type": key[2]}
+                for key in self._entries
+            ],
+        }
+
+
 class LandmarkPredictWorker:
-    def __init__(self):
+    def __init__(
+        self,
+        max_cached_models=3,
+        max_cache_bytes=2 * 1024 ** 3,
+        prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+        prefetch_workers=DEFAULT_PREFETCH_WORKERS,
+        profile="off",
+        profile_summary_path=None,
+        debug_payloads=False,
+        results_file=None,
+        results_file_bytes=16 * 1024 * 1024,
+        tta_k=0,
+        prediction_cache_bytes=DEFAULT_PREDICTION_CACHE_BYTES,
+    ):
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_workers = prefetch_workers
+        self.profile = resolve_profile_level(profile)
+        self.profile_summary_path = profile_summary_path
+        self.timing_summary = TimingAggregator()
+        self.debug_payloads = bool(debug_payloads)
+        self.tta_k = resolve_tta_k(tta_k)
+        self.prediction_cache_bytes = max(0, int(prediction_cache_bytes))
+        self.results_file = ResultsFile(results_file, results_file_bytes) if results_file else None
         self.loaded_key = None
         self.context = None
+        self.context_cache = ModelContextCache(
+            max_entries=max_cached_models,
+            max_bytes=max_cache_bytes,
+        )
 
     def _emit_progress(self, request_id, percent, stage, **extra):
         payload = {
@@ -53,96 +177,63 @@ class LandmarkPredictWorker:
         payload.update(extra)
         _send(payload)
 
-    def _load_dlib_context(self, project_root, tag):
-        debug_dir = os.path.join(project_root, "debug")
-        predictor_path = os.path.join(project_root, "models", f"predictor_{tag}.dat")
-        id_mapping_path = os.path.join(debug_dir, f"id_mapping_{tag}.json")
-        if not os.path.exists(predictor_path):
-            raise FileNotFoundError(f"Model not found: {predictor_path}")
-
-        orientation_policy = {}
-        try:
-            orientation_policy = ou.load_orientation_policy(project_root)
-        except Exception:
-            orientation_policy = {}
-
-        id_mapping = {}
-        index_to_original = {}
-        target_orientation = None
-        landmark_template = {}
-        head_landmark_id = None
-        tail_landmark_id = _resolve_tail_landmark_id(project_root, None)
-        if os.path.exists(id_mapping_path):
-            with open(id_mapping_path, "r", encoding="utf-8") as handle:
-                id_mapping = json.load(handle)
-            index_to_original = _resolve_dlib_index_mapping(project_root, tag, id_mapping)
-            target_orientation = id_mapping.get("training_config", {}).get("target_orientation")
-            landmark_template = {
-                int(k): v for k, v in id_mapping.get("landmark_template", {}).items()
-            }
-            head_landmark_id = _resolve_head_landmark_id(project_root, id_mapping)
-            tail_landmark_id = _resolve_tail_landmark_id(project_root, id_mapping)
-        else:
-            head_landmark_id = _resolve_head_landmark_id(project_root, None)
-
-        rect = dlib.rectangle(0, 0, STANDARD_SIZE, STANDARD_SIZE)
-        predictor = dlib.shape_predictor(predictor_path)
-        return {
-            "project_root": project_root,
-            "tag": tag,
-            "predictor_type": "dlib",
-            "orientation_policy": orientation_policy,
-            "predict_fn": _make_dlib_predict_fn(predictor, rect, index_to_original),
-            "target_orientation": target_orientation,
-            "landmark_template": landmark_template,
-            "head_landmark_id": head_landmark_id,
-            "tail_landmark_id": tail_landmark_id,
-        }
-
-    def _load_cnn_context(self, project_root, tag):
-        orientation_policy = {}
-        try:
-            orientation_policy = ou.load_orientation_policy(project_root)
-        except Exception:
-            orientation_policy = {}
-
-        model, landmark_ids, target_orientation, landmark_template, head_landmark_id, tail_landmark_id = _load_cnn_model(
-            project_root,
-            tag,
-        )
-        return {
-            "project_root": project_root,
-            "tag": tag,
-            "predictor_type": "cnn",
-            "orientation_policy": orientation_policy,
-            "predict_fn": _make_cnn_predict_fn(model, landmark_ids),
-            "target_orientation": target_orientation,
-            "landmark_template": landmark_template,
-            "head_landmark_id": head_landmark_id,
-            "tail_landmark_id": tail_landmark_id,
-        }
-
     def ensure_context(self, request_id, project_root, tag, predictor_type):
         key = (os.path.abspath(project_root), str(tag), str(predictor_type))
-        if self.loaded_key == key and self.context is not None:
+        model_mtime = _landmark_model_mtime(project_root, tag, str(predictor_type))
+        cached = self.context_cache.get(key, model_mtime=model_mtime)
+        if cached is not None:
+            self.context = cached
+            self.loaded_key = key
             return False
 
         self._emit_progress(request_id, 10, "loading_model")
-        if predictor_type == "cnn":
-            self.context = self._load_cnn_context(project_root, tag)
-        else:
-            self.context = self._load_dlib_context(project_root, tag)
+        context = _load_inference_context(project_root, tag, predictor_type)
+        _enable_prediction_cache(context, self.prediction_cache_bytes)
+        self.context_cache.put(key, context)
+        self.context = context
         self.loaded_key = key
         return True
 
-    def predict(self, request_id, payload):
+    @staticmethod
+    def context_key(payload):
+        return (
+            os.path.abspath(payload["project_root"]),
+            str(payload["tag"]),
+            str(payload.get("predictor_type", "dlib")),
+        )
+
+    def request_tta_k(self, payload):
+        return resolve_tta_k(payload.get("tta", self.tta_k))
+
+    def prepare_predict(self, request_id, payload):
+        """
+        Load the model context, decode the image and standardize every OBB crop.
+
+        Returns a request state consumed by finish_predict(). state["batch_crops"]
+        holds the crops (and flipped candidates) that still need a forward pass;
+        boxes with a cached prediction contribute none.
+        With profiling enabled (payload "profile" or --profile), state["timer"]
+        records per-stage timings that finish_predict() returns in debug.timings.
+        """
+        timer = make_stage_timer(resolve_profile_level(payload.get("profile"), self.profile))
+        try:
+            return self._prepare_predict(request_id, payload, timer)
+        except Exception:
+            timer.close()
+            raise
+
+    def _prepare_predict(self, request_id, payload, timer):
         project_root = payload["project_root"]
         tag = payload["tag"]
         predictor_type = payload.get("predictor_type", "dlib")
         image_path = payload["image_path"]
         input_boxes = payload.get("boxes")
+        landmark_encoding = resolve_landmark_encoding(payload.get("landmark_encoding"))
+        if landmark_encoding == "mmap" and self.results_file is None:
+            raise ValueError('landmark_encoding "mmap" requires the worker to run with --results-file.')
 
-        cold_start = self.ensure_context(request_id, project_root, tag, predictor_type)
+        with timer.stage("load_context"):
+            cold_start = self.ensure_context(request_id, project_root, tag, predictor_type)
         ctx = self.context
         if ctx is None:
             raise RuntimeError("Landmark worker context not initialized.")
@@ -150,55 +241,86 @@ class LandmarkPredictWorker:
             raise ValueError("predict worker requires provided OBB boxes.")
 
         self._emit_progress(request_id, 20, "detecting")
-        img_original, img_detector, orig_w, orig_h, scale, detector_w, detector_h = _load_and_resize_for_inference(image_path)
-        detection_result = _detect_multi_obb_boxes(
+        # Only the header is read here; the pixels decode lazily in detect/crop,
+        # which time that under "decode" as well.
+        with timer.stage("decode"):
+            image = _open_inference_image(image_path)
+        orig_w, orig_h = image.width, image.height
+        scale, detector_w, detector_h = image.scale, image.detector_width, image.detector_height
+        with timer.stage("detect"):
+            detection_result = _detect_multi_obb_boxes(
+                image_path,
+                image,
+                scale,
+                detector_w,
+                detector_h,
+                input_boxes=input_boxes,
+                original_w=orig_w,
+                original_h=orig_h,
+                timer=timer,
+            )
+        tta_k = self.request_tta_k(payload)
+        state = _prepare_obb_batch_with_cache(
+            ctx,
             image_path,
-            img_detector,
-            scale,
-            detector_w,
-            detector_h,
-            input_boxes=input_boxes,
-            original_w=orig_w,
-            original_h=orig_h,
+            image,
+            detection_result["boxes"],
+            tta_k=tta_k,
+            use_cache=bool(payload.get("use_cache", True)),
+            timer=timer,
+        )
+        state.update({
+            "request_id": request_id,
+            "context": ctx,
+            "image_path": image_path,
+            "predictor_type": predictor_type,
+            "cold_start": bool(cold_start),
+            "orig_w": orig_w,
+            "orig_h": orig_h,
+            "scale": scale,
+            "detector_w": detector_w,
+            "detector_h": detector_h,
+            "detection_result": detection_result,
+            "timer": timer,
+            "debug_payloads": bool(payload.get("debug", self.debug_payloads)),
+            "tta_k": tta_k,
+            "landmark_encoding": landmark_encoding,
+        })
+        return state
+
+    def finish_predict(self, state, batch_predictions, *, batched=True, debug_extra=None):
+        """Apply orientation selection + mapping to decoded predictions for one request."""
+        timer = state["timer"]
+        try:
+            return self._finish_predict(state, batch_predictions, batched=batched, debug_extra=debug_extra)
+        finally:
+            timer.close()
+
+    def _finish_predict(self, state, batch_predictions, *, batched, debug_extra):
+        ctx = state["context"]
+        timer = state["timer"]
+        predict_fn, _ = _context_predict_fns(ctx, state["tta_k"])
+        obb_predictions = _finalize_obb_batch_with_cache(
+            ctx, state, batch_predictions, predict_fn=predict_fn, timer=timer
         )
-        detected_boxes = detection_result["boxes"]
 
+        include_debug = state["debug_payloads"]
         specimens = []
         clamp_debug = []
-        total = max(1, len(detected_boxes))
-        for box_idx, box in enumerate(detected_boxes):
-            pct = 35 + int(50 * ((box_idx + 1) / total))
-            self._emit_progress(
-                request_id,
-                pct,
-                "predicting",
-                current_specimen=box_idx + 1,
-                total_specimens=len(detected_boxes),
-            )
-            obb_prediction = _run_obb_inference_on_box(
-                img_original=img_original,
-                box=box,
-                orig_h=orig_h,
-                orig_w=orig_w,
-                detector_scale=scale,
-                detector_w=detector_w,
-                detector_h=detector_h,
-                orientation_policy=ctx["orientation_policy"],
-                predict_fn=ctx["predict_fn"],
-                target_orientation=ctx["target_orientation"],
-                landmark_template=ctx["landmark_template"],
-                head_landmark_id=ctx["head_landmark_id"],
-                tail_landmark_id=ctx["tail_landmark_id"],
-            )
-            specimens.append({
+        for box_idx, obb_prediction in enumerate(obb_predictions):
+            specimen = {
                 "box": obb_prediction["detected_box"],
                 "landmarks": obb_prediction["landmarks"],
                 "num_landmarks": len(obb_prediction["landmarks"]),
-                "orientation_debug": obb_prediction["orientation_debug"],
                 "inference_metadata": obb_prediction["inference_metadata"],
-                "resolution_debug": obb_prediction["resolution_debug"],
                 "mask_outline": None,
-            })
+            }
+            if include_debug:
+                specimen["orientation_debug"] = obb_prediction["orientation_debug"]
+                specimen["resolution_debug"] = obb_prediction["resolution_debug"]
+            specimens.append(specimen)
+            if not include_debug:
+                continue
             clamp_entry = {
                 "box_index": box_idx,
                 "clamped_landmark_ids": obb_prediction.get("clamped_landmark_ids", []),
@@ -209,49 +331,474 @@ class LandmarkPredictWorker:
                 clamp_entry["pre_clamp_landmarks"] = obb_prediction["pre_clamp_landmarks"]
             clamp_debug.append(clamp_entry)
 
-        self._emit_progress(request_id, 92, "mapping")
-        return {
-            "image": image_path,
+        self._emit_progress(state["request_id"], 92, "mapping")
+        detection_result = state["detection_result"]
+        debug = {
+            "cold_start": state["cold_start"],
+            "batched": bool(batched),
+            "context_cache": self.context_cache.stats(),
+            "tta_k": state["tta_k"],
+            "prediction_cache_hits": state["cache_hits"],
+        }
+        prediction_cache = ctx.get("prediction_cache")
+        if prediction_cache is not None:
+            debug["prediction_cache"] = prediction_cache.stats()
+        if include_debug:
+            debug["clamp_debug"] = clamp_debug
+        if debug_extra:
+            debug.update(debug_extra)
+        timings = timer.summary()
+        if timings is not None:
+            debug["timings"] = timings
+            self.record_timings(timings)
+        result = {
+            "image": state["image_path"],
             "specimens": specimens,
             "num_specimens": len(specimens),
-            "image_dimensions": {"width": orig_w, "height": orig_h},
-            "inference_scale": scale,
+            "image_dimensions": {"width": state["orig_w"], "height": state["orig_h"]},
+            "inference_scale": state["scale"],
             "detection_method": detection_result.get("detection_method", "provided_obb_boxes"),
             "fallback_reason": detection_result.get("fallback_reason"),
-            "predictor_type": predictor_type,
-            "debug": {
-                "cold_start": bool(cold_start),
-                "clamp_debug": clamp_debug,
-            },
+            "predictor_type": state["predictor_type"],
+            "debug": debug,
+        }
+        encoding = state["landmark_encoding"]
+        if encoding != "objects":
+            rows = pack_landmarks(specimens)
+            if encoding == "mmap":
+                result["landmark_buffer"] = self.results_file.write_packed(rows)
+            else:
+                result["landmark_buffer"] = encode_packed_buffer(rows)
+        return result
+
+    def record_timings(self, timings):
+        """Fold one request's timings into the session summary (and its file, if configured)."""
+        self.timing_summary.add(timings)
+        if self.profile_summary_path:
+            try:
+                self.timing_summary.write(self.profile_summary_path)
+            except OSError as exc:
+                print(f"Could not write timing summary: {exc}", file=sys.stderr)
+
+    def timing_summary_result(self):
+        return {
+            "summary": self.timing_summary.summary(),
+            "summary_path": self.profile_summary_path,
         }
 
+    def predict_folder(self, request_id, payload):
+        """
+        Stream predictions for a directory or manifest into a JSONL file.
+
+        Reuses the cached model context; emits an "image_done" progress message
+        per image so the caller can pick up results while the run continues.
+        """
+        project_root = payload["project_root"]
+        tag = payload["tag"]
+        predictor_type = payload.get("predictor_type", "dlib")
+        output_path = payload.get("output_path")
+        if not output_path:
+            raise ValueError("predict_folder requires output_path.")
+        cold_start = self.ensure_context(request_id, project_root, tag, predictor_type)
+
+        def _on_record(record, index, total):
+            self._emit_progress(
+                request_id,
+                10 + int(85 * ((index + 1) / max(total, 1))),
+                "image_done",
+                current_image=index + 1,
+                total_images=total,
+                image_path=record["image_path"],
+                image_ok=bool(record.get("ok")),
+                output_path=output_path,
+            )
+
+        summary = predict_folder(
+            project_root,
+            tag,
+            payload["source"],
+            output_path,
+            predictor_type=predictor_type,
+            yolo_model_path=payload.get("yolo_model_path"),
+            resume=bool(payload.get("resume", True)),
+            context=self.context,
+            on_record=_on_record,
+            prefetch_depth=int(payload.get("prefetch_depth", self.prefetch_depth)),
+            prefetch_workers=int(payload.get("prefetch_workers", self.prefetch_workers)),
+            tta_k=self.request_tta_k(payload),
+            prediction_cache_bytes=self.prediction_cache_bytes,
+        )
+        summary["debug"] = {
+            "cold_start": bool(cold_start),
+            "context_cache": self.context_cache.stats(),
+        }
+        return summary
+
+    def predict(self, request_id, payload):
+        state = self.prepare_predict(request_id, payload)
+        ctx = state["context"]
+        batch_crops = state["batch_crops"]
+        total_specimens = len(state["boxes"])
+        predict_fn, batch_predict_fn = _context_predict_fns(ctx, state["tta_k"])
+        if bool(payload.get("batch_specimens", True)):
+            self._emit_progress(
+                request_id,
+                35,
+                "predicting",
+                current_specimen=0,
+                total_specimens=total_specimens,
+            )
+            try:
+                with state["timer"].stage("model"):
+                    batch_predictions = batch_predict_fn(batch_crops) if batch_crops else []
+            except Exception:
+                state["timer"].close()
+                raise
+            return self.finish_predict(state, batch_predictions)
+
+        # One forward per crop, with per-specimen progress.
+        batch_predictions = [None] * len(batch_crops)
+        total = max(1, total_specimens)
+        for box_idx, prepared in enumerate(state["prepared_boxes"]):
+            pct = 35 + int(50 * ((box_idx + 1) / total))
+            self._emit_progress(
+                request_id,
+                pct,
+                "predicting",
+                current_specimen=box_idx + 1,
+                total_specimens=total_specimens,
+            )
+            for crop_idx in (prepared["primary_index"], prepared["flipped_index"]):
+                if crop_idx is not None:
+                    try:
+                        with state["timer"].stage("model"):
+                            batch_predictions[crop_idx] = predict_fn(batch_crops[crop_idx])
+                    except Exception:
+                        state["timer"].close()
+                        raise
+        return self.finish_predict(state, batch_predictions, batched=False)
+
+
+_INBOX_EOF = object()
+
+
+def _send_error(request_id, exc):
+    _send({
+        "status": "error",
+        "_request_id": request_id,
+        "ok": False,
+        "error": str(exc),
+        "traceback": "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+    })
+
+
+def _decode_message(line):
+    msg = json.loads(line)
+    request_id = str(msg.get("_request_id") or "")
+    cmd = str(msg.get("cmd") or "").strip().lower()
+    return msg, request_id, cmd
+
+
+class PredictMicroBatcher:
+    """
+    Cross-request micro-batching for queued predict commands.
+
+    Requests targeting the same loaded model are prepared (decode + crop) as they
+    arrive; their crops then go through the context's batch_predict_fn together
+    once max_batch_size crops are pending or max_wait_ms has elapsed since the
+    first request of the batch. Results are demultiplexed back to each
+    _request_id. Any other command (or a different model) closes the batch.
+    """
+
+    def __init__(self, worker, max_batch_size=64, max_wait_ms=15.0):
+        self.worker = worker
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batches_run = 0
+
+    def _batchable(self, msg, cmd):
+        return cmd == "predict" and bool(msg.get("batch_specimens", True))
+
+    def _safe_context_key(self, msg):
+        # Requests only share a forward when they use the same model and TTA K.
+        try:
+            return self.worker.context_key(msg), self.worker.request_tta_k(msg)
+        except Exception:
+            return None
+
+    def _collect(self, first_msg, first_request_id, inbox):
+        """Prepare requests until the batch is full, times out, or is interrupted."""
+        started = time.monotonic()
+        deadline = started + self.max_wait_s
+        states = []
+        crop_count = 0
+        batch_key = None
+        msg, request_id = first_msg, first_request_id
+        while True:
+            msg_key = self._safe_context_key(msg)
+            if states and msg_key != batch_key:
+                return states, crop_count, started, (msg, request_id)
+            try:
+                state = self.worker.prepare_predict(request_id, msg)
+            except Exception as exc:
+                _send_error(request_id, exc)
+            else:
+                states.append(state)
+                crop_count += len(state["batch_crops"])
+                batch_key = msg_key
+            if crop_count >= self.max_batch_size:
+                return states, crop_count, started, None
+
+            # Read until a decodable message; malformed lines are reported and skipped.
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    line = inbox.get(timeout=remaining) if remaining > 0 else inbox.get_nowait()
+                except queue.Empty:
+                    return states, crop_count, started, None
+                if line is _INBOX_EOF:
+                    return states, crop_count, started, (_INBOX_EOF, None)
+                try:
+                    msg, request_id, cmd = _decode_message(line)
+                except Exception as exc:
+                    _send_error(None, exc)
+                    continue
+                break
+            if not self._batchable(msg, cmd):
+                return states, crop_count, started, (msg, request_id)
+
+    def _run_batch(self, states, crop_count, started):
+        if not states:
+            return
+        self.batches_run += 1
+        _, batch_predict_fn = _context_predict_fns(states[0]["context"], states[0]["tta_k"])
+        all_crops = []
+        for state in states:
+            self.worker._emit_progress(
+                state["request_id"],
+                35,
+                "predicting",
+                current_specimen=0,
+                total_specimens=len(state["boxes"]),
+            )
+            all_crops.extend(state["batch_crops"])
+        forward_started = time.perf_counter()
+        forward_cpu_started = time.process_time()
+        try:
+            all_predictions = batch_predict_fn(all_crops) if all_crops else []
+        except Exception as exc:
+            for state in states:
+                state["timer"].close()
+                _send_error(state["request_id"], exc)
+            return
+        forward_s = time.perf_counter() - forward_started
+        forward_cpu_s = time.process_time() - forward_cpu_started
+
+        micro_batch = {
+            "batch_index": self.batches_run,
+            "batch_requests": len(states),
+            "batch_crops": int(crop_count),
+            "max_batch_size": self.max_batch_size,
+            "collect_ms": round((time.monotonic() - started) * 1000.0, 2),
+            "forward_ms": round(forward_s * 1000.0, 2),
+        }
+        offset = 0
+        for state in states:
+            n_crops = len(state["batch_crops"])
+            predictions = all_predictions[offset:offset + n_crops]
+            offset += n_crops
+            # The shared forward is attributed to each request by its crop share.
+            share = n_crops / max(1, len(all_crops))
+            state["timer"].add("model", forward_s * share, cpu_s=forward_cpu_s * share)
+            try:
+                result = self.worker.finish_predict(
+                    state,
+                    predictions,
+                    debug_extra={"micro_batch": micro_batch},
+                )
+            except Exception as exc:
+                _send_error(state["request_id"], exc)
+                continue
+            _send({"status": "result", "_request_id": state["request_id"], "ok": True, "data": result})
+
+    def run(self, inbox):
+        carried = None
+        while True:
+            if carried is not None:
+                item, carried = carried, None
+                if item[0] is _INBOX_EOF:
+                    return
+                msg, request_id = item
+                cmd = str(msg.get("cmd") or "").strip().lower()
+            else:
+                line = inbox.get()
+                if line is _INBOX_EOF:
+                    return
+                request_id = None
+                try:
+                    msg, request_id, cmd = _decode_message(line)
+                except Exception as exc:
+                    _send_error(request_id, exc)
+                    continue
+
+            if self._batchable(msg, cmd):
+                states, crop_count, started, carried = self._collect(msg, request_id, inbox)
+                self._run_batch(states, crop_count, started)
+                continue
+            if not _handle_message(self.worker, msg, request_id, cmd):
+                return
+
+
+def _handle_message(worker, msg, request_id, cmd):
+    """Handle one decoded command. Returns False when the worker should exit."""
+    try:
+        if cmd == "shutdown":
+            _send({"status": "result", "_request_id": request_id, "ok": True})
+            return False
+        if cmd == "predict_folder":
+            result = worker.predict_folder(request_id, msg)
+        elif cmd == "timing_summary":
+            result = worker.timing_summary_result()
+        elif cmd == "predict":
+            result = worker.predict(request_id, msg)
+        else:
+            raise ValueError(f"Unsupported command: {cmd}")
+        _send({"status": "result", "_request_id": request_id, "ok": True, "data": result})
+    except Exception as exc:
+        _send_error(request_id, exc)
+    return True
+
+
+def _stdin_reader(inbox):
+    for raw_line in sys.stdin:
+        line = raw_line.strip()
+        if line:
+            inbox.put(line)
+    inbox.put(_INBOX_EOF)
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BioVision persistent landmark inference worker")
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=0,
+        help="Max crops per cross-request forward; 0 disables micro-batching (default).",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=15.0,
+        help="Max time to wait for more queued predict requests before running a batch.",
+    )
+    parser.add_argument(
+        "--max-cached-models",
+        type=int,
+        default=3,
+        help="Max loaded model contexts kept in the LRU cache.",
+    )
+    parser.add_argument(
+        "--max-cache-mb",
+        type=float,
+        default=2048.0,
+        help="Estimated memory budget for cached model contexts (MB).",
+    )
+    parser.add_argument(
+        "--prefetch-depth",
+        type=int,
+        default=DEFAULT_PREFETCH_DEPTH,
+        help="Images decoded and cropped ahead of inference in folder runs; 0 disables prefetch.",
+    )
+    parser.add_argument(
+        "--prefetch-workers",
+        type=int,
+        default=DEFAULT_PREFETCH_WORKERS,
+        help="Threads used for prefetch decode and crop standardization.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_LEVELS,
+        default="off",
+        help="Per-stage timings returned in debug.timings: wall, +cpu, +alloc (tracemalloc). "
+             "Requests can also opt in with a \"profile\" field.",
+    )
+    parser.add_argument(
+        "--debug-payloads",
+        action="store_true",
+        help="Include orientation/resolution/clamp debug blocks in every response "
+             "(otherwise only for requests with \"debug\": true).",
+    )
+    parser.add_argument(
+        "--results-file",
+        default=None,
+        help="Memory-mapped file that receives packed landmarks for requests with "
+             "\"landmark_encoding\": \"mmap\" (truncated at startup).",
+    )
+    parser.add_argument(
+        "--results-file-mb",
+        type=float,
+        default=16.0,
+        help="Initial size of --results-file (MB); it doubles when full.",
+    )
+    parser.add_argument(
+        "--tta",
+        type=int,
+        default=0,
+        help=f"CNN test-time augmentation perturbations per crop (2-{MAX_TTA_K}; 0 disables). "
+             "Requests can override with a \"tta\" field.",
+    )
+    parser.add_argument(
+        "--prediction-cache-mb",
+        type=float,
+        default=DEFAULT_PREDICTION_CACHE_BYTES / (1024 * 1024),
+        help="Disk budget for the per-project prediction cache (MB); 0 disables it.",
+    )
+    parser.add_argument(
+        "--profile-summary",
+        default=None,
+        help="JSON file updated with session-level timing aggregates after each profiled request.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    worker = LandmarkPredictWorker(
+        max_cached_models=args.max_cached_models,
+        max_cache_bytes=int(args.max_cache_mb * 1024 * 1024),
+        prefetch_depth=args.prefetch_depth,
+        prefetch_workers=args.prefetch_workers,
+        profile=args.profile,
+        profile_summary_path=args.profile_summary,
+        debug_payloads=args.debug_payloads,
+        results_file=args.results_file,
+        results_file_bytes=int(args.results_file_mb * 1024 * 1024),
+        tta_k=args.tta,
+        prediction_cache_bytes=int(args.prediction_cache_mb * 1024 * 1024),
+    )
+    if args.max_batch_size > 0:
+        inbox = queue.Queue()
+        reader = threading.Thread(target=_stdin_reader, args=(inbox,), daemon=True)
+        reader.start()
+        PredictMicroBatcher(
+            worker,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+        ).run(inbox)
+        return
 
-def main():
-    worker = LandmarkPredictWorker()
     for raw_line in sys.stdin:
         line = raw_line.strip()
         if not line:
             continue
         request_id = None
         try:
-            msg = json.loads(line)
-            request_id = str(msg.get("_request_id") or "")
-            cmd = str(msg.get("cmd") or "").strip().lower()
-            if cmd == "shutdown":
-                _send({"status": "result", "_request_id": request_id, "ok": True})
-                return
-            if cmd != "predict":
-                raise ValueError(f"Unsupported command: {cmd}")
-            result = worker.predict(request_id, msg)
-            _send({"status": "result", "_request_id": request_id, "ok": True, "data": result})
+            msg, request_id, cmd = _decode_message(line)
         except Exception as exc:
-            _send({
-                "status": "error",
-                "_request_id": request_id,
-                "ok": False,
-                "error": str(exc),
-                "traceback": traceback.format_exc(),
-            })
+            _send_error(request_id, exc)
+            continue
+        if not _handle_message(worker, msg, request_id, cmd):
+            return
 
 
 if __name__ == "__main__":
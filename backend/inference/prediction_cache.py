@@ -0,0 +1,259 @@
+"""
+Persistent, content-addressed cache of per-box landmark predictions.
+
+Re-running inference on an image whose boxes mostly did not change should only
+pay for the boxes that did. Each per-box OBB prediction (the dict
+_run_obb_inference_on_box / _finalize_obb_batch return) is stored as one JSON
+file under <project_root>/cache/predictions/, addressed by a hash of:
+
+    image content hash   file bytes, not path or mtime (renames and copies still hit)
+    normalized box       OBB corners rounded to 0.01 px, class id + orientation hint
+    inference params     backend, TTA K and orientation policy (anything else
+                         that changes the output for the same crop)
+
+Entries live in one directory per (predictor type, tag, model file hash):
+
+    cache/predictions/<predictor_type>_<tag>/<model_hash>/<key[:2]>/<key>.json
+
+so a retrained predictor_{tag}.dat / cnn_{tag}.pth (new content hash) never
+sees stale entries, and the directories of older models are deleted the first
+time the new model is opened. The cache is bounded by total bytes; reads touch
+the entry's mtime and eviction removes the least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+
+CACHE_FORMAT_VERSION = 2
+DEFAULT_PREDICTION_CACHE_BYTES = 256 * 1024 * 1024
+# Evict down to this fraction of max_bytes so eviction scans stay rare.
+_EVICT_TARGET = 0.9
+_CORNER_DECIMALS = 2
+_HASH_CHUNK = 1024 * 1024
+
+_content_hash_lock = threading.Lock()
+_content_hashes = {}
+_MAX_MEMOIZED_HASHES = 4096
+
+_open_caches_lock = threading.Lock()
+_open_caches = {}
+
+
+def prediction_cache_dir(project_root):
+    return os.path.join(project_root, "cache", "predictions")
+
+
+def file_content_hash(path):
+    """
+    Hex blake2b digest of a file's bytes.
+
+    Memoized per process on (path, size, mtime_ns), so repeated requests for
+    the same image or model file only hash it once.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _content_hash_lock:
+        cached = _content_hashes.get(memo_key)
+    if cached is not None:
+        return cached
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _content_hash_lock:
+        if len(_content_hashes) >= _MAX_MEMOIZED_HASHES:
+            _content_hashes.clear()
+        _content_hashes[memo_key] = value
+    return value
+
+
+def normalize_box_for_key(box):
+    """
+    The parts of an OBB box that change its prediction, with corners rounded to 0.01 px.
+
+    class_id picks the directional/bilateral canonicalization in apply_obb_geometry
+    (missing means 0, as there). angle is left out: the crop is built from the corners.
+    """
+    corners = [
+        [round(float(x), _CORNER_DECIMALS), round(float(y), _CORNER_DECIMALS)]
+        for x, y in box.get("obbCorners") or []
+    ]
+    return {
+        "obbCorners": corners,
+        "class_id": int(box.get("class_id", 0)),
+        "orientation_hint": box.get("orientation_hint"),
+    }
+
+
+def prediction_cache_key(image_hash, box, params):
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "image": image_hash,
+        "box": normalize_box_for_key(box),
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _namespace_name(predictor_type, tag):
+    text = f"{predictor_type}_{tag}"
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text).strip("._-") or "default"
+
+
+class PredictionCache:
+    """Size-bounded LRU store of per-box predictions on disk (see module docstring)."""
+
+    def __init__(self, root, max_bytes=DEFAULT_PREDICTION_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._bytes = self._scan_bytes()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _scan_bytes(self):
+        total = 0
+        for path, _ in self._iter_entries():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _iter_entries(self):
+        if not os.path.isdir(self.root):
+            return
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".json"):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        yield path, os.path.getmtime(path)
+                    except OSError:
+                        continue
+
+    def namespace(self, predictor_type, tag, model_hash):
+        """
+        Entry directory for one model; removes the directories of other model hashes
+        for the same predictor type and tag (the model was retrained).
+        """
+        tag_dir = os.path.join(self.root, _namespace_name(predictor_type, tag))
+        current = os.path.join(tag_dir, model_hash)
+        if os.path.isdir(tag_dir):
+            for name in os.listdir(tag_dir):
+                stale = os.path.join(tag_dir, name)
+                if name == model_hash or not os.path.isdir(stale):
+                    continue
+                freed = sum(
+                    os.path.getsize(os.path.join(dirpath, f))
+                    for dirpath, _, files in os.walk(stale)
+                    for f in files
+                )
+                shutil.rmtree(stale, ignore_errors=True)
+                with self._lock:
+                    self._bytes = max(0, self._bytes - freed)
+                    self.invalidations += 1
+        return current
+
+    @staticmethod
+    def _entry_path(namespace, key):
+        return os.path.join(namespace, key[:2], f"{key}.json")
+
+    def get(self, namespace, key):
+        path = self._entry_path(namespace, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU recency
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, namespace, key, value):
+        path = self._entry_path(namespace, key)
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes += len(data) - old_size
+            self.writes += 1
+            over_budget = self.max_bytes and self._bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache is under budget."""
+        with self._lock:
+            entries = sorted(self._iter_entries(), key=lambda entry: entry[1])
+            total = 0
+            sizes = {}
+            for path, _ in entries:
+                try:
+                    sizes[path] = os.path.getsize(path)
+                except OSError:
+                    sizes[path] = 0
+                total += sizes[path]
+            target = int(self.max_bytes * _EVICT_TARGET)
+            for path, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= sizes[path]
+                self.evictions += 1
+            self._bytes = total
+
+    @property
+    def bytes_used(self):
+        return self._bytes
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "root": self.root,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def open_prediction_cache(project_root, max_bytes=DEFAULT_PREDICTION_CACHE_BYTES):
+    """Process-wide PredictionCache for a project (one instance per cache directory)."""
+    root = os.path.abspath(prediction_cache_dir(project_root))
+    with _open_caches_lock:
+        cache = _open_caches.get(root)
+        if cache is None:
+            cache = _open_caches[root] = PredictionCache(root, max_bytes=max_bytes)
+        else:
+            cache.max_bytes = max(0, int(max_bytes))
+        return cache
@@ -0,0 +1,117 @@
+"""
+Bounded, order-preserving prefetch pipeline for batch inference.
+
+A small thread pool runs a prepare function (image decode, detection box
+normalization, OBB crop standardization) for the next `depth` items while the
+consumer thread runs model inference on the current one. cv2/PIL release the
+GIL for decode and warpAffine, so preparation overlaps with the forward pass.
+
+Occupancy is sampled every time the consumer asks for the next item: the number
+of prepared items already waiting in the queue. Mean occupancy near 0 means the
+run is decode-bound (raise workers); near `depth` means it is model-bound.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PREFETCH_DEPTH = 4
+DEFAULT_PREFETCH_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class PrefetchPipeline:
+    """
+    Run prepare_fn(item) ahead of the consumer, keeping at most `depth` items queued.
+
+    iterate() yields (item, prepared, error) in input order; exceptions raised by
+    prepare_fn are returned as `error` instead of aborting the run. depth=0
+    disables prefetching and prepares each item inline on the consumer thread.
+    """
+
+    def __init__(self, prepare_fn, *, depth=DEFAULT_PREFETCH_DEPTH, workers=DEFAULT_PREFETCH_WORKERS):
+        self.prepare_fn = prepare_fn
+        self.depth = max(0, int(depth))
+        self.workers = max(1, int(workers))
+        self.items = 0
+        self.errors = 0
+        self._occupancy_sum = 0
+        self._occupancy_max = 0
+        self._starved = 0
+        self._consumer_wait_s = 0.0
+        self._prepare_s = 0.0
+        self._prepare_lock = threading.Lock()
+
+    def _timed_prepare(self, item):
+        started = time.perf_counter()
+        try:
+            return self.prepare_fn(item)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._prepare_lock:
+                self._prepare_s += elapsed
+
+    def _record(self, ready, waited_s, error):
+        self.items += 1
+        self._occupancy_sum += ready
+        self._occupancy_max = max(self._occupancy_max, ready)
+        if ready == 0:
+            self._starved += 1
+        self._consumer_wait_s += waited_s
+        if error is not None:
+            self.errors += 1
+
+    def iterate(self, items):
+        if self.depth == 0:
+            for item in items:
+                started = time.perf_counter()
+                try:
+                    prepared, error = self._timed_prepare(item), None
+                except Exception as exc:
+                    prepared, error = None, exc
+                self._record(0, time.perf_counter() - started, error)
+                yield item, prepared, error
+            return
+
+        source = iter(items)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bv-prefetch") as pool:
+
+            def _fill():
+                while len(pending) < self.depth:
+                    try:
+                        item = next(source)
+                    except StopIteration:
+                        return
+                    pending.append((item, pool.submit(self._timed_prepare, item)))
+
+            try:
+                _fill()
+                while pending:
+                    ready = sum(1 for _, future in pending if future.done())
+                    item, future = pending.popleft()
+                    started = time.perf_counter()
+                    error = future.exception()
+                    prepared = None if error is not None else future.result()
+                    self._record(ready, time.perf_counter() - started, error)
+                    # Refill before handing the item over so producers keep working
+                    # while the consumer runs inference on it.
+                    _fill()
+                    yield item, prepared, error
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "workers": self.workers if self.depth > 0 else 0,
+            "items": self.items,
+            "errors": self.errors,
+            "mean_occupancy": round(self._occupancy_sum / self.items, 3) if self.items else 0.0,
+            "max_occupancy": self._occupancy_max,
+            "starved_fraction": round(self._starved / self.items, 3) if self.items else 0.0,
+            "consumer_wait_s": round(self._consumer_wait_s, 3),
+            "prepare_s": round(self._prepare_s, 3),
+        }
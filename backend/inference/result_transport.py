@@ -0,0 +1,147 @@
+"""
+Compact landmark encodings for predict_worker responses.
+
+Landmark encodings (request field "landmark_encoding"):
+    objects  [{"id", "x", "y"}, ...] per specimen (default, what the UI consumes)
+    packed   one little-endian float32 buffer for the whole response, rows of
+             (id, x, y), base64-encoded in data["landmark_buffer"]; each
+             specimen carries {"offset", "count"} rows into it
+    mmap     same buffer, appended to the worker's memory-mapped results file
+             (--results-file); data["landmark_buffer"] holds {"path", "offset",
+             "nbytes"} instead of the bytes, so stdout carries only metadata
+
+The results file lives for one worker session: it is truncated when the worker
+starts, records are appended at 8-byte aligned offsets (a Float32Array/numpy
+view can be taken in place) and the file grows by doubling when full.
+"""
+
+import base64
+import mmap
+import os
+import threading
+
+import numpy as np
+
+LANDMARK_ENCODINGS = ("objects", "packed", "mmap")
+PACKED_FORMAT = "float32le"
+PACKED_COLUMNS = ("id", "x", "y")
+_PACKED_DTYPE = np.dtype("<f4")
+_ALIGN = 8
+
+
+def resolve_landmark_encoding(value, default="objects"):
+    encoding = str(value or default).strip().lower()
+    if encoding not in LANDMARK_ENCODINGS:
+        raise ValueError(
+            f"Unknown landmark_encoding: {value!r} (expected one of {', '.join(LANDMARK_ENCODINGS)})"
+        )
+    return encoding
+
+
+def pack_landmarks(specimens):
+    """
+    Replace each specimen's "landmarks" list by {"offset", "count"} rows into one buffer.
+
+    Mutates the specimen dicts; returns the (rows, 3) float32 array.
+    """
+    rows = []
+    for specimen in specimens:
+        landmarks = specimen.pop("landmarks", None) or []
+        specimen["landmarks_packed"] = {"offset": len(rows), "count": len(landmarks)}
+        rows.extend((lm["id"], lm["x"], lm["y"]) for lm in landmarks)
+    return np.asarray(rows, dtype=_PACKED_DTYPE).reshape(-1, len(PACKED_COLUMNS))
+
+
+def packed_buffer_header(array):
+    return {
+        "format": PACKED_FORMAT,
+        "columns": list(PACKED_COLUMNS),
+        "rows": int(array.shape[0]),
+    }
+
+
+def encode_packed_buffer(array):
+    header = packed_buffer_header(array)
+    header["data"] = base64.b64encode(np.ascontiguousarray(array, dtype=_PACKED_DTYPE).tobytes()).decode("ascii")
+    return header
+
+
+def decode_packed_buffer(buffer_info):
+    """(rows, 3) float32 array from a "landmark_buffer" block (inline or results-file)."""
+    if "data" in buffer_info:
+        raw = base64.b64decode(buffer_info["data"])
+    else:
+        with open(buffer_info["path"], "rb") as f:
+            f.seek(int(buffer_info["offset"]))
+            raw = f.read(int(buffer_info["nbytes"]))
+    return np.frombuffer(raw, dtype=_PACKED_DTYPE).reshape(-1, len(PACKED_COLUMNS))
+
+
+def unpack_landmarks(result):
+    """Restore per-specimen landmark dicts in a packed/mmap worker result (in place)."""
+    buffer_info = result.pop("landmark_buffer", None)
+    if buffer_info is None:
+        return result
+    rows = decode_packed_buffer(buffer_info)
+    for specimen in result.get("specimens", []):
+        ref = specimen.pop("landmarks_packed")
+        block = rows[ref["offset"]:ref["offset"] + ref["count"]]
+        specimen["landmarks"] = [
+            {"id": int(lm_id), "x": float(x), "y": float(y)}
+            for lm_id, x, y in block
+        ]
+    return result
+
+
+class ResultsFile:
+    """Append-only memory-mapped file for packed landmark buffers."""
+
+    def __init__(self, path, initial_bytes=16 * 1024 * 1024):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._capacity = max(_ALIGN, int(initial_bytes))
+        self._offset = 0
+        self._file = open(path, "w+b")
+        self._file.truncate(self._capacity)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def _grow(self, needed):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._map.close()
+        self._file.truncate(capacity)
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+        self._capacity = capacity
+
+    def append(self, data):
+        """Write bytes at the next aligned offset; returns {"path", "offset", "nbytes"}."""
+        data = memoryview(data).cast("B")
+        nbytes = data.nbytes
+        with self._lock:
+            offset = self._offset
+            end = offset + nbytes
+            if end > self._capacity:
+                self._grow(end)
+            self._map[offset:end] = data
+            self._offset = (end + _ALIGN - 1) // _ALIGN * _ALIGN
+        return {"path": self.path, "offset": offset, "nbytes": nbytes}
+
+    def write_packed(self, array):
+        header = packed_buffer_header(array)
+        header.update(self.append(np.ascontiguousarray(array, dtype=_PACKED_DTYPE).tobytes()))
+        return header
+
+    @property
+    def bytes_used(self):
+        return self._offset
+
+    def close(self):
+        with self._lock:
+            if not self._map.closed:
+                self._map.flush()
+                self._map.close()
+            if not self._file.closed:
+                self._file.close()
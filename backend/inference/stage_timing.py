@@ -0,0 +1,288 @@
+"""
+Opt-in per-stage timing for landmark inference.
+
+A StageTimer records wall time (and, at higher profile levels, process CPU time
+and traced allocation peaks) for named stages of one request: load_context,
+decode, detect, crop, model, select_orientation, map. Stages may nest; each
+stage reports its exclusive ("self") time, so model calls made from inside
+select_orientation are counted under model only and the stages add up to the
+request total.
+
+Profile levels:
+    off    no instrumentation (NULL_TIMER, no per-stage overhead)
+    wall   wall-clock time per stage
+    cpu    wall + process CPU time (includes torch intra-op threads)
+    alloc  wall + cpu + tracemalloc peak bytes per stage (slow; numpy and
+           Python allocations only, process-wide, so overlapping requests
+           see each other's allocations)
+
+TimingAggregator folds per-request summaries into a session summary that the
+worker writes to disk.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+PROFILE_LEVELS = ("off", "wall", "cpu", "alloc")
+
+
+def resolve_profile_level(value, default="off"):
+    """Normalize a request/CLI profile setting (bool, level name or None) to a level."""
+    if value is None:
+        return default if default in PROFILE_LEVELS else "off"
+    if isinstance(value, bool):
+        return "wall" if value else "off"
+    level = str(value).strip().lower()
+    if level not in PROFILE_LEVELS:
+        raise ValueError(f"Unknown profile level: {value!r} (expected one of {', '.join(PROFILE_LEVELS)})")
+    return level
+
+
+class _NullTimer:
+    """Stand-in used when profiling is off; every hook is a no-op."""
+
+    enabled = False
+    _null_stage = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._null_stage
+
+    def add(self, name, wall_s, cpu_s=None):
+        pass
+
+    def wrap(self, name, fn):
+        return fn
+
+    def summary(self):
+        return None
+
+    def close(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _TracemallocShare:
+    """
+    tracemalloc ownership and peak tracking shared by all alloc-level timers.
+
+    tracemalloc is process-global, and the micro-batcher keeps several request
+    timers open at once. Tracing starts with the first alloc timer and stops
+    when the last one closes (unless it was already running). The traced peak
+    only gets reset when a stage opens; the peak reached so far is first folded
+    into every open stage, so a reset never loses a sibling timer's peak.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._owned = False
+        self._frames = {}
+
+    def acquire(self):
+        with self._lock:
+            if self._users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owned = True
+            self._users += 1
+
+    def release(self):
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._frames.clear()
+                if self._owned and tracemalloc.is_tracing():
+                    tracemalloc.stop()
+                self._owned = False
+
+    def open_frame(self, frame):
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for other in self._frames.values():
+                other["peak_abs"] = max(other["peak_abs"], peak)
+            tracemalloc.reset_peak()
+            frame["alloc_start"] = current
+            frame["peak_abs"] = current
+            self._frames[id(frame)] = frame
+
+    def close_frame(self, frame):
+        """Peak traced bytes (absolute) while frame was open."""
+        with self._lock:
+            self._frames.pop(id(frame), None)
+            return max(frame["peak_abs"], tracemalloc.get_traced_memory()[1])
+
+
+_TRACEMALLOC = _TracemallocShare()
+
+
+class StageTimer:
+    """Per-request stage timer. Not shared between threads at the same time."""
+
+    enabled = True
+
+    def __init__(self, level="wall"):
+        self.level = resolve_profile_level(level, default="wall")
+        self.track_cpu = self.level in ("cpu", "alloc")
+        self.track_alloc = self.level == "alloc"
+        self._holds_tracemalloc = False
+        if self.track_alloc:
+            _TRACEMALLOC.acquire()
+            self._holds_tracemalloc = True
+        self._stats = {}
+        self._stack = []
+        self._started = time.perf_counter()
+
+    def _entry(self, name):
+        entry = self._stats.get(name)
+        if entry is None:
+            entry = self._stats[name] = {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "alloc_peak_bytes": 0}
+        return entry
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        frame = {
+            "child_wall_s": 0.0,
+            "child_cpu_s": 0.0,
+            "peak_abs": 0,
+        }
+        if self._holds_tracemalloc:
+            _TRACEMALLOC.open_frame(frame)
+        self._stack.append(frame)
+        cpu_start = time.process_time() if self.track_cpu else 0.0
+        wall_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_s = time.perf_counter() - wall_start
+            cpu_s = (time.process_time() - cpu_start) if self.track_cpu else 0.0
+            self._stack.pop()
+            entry = self._entry(name)
+            entry["count"] += 1
+            entry["wall_s"] += max(0.0, wall_s - frame["child_wall_s"])
+            entry["cpu_s"] += max(0.0, cpu_s - frame["child_cpu_s"])
+            if self._holds_tracemalloc:
+                peak_abs = _TRACEMALLOC.close_frame(frame)
+                entry["alloc_peak_bytes"] = max(entry["alloc_peak_bytes"], peak_abs - frame["alloc_start"])
+            if self._stack:
+                parent = self._stack[-1]
+                parent["child_wall_s"] += wall_s
+                parent["child_cpu_s"] += cpu_s
+                if self._holds_tracemalloc:
+                    parent["peak_abs"] = max(parent["peak_abs"], peak_abs)
+
+    def add(self, name, wall_s, cpu_s=None):
+        """Record time measured elsewhere (e.g. this request's share of a shared forward)."""
+        entry = self._entry(name)
+        entry["count"] += 1
+        entry["wall_s"] += max(0.0, float(wall_s))
+        if cpu_s is not None:
+            entry["cpu_s"] += max(0.0, float(cpu_s))
+
+    def wrap(self, name, fn):
+        def _timed(*args, **kwargs):
+            with self.stage(name):
+                return fn(*args, **kwargs)
+
+        return _timed
+
+    def summary(self):
+        stages = {}
+        for name, entry in self._stats.items():
+            row = {"count": entry["count"], "wall_ms": round(entry["wall_s"] * 1000.0, 3)}
+            if self.track_cpu:
+                row["cpu_ms"] = round(entry["cpu_s"] * 1000.0, 3)
+            if self.track_alloc:
+                row["alloc_peak_kb"] = round(entry["alloc_peak_bytes"] / 1024.0, 1)
+            stages[name] = row
+        return {
+            "level": self.level,
+            "total_ms": round((time.perf_counter() - self._started) * 1000.0, 3),
+            "stages": stages,
+        }
+
+    def close(self):
+        # Stages still running after close() stop tracking allocations.
+        if self._holds_tracemalloc:
+            self._holds_tracemalloc = False
+            _TRACEMALLOC.release()
+
+
+def make_stage_timer(level):
+    """StageTimer for an enabled level, NULL_TIMER for "off"."""
+    level = resolve_profile_level(level)
+    return NULL_TIMER if level == "off" else StageTimer(level)
+
+
+def _distribution(values):
+    arr = np.asarray(values, dtype=np.float64)
+    return {
+        "total_ms": round(float(arr.sum()), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "max_ms": round(float(arr.max()), 3),
+    }
+
+
+class TimingAggregator:
+    """Fold per-request StageTimer summaries into one session-level summary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self._totals = []
+        self._wall = {}
+        self._cpu = {}
+        self._alloc_peak_kb = {}
+        self._counts = {}
+        self._started_at = time.time()
+
+    def add(self, timings):
+        if not timings:
+            return
+        with self._lock:
+            self.requests += 1
+            self._totals.append(float(timings.get("total_ms", 0.0)))
+            for name, row in (timings.get("stages") or {}).items():
+                self._wall.setdefault(name, []).append(float(row.get("wall_ms", 0.0)))
+                self._counts[name] = self._counts.get(name, 0) + int(row.get("count", 0))
+                if "cpu_ms" in row:
+                    self._cpu[name] = self._cpu.get(name, 0.0) + float(row["cpu_ms"])
+                if "alloc_peak_kb" in row:
+                    self._alloc_peak_kb[name] = max(self._alloc_peak_kb.get(name, 0.0), float(row["alloc_peak_kb"]))
+
+    def summary(self):
+        with self._lock:
+            stages = {}
+            for name, values in self._wall.items():
+                row = {"requests": len(values), "calls": self._counts.get(name, 0)}
+                row.update(_distribution(values))
+                if name in self._cpu:
+                    row["cpu_total_ms"] = round(self._cpu[name], 3)
+                if name in self._alloc_peak_kb:
+                    row["alloc_peak_kb"] = self._alloc_peak_kb[name]
+                stages[name] = row
+            return {
+                "requests": self.requests,
+                "started_at": self._started_at,
+                "updated_at": time.time(),
+                "request_total": _distribution(self._totals) if self._totals else None,
+                "stages": stages,
+            }
+
+    def write(self, path):
+        """Write the session summary as JSON; returns the path."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
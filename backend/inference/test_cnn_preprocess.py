@@ -0,0 +1,59 @@
+import importlib.util
+import unittest
+
+import numpy as np
+
+from backend.inference.cnn_preprocess import normalize_crops
+
+_TORCH_MISSING = [name for name in ("torch", "torchvision") if importlib.util.find_spec(name) is None]
+
+
+class NormalizeCropsTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.crops = [rng.integers(0, 256, size=(512, 512, 3), dtype=np.uint8) for _ in range(3)]
+
+    def test_layouts_agree_and_reuse_out_buffer(self):
+        nchw = normalize_crops(self.crops)
+        nhwc = normalize_crops(self.crops, layout="nhwc")
+        self.assertTrue(nchw.flags.c_contiguous)
+        np.testing.assert_allclose(nhwc.transpose(0, 3, 1, 2), nchw, rtol=0, atol=1e-6)
+
+        out = np.empty((4, 3, 512, 512), dtype=np.float32)
+        batch = normalize_crops(self.crops, out=out)
+        self.assertEqual(batch.shape[0], 3)
+        self.assertTrue(np.shares_memory(batch, out))
+        with self.assertRaises(ValueError):
+            normalize_crops(self.crops, layout="chw")
+
+    def test_bgr_flag_swaps_channels(self):
+        bgr = normalize_crops(self.crops[:1])
+        rgb = normalize_crops([self.crops[0][:, :, ::-1]], bgr=False)
+        np.testing.assert_array_equal(bgr, rgb)
+
+    @unittest.skipIf(_TORCH_MISSING, f"requires {', '.join(_TORCH_MISSING)}")
+    def test_matches_torchvision_transform_chain(self):
+        import cv2
+        import torch
+        from torchvision import transforms as tv_transforms
+
+        from backend.inference.cnn_preprocess import NormalizeCrop, cnn_input_tensor
+
+        reference = tv_transforms.Compose([
+            tv_transforms.ToPILImage(),
+            tv_transforms.Resize((512, 512)),
+            tv_transforms.ToTensor(),
+            tv_transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+        ])
+        expected = torch.stack([reference(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)) for crop in self.crops])
+
+        actual = cnn_input_tensor(self.crops)
+        self.assertTrue(actual.is_contiguous(memory_format=torch.channels_last))
+        torch.testing.assert_close(actual, expected, rtol=0, atol=1e-6)
+        torch.testing.assert_close(cnn_input_tensor(self.crops, channels_last=False), expected, rtol=0, atol=1e-6)
+        rgb = cv2.cvtColor(self.crops[0], cv2.COLOR_BGR2RGB)
+        torch.testing.assert_close(NormalizeCrop()(rgb), expected[0], rtol=0, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
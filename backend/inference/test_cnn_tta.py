@@ -0,0 +1,67 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from backend.inference.cnn_tta import (
+    MAX_TTA_K,
+    bilateral_swap_index,
+    build_tta_transforms,
+    fuse_tta_points,
+    perturb_crops,
+    resolve_tta_k,
+)
+
+SIZE = 512
+
+
+def _blob_crop(points):
+    crop = np.zeros((SIZE, SIZE, 3), dtype=np.uint8)
+    for x, y in points:
+        cv2.circle(crop, (int(x), int(y)), 6, (255, 255, 255), -1, lineType=cv2.LINE_AA)
+    return crop
+
+
+def _locate_left_right(crop):
+    """Stand-in model: centroid of the bright blob in the left and right half of the crop."""
+    gray = crop[:, :, 0].astype(np.float64)
+    out = []
+    for x0, x1 in ((0, SIZE // 2), (SIZE // 2, SIZE)):
+        half = gray[:, x0:x1]
+        ys, xs = np.nonzero(half > 64)
+        weights = half[ys, xs]
+        out.append((np.average(xs, weights=weights) + x0, np.average(ys, weights=weights)))
+    return out
+
+
+class CnnTtaTests(unittest.TestCase):
+    def test_resolve_k(self):
+        self.assertEqual(resolve_tta_k(None), 0)
+        self.assertEqual(resolve_tta_k(1), 0)
+        self.assertEqual(resolve_tta_k(True), MAX_TTA_K)
+        self.assertEqual(resolve_tta_k(99), MAX_TTA_K)
+
+    def test_fused_points_map_back_to_crop_frame(self):
+        # Landmark 1 = left eye, 2 = right eye: a mirrored crop swaps which blob is "left".
+        landmark_ids = [1, 2]
+        truth = np.array([[150.0, 240.0], [370.0, 260.0]])
+        transforms = build_tta_transforms(MAX_TTA_K, SIZE)
+        perturbed = perturb_crops([_blob_crop(truth)], transforms)
+        self.assertEqual(len(perturbed), MAX_TTA_K)
+        points = np.array([_locate_left_right(crop) for crop in perturbed])[None]
+        swap_index = bilateral_swap_index(landmark_ids, {1: 2, 2: 1})
+        fused, dispersion = fuse_tta_points(points, transforms, swap_index)
+        np.testing.assert_allclose(fused[0], truth, atol=1.0)
+        self.assertTrue(np.all(dispersion[0] < 1.0))
+
+        # Without the bilateral swap the mirrored candidate lands on the other eye.
+        mirrored, _ = fuse_tta_points(points[:, 1:2], transforms[1:2], None)
+        np.testing.assert_allclose(mirrored[0], truth[::-1], atol=1.0)
+
+    def test_swap_index_is_none_without_pairs(self):
+        self.assertIsNone(bilateral_swap_index([1, 2, 3], {}))
+        np.testing.assert_array_equal(bilateral_swap_index([1, 2, 3], {1: 3, 3: 1}), [2, 1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
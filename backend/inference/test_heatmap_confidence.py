@@ -0,0 +1,35 @@
+import importlib.util
+import unittest
+
+
+@unittest.skipIf(importlib.util.find_spec("torch") is None, "requires torch")
+class HeatmapConfidenceTests(unittest.TestCase):
+    def test_sharp_peak_is_confident_and_flat_map_is_not(self):
+        import torch
+
+        from backend.inference.heatmap_confidence import heatmap_confidence
+
+        heatmaps = torch.zeros(1, 2, 16, 16)
+        heatmaps[0, 0, 5, 7] = 1.0
+        peak_prob, entropy = heatmap_confidence(heatmaps, beta=25.0)
+        self.assertEqual(tuple(peak_prob.shape), (1, 2))
+        self.assertGreater(peak_prob[0, 0].item(), 0.99)
+        self.assertLess(entropy[0, 0].item(), 0.01)
+        self.assertAlmostEqual(peak_prob[0, 1].item(), 1.0 / 256, places=6)
+        self.assertAlmostEqual(entropy[0, 1].item(), 1.0, places=5)
+
+    def test_two_peaks_are_less_confident_than_one(self):
+        import torch
+
+        from backend.inference.heatmap_confidence import heatmap_confidence
+
+        heatmaps = torch.zeros(1, 2, 16, 16)
+        heatmaps[0, :, 3, 3] = 0.5
+        heatmaps[0, 1, 12, 12] = 0.5
+        peak_prob, entropy = heatmap_confidence(heatmaps, beta=25.0)
+        self.assertGreater(peak_prob[0, 0].item(), peak_prob[0, 1].item())
+        self.assertLess(entropy[0, 0].item(), entropy[0, 1].item())
+
+
+if __name__ == "__main__":
+    unittest.main()
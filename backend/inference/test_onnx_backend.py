@@ -0,0 +1,87 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+_MISSING = [
+    name for name in ("torch", "torchvision", "onnx", "onnxruntime")
+    if importlib.util.find_spec(name) is None
+]
+
+
+@unittest.skipIf(_MISSING, f"requires {', '.join(_MISSING)}")
+class OnnxParityTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import torch
+
+        from backend.inference import predict
+        from backend.inference.cnn_model import CNNLandmarkPredictor
+        from backend.inference.onnx_backend import OnnxLandmarkModel, export_cnn_onnx
+
+        cls.predict = predict
+        torch.manual_seed(0)
+        cls.model = CNNLandmarkPredictor(
+            4,
+            model_variant="mobilenet_v3_large",
+            deconv_layers=2,
+            deconv_filters=32,
+        ).eval()
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.onnx_path = os.path.join(cls.tmpdir.name, "cnn_t.onnx")
+        export_cnn_onnx(cls.model, cls.onnx_path, image_size=predict.STANDARD_SIZE)
+        cls.onnx_model = OnnxLandmarkModel(cls.onnx_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_onnx_landmarks_match_torch(self):
+        rng = np.random.default_rng(2)
+        crops = [rng.integers(0, 256, size=(512, 512, 3), dtype=np.uint8) for _ in range(3)]
+        landmark_ids = [1, 2, 3, 4]
+        torch_fn = self.predict._make_cnn_batch_predict_fn(self.model, landmark_ids, max_batch_size=2)
+        onnx_fn = self.predict._make_cnn_batch_predict_fn(self.onnx_model, landmark_ids, max_batch_size=2)
+        for expected, actual in zip(torch_fn(crops), onnx_fn(crops)):
+            self.assertEqual([lm["id"] for lm in actual], landmark_ids)
+            for exp_lm, act_lm in zip(expected, actual):
+                self.assertAlmostEqual(exp_lm["x"], act_lm["x"], delta=0.01)
+                self.assertAlmostEqual(exp_lm["y"], act_lm["y"], delta=0.01)
+
+    def test_onnx_confidence_matches_torch(self):
+        rng = np.random.default_rng(4)
+        crops = [rng.integers(0, 256, size=(512, 512, 3), dtype=np.uint8) for _ in range(2)]
+        self.assertTrue(self.onnx_model.has_confidence)
+        torch_coords, torch_conf = self.predict._cnn_forward(self.model, crops)
+        onnx_coords, onnx_conf = self.predict._cnn_forward(self.onnx_model, crops)
+        self.assertEqual(onnx_conf.shape, (2, 4, 2))
+        np.testing.assert_allclose(onnx_conf, torch_conf, rtol=1e-3, atol=1e-5)
+        landmarks = self.predict._make_cnn_batch_predict_fn(self.onnx_model, [1, 2, 3, 4])(crops)[0]
+        summary = self.predict._landmark_confidence_metadata(landmarks)
+        self.assertEqual(sorted(summary["peak_prob"]), ["1", "2", "3", "4"])
+        self.assertEqual(summary["max_entropy"], max(lm["entropy"] for lm in landmarks))
+
+    def test_int8_graph_stays_close_to_float(self):
+        from backend.inference.cnn_preprocess import normalize_crops
+        from backend.inference.onnx_backend import OnnxLandmarkModel, quantize_cnn_onnx
+
+        rng = np.random.default_rng(3)
+        crops = [rng.integers(0, 256, size=(512, 512, 3), dtype=np.uint8) for _ in range(4)]
+        batch = normalize_crops(crops)
+        int8_path = os.path.join(self.tmpdir.name, "cnn_t.int8.onnx")
+        quantize_cnn_onnx(self.onnx_path, int8_path, [batch[:2], batch[2:]])
+        int8_model = OnnxLandmarkModel(int8_path, precision="int8")
+        self.assertEqual(int8_model.backend, "onnxruntime_int8")
+        landmark_ids = [1, 2, 3, 4]
+        float_fn = self.predict._make_cnn_batch_predict_fn(self.onnx_model, landmark_ids)
+        int8_fn = self.predict._make_cnn_batch_predict_fn(int8_model, landmark_ids)
+        for expected, actual in zip(float_fn(crops), int8_fn(crops)):
+            for exp_lm, act_lm in zip(expected, actual):
+                self.assertAlmostEqual(exp_lm["x"], act_lm["x"], delta=2.0)
+                self.assertAlmostEqual(exp_lm["y"], act_lm["y"], delta=2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
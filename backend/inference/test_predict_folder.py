@@ -0,0 +1,182 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.inference import predict
+from backend.inference.predict import _iter_folder_inputs, _load_folder_resume_state, predict_folder
+
+
+class FolderInputTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = self._tmpdir.name
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_directory_lists_images_sorted(self):
+        for name in ("b.JPG", "a.png", "notes.txt"):
+            self._write(os.path.join("imgs", name), "")
+        os.makedirs(os.path.join(self.root, "imgs", "nested.jpg"))
+        entries = _iter_folder_inputs(os.path.join(self.root, "imgs"))
+        self.assertEqual(
+            [os.path.basename(e["image_path"]) for e in entries], ["a.png", "b.JPG"]
+        )
+
+    def test_txt_manifest_skips_comments_and_resolves_relative_paths(self):
+        absolute = os.path.join(self.root, "elsewhere", "c.jpg")
+        manifest = self._write(
+            os.path.join("lists", "run.txt"),
+            f"# specimens\nimgs/a.jpg\n\n  ../b.jpg  \n{absolute}\n",
+        )
+        entries = _iter_folder_inputs(manifest)
+        lists_dir = os.path.join(self.root, "lists")
+        self.assertEqual(
+            [e["image_path"] for e in entries],
+            [os.path.join(lists_dir, "imgs/a.jpg"), os.path.join(lists_dir, "../b.jpg"), absolute],
+        )
+        self.assertTrue(all(e["boxes"] is None for e in entries))
+
+    def test_json_and_jsonl_manifests_carry_boxes(self):
+        boxes = [{"left": 1, "top": 2, "right": 30, "bottom": 40}]
+        json_manifest = self._write("run.json", json.dumps(["a.jpg", {"image_path": "b.jpg", "boxes": boxes}]))
+        jsonl_manifest = self._write(
+            "run.jsonl",
+            json.dumps({"image_path": "a.jpg"}) + "\n\n" + json.dumps({"image_path": "b.jpg", "boxes": boxes}) + "\n",
+        )
+        for manifest in (json_manifest, jsonl_manifest):
+            with self.subTest(manifest=os.path.basename(manifest)):
+                entries = _iter_folder_inputs(manifest)
+                self.assertEqual(
+                    entries,
+                    [
+                        {"image_path": os.path.join(self.root, "a.jpg"), "boxes": None},
+                        {"image_path": os.path.join(self.root, "b.jpg"), "boxes": boxes},
+                    ],
+                )
+
+    def test_invalid_manifests(self):
+        with self.assertRaises(ValueError):
+            _iter_folder_inputs(self._write("obj.json", json.dumps({"image_path": "a.jpg"})))
+        with self.assertRaises(ValueError):
+            _iter_folder_inputs(self._write("bad.jsonl", json.dumps({"boxes": []}) + "\n"))
+        with self.assertRaises(FileNotFoundError):
+            _iter_folder_inputs(os.path.join(self.root, "missing.txt"))
+
+
+class FolderResumeTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = self._tmpdir.name
+        self.output = os.path.join(self.root, "results.jsonl")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _record(self, name, ok=True):
+        return json.dumps({"image_path": os.path.join(self.root, name), "ok": ok})
+
+    def _read(self):
+        with open(self.output, "rb") as f:
+            return f.read()
+
+    def test_missing_output_is_a_fresh_run(self):
+        self.assertEqual(_load_folder_resume_state(self.output), set())
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_only_ok_records_count_as_completed(self):
+        text = "\n".join([self._record("a.jpg"), self._record("b.jpg", ok=False)]) + "\n"
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        completed = _load_folder_resume_state(self.output)
+        self.assertEqual(completed, {os.path.join(self.root, "a.jpg")})
+        self.assertEqual(self._read(), text.encode("utf-8"))
+
+    def test_partial_trailing_line_is_truncated(self):
+        good = self._record("a.jpg") + "\n"
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write(good + self._record("b.jpg")[:-7])
+        completed = _load_folder_resume_state(self.output)
+        self.assertEqual(completed, {os.path.join(self.root, "a.jpg")})
+        self.assertEqual(self._read(), good.encode("utf-8"))
+
+    def test_complete_final_record_without_newline_is_kept(self):
+        text = self._record("a.jpg") + "\n" + self._record("b.jpg")
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        completed = _load_folder_resume_state(self.output)
+        self.assertEqual(completed, {os.path.join(self.root, "a.jpg"), os.path.join(self.root, "b.jpg")})
+        self.assertEqual(self._read(), (text + "\n").encode("utf-8"))
+
+
+class PredictFolderResumeTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = self._tmpdir.name
+        self.images = os.path.join(self.root, "imgs")
+        os.makedirs(self.images)
+        for name in ("a.jpg", "b.jpg", "c.jpg"):
+            open(os.path.join(self.images, name), "wb").close()
+        self.output = os.path.join(self.root, "out", "results.jsonl")
+        self.failing = set()
+        self.prepared = []
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _prepare(self, ctx, image_path, **kwargs):
+        self.prepared.append(os.path.basename(image_path))
+        if os.path.basename(image_path) in self.failing:
+            raise RuntimeError(f"Could not read: {image_path}")
+        return {"image_path": image_path}
+
+    def _finish(self, ctx, state, **kwargs):
+        return {"image": state["image_path"], "specimens": []}
+
+    def _run(self, resume=True):
+        with mock.patch.object(predict, "_prepare_specimens_with_context", self._prepare), \
+                mock.patch.object(predict, "_finish_specimens_with_context", self._finish):
+            return predict_folder(
+                self.root, "v1", self.images, self.output,
+                resume=resume, context={"predictor_type": "dlib"},
+                prefetch_depth=0, prediction_cache_bytes=0,
+            )
+
+    def _records(self):
+        with open(self.output, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_resume_skips_completed_and_retries_failed(self):
+        self.failing = {"b.jpg"}
+        summary = self._run()
+        self.assertEqual((summary["processed"], summary["failed"], summary["skipped"]), (2, 1, 0))
+
+        self.failing = set()
+        self.prepared = []
+        summary = self._run()
+        self.assertEqual(self.prepared, ["b.jpg"])
+        self.assertEqual((summary["processed"], summary["failed"], summary["skipped"]), (1, 0, 2))
+        records = self._records()
+        self.assertEqual([(os.path.basename(r["image_path"]), r["ok"]) for r in records],
+                         [("a.jpg", True), ("b.jpg", False), ("c.jpg", True), ("b.jpg", True)])
+
+    def test_no_resume_rewrites_the_output(self):
+        self._run()
+        self.prepared = []
+        summary = self._run(resume=False)
+        self.assertEqual(self.prepared, ["a.jpg", "b.jpg", "c.jpg"])
+        self.assertEqual(summary["skipped"], 0)
+        self.assertEqual(len(self._records()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+import contextlib
+import io
+import json
+import os
+import queue
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from backend.inference import predict_worker
+from backend.inference.predict import _landmark_model_mtime
+from backend.inference.predict_worker import (
+    _INBOX_EOF,
+    LandmarkPredictWorker,
+    ModelContextCache,
+    PredictMicroBatcher,
+    _stdin_reader,
+)
+from backend.inference.stage_timing import NULL_TIMER
+
+
+class _StubWorker:
+    """Just enough of LandmarkPredictWorker for PredictMicroBatcher: crops are strings."""
+
+    def __init__(self, fail_forward=False):
+        self.forwards = []
+        self.fail_forward = fail_forward
+        self.context = {
+            "predictor_type": "dlib",
+            "predict_fn": lambda crop: f"pred:{crop}",
+            "batch_predict_fn": self._forward,
+        }
+
+    def _forward(self, crops):
+        self.forwards.append(list(crops))
+        if self.fail_forward:
+            raise RuntimeError("forward failed")
+        return [f"pred:{crop}" for crop in crops]
+
+    def _emit_progress(self, request_id, percent, stage, **extra):
+        pass
+
+    def context_key(self, payload):
+        return (payload["project_root"], str(payload["tag"]), "dlib")
+
+    def request_tta_k(self, payload):
+        return int(payload.get("tta", 0))
+
+    def prepare_predict(self, request_id, payload):
+        if payload.get("unreadable"):
+            raise ValueError(f"Could not read: {payload['image_path']}")
+        return {
+            "request_id": request_id,
+            "context": self.context,
+            "tta_k": self.request_tta_k(payload),
+            "boxes": [None] * payload["crops"],
+            "batch_crops": [f"{request_id}/{i}" for i in range(payload["crops"])],
+            "timer": NULL_TIMER,
+        }
+
+    def finish_predict(self, state, batch_predictions, *, batched=True, debug_extra=None):
+        return {"predictions": list(batch_predictions), "micro_batch": (debug_extra or {}).get("micro_batch")}
+
+    def timing_summary_result(self):
+        return {"summary": None}
+
+
+def _predict(request_id, crops, tag="v1", **extra):
+    msg = {"cmd": "predict", "_request_id": request_id, "project_root": "/p", "tag": tag,
+           "image_path": f"{request_id}.jpg", "crops": crops}
+    msg.update(extra)
+    return json.dumps(msg)
+
+
+def _run(batcher, lines):
+    inbox = queue.Queue()
+    for line in lines:
+        inbox.put(line)
+    inbox.put(_INBOX_EOF)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        batcher.run(inbox)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    return {response["_request_id"]: response for response in responses}
+
+
+class PredictMicroBatcherTests(unittest.TestCase):
+    def test_queued_requests_share_one_forward(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=50)
+        responses = _run(batcher, [_predict("a", 2), _predict("b", 1), _predict("c", 3)])
+
+        self.assertEqual(len(worker.forwards), 1)
+        self.assertEqual(len(worker.forwards[0]), 6)
+        for request_id, crops in (("a", 2), ("b", 1), ("c", 3)):
+            data = responses[request_id]["data"]
+            self.assertEqual(data["predictions"], [f"pred:{request_id}/{i}" for i in range(crops)])
+            self.assertEqual(data["micro_batch"]["batch_requests"], 3)
+            self.assertEqual(data["micro_batch"]["batch_crops"], 6)
+
+    def test_batches_split_by_model_and_tta_k(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=50)
+        responses = _run(batcher, [
+            _predict("a", 1),
+            _predict("b", 1),
+            _predict("c", 1, tag="v2"),
+            _predict("d", 1, tag="v2", tta=4),
+        ])
+        self.assertEqual(worker.forwards, [["a/0", "b/0"], ["c/0"], ["d/0"]])
+        self.assertEqual(responses["d"]["data"]["predictions"], ["pred:d/0"])
+
+    def test_max_batch_size_closes_the_batch(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=3, max_wait_ms=50)
+        _run(batcher, [_predict("a", 2), _predict("b", 2), _predict("c", 1)])
+        self.assertEqual([len(crops) for crops in worker.forwards], [4, 1])
+
+    def test_request_after_max_wait_gets_its_own_batch(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=10)
+        inbox = queue.Queue()
+        inbox.put(_predict("a", 1))
+        late = threading.Timer(0.3, lambda: (inbox.put(_predict("b", 1)), inbox.put(_INBOX_EOF)))
+        late.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                batcher.run(inbox)
+        finally:
+            late.cancel()
+        self.assertEqual(worker.forwards, [["a/0"], ["b/0"]])
+        self.assertEqual(batcher.batches_run, 2)
+
+    def test_non_batchable_message_is_carried_over(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=50)
+        out = io.StringIO()
+        inbox = queue.Queue()
+        for line in (_predict("a", 1), json.dumps({"cmd": "timing_summary", "_request_id": "t"}),
+                     _predict("b", 1), json.dumps({"cmd": "shutdown", "_request_id": "s"}), _predict("c", 1)):
+            inbox.put(line)
+        with contextlib.redirect_stdout(out):
+            batcher.run(inbox)
+        order = [json.loads(line)["_request_id"] for line in out.getvalue().splitlines()]
+        self.assertEqual(order, ["a", "t", "b", "s"])  # shutdown ends the loop before "c"
+        self.assertEqual(worker.forwards, [["a/0"], ["b/0"]])
+
+    def test_prepare_failure_only_fails_that_request(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=50)
+        responses = _run(batcher, [_predict("a", 1), _predict("b", 1, unreadable=True), _predict("c", 1)])
+        self.assertEqual(worker.forwards, [["a/0", "c/0"]])
+        self.assertFalse(responses["b"]["ok"])
+        self.assertIn("Could not read", responses["b"]["error"])
+        self.assertTrue(responses["a"]["ok"] and responses["c"]["ok"])
+
+    def test_forward_failure_is_sent_to_every_member(self):
+        worker = _StubWorker(fail_forward=True)
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=50)
+        responses = _run(batcher, [_predict("a", 1), _predict("b", 2)])
+        self.assertEqual(len(worker.forwards), 1)
+        for request_id in ("a", "b"):
+            self.assertEqual(responses[request_id]["status"], "error")
+            self.assertEqual(responses[request_id]["error"], "forward failed")
+
+    def test_malformed_line_is_reported_and_skipped(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=50)
+        out = io.StringIO()
+        inbox = queue.Queue()
+        for line in (_predict("a", 1), "{not json", _predict("b", 1), _INBOX_EOF):
+            inbox.put(line)
+        with contextlib.redirect_stdout(out):
+            batcher.run(inbox)
+        responses = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["status"] for r in responses], ["error", "result", "result"])
+        self.assertEqual(worker.forwards, [["a/0", "b/0"]])
+
+    def test_eof_during_collection_still_runs_the_batch(self):
+        worker = _StubWorker()
+        batcher = PredictMicroBatcher(worker, max_batch_size=64, max_wait_ms=5000)
+        responses = _run(batcher, [_predict("a", 1)])  # EOF arrives while waiting for more
+        self.assertTrue(responses["a"]["ok"])
+        self.assertEqual(worker.forwards, [["a/0"]])
+
+
+def _ctx(estimated_bytes, model_mtime=1.0):
+    return {"estimated_bytes": estimated_bytes, "model_mtime": model_mtime}
+
+
+def _key(tag):
+    return ("/p", tag, "cnn")
+
+
+class ModelContextCacheTests(unittest.TestCase):
+    def test_lru_order_with_entry_bound(self):
+        cache = ModelContextCache(max_entries=2, max_bytes=0)
+        cache.put(_key("a"), _ctx(1))
+        cache.put(_key("b"), _ctx(1))
+        self.assertIsNotNone(cache.get(_key("a")))  # a is now most recently used
+        cache.put(_key("c"), _ctx(1))
+        self.assertIsNone(cache.get(_key("b")))
+        self.assertIsNotNone(cache.get(_key("a")))
+        self.assertIsNotNone(cache.get(_key("c")))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (3, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.75)
+        self.assertEqual([k["tag"] for k in stats["keys"]], ["a", "c"])
+
+    def test_byte_bound_evicts_oldest_but_keeps_newest(self):
+        cache = ModelContextCache(max_entries=10, max_bytes=100)
+        cache.put(_key("a"), _ctx(40))
+        cache.put(_key("b"), _ctx(40))
+        cache.put(_key("c"), _ctx(40))
+        self.assertEqual([k["tag"] for k in cache.stats()["keys"]], ["b", "c"])
+        self.assertEqual(cache.estimated_bytes, 80)
+        cache.put(_key("huge"), _ctx(500))
+        self.assertEqual(len(cache), 1)
+        self.assertIsNotNone(cache.get(_key("huge")))
+        self.assertEqual(cache.stats()["evictions"], 3)
+
+    def test_changed_model_mtime_invalidates(self):
+        cache = ModelContextCache()
+        cache.put(_key("a"), _ctx(1, model_mtime=1.0))
+        self.assertIsNotNone(cache.get(_key("a"), model_mtime=1.0))
+        self.assertIsNone(cache.get(_key("a"), model_mtime=2.0))
+        self.assertEqual(len(cache), 0)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"]), (1, 1, 1))
+
+    def test_unknown_mtime_does_not_invalidate(self):
+        cache = ModelContextCache()
+        cache.put(_key("a"), _ctx(1, model_mtime=1.0))
+        self.assertIsNotNone(cache.get(_key("a"), model_mtime=None))
+        self.assertEqual(cache.stats()["invalidations"], 0)
+
+
+class EnsureContextTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.project = self._tmpdir.name
+        self.models = os.path.join(self.project, "models")
+        os.makedirs(self.models)
+        self._touch("cnn_v1.pth", 100)
+        self._touch("cnn_v1_config.json", 100)
+        self.loads = 0
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _touch(self, name, mtime):
+        path = os.path.join(self.models, name)
+        with open(path, "a", encoding="utf-8"):
+            pass
+        os.utime(path, (mtime, mtime))
+
+    def _load(self, project_root, tag, predictor_type="dlib"):
+        self.loads += 1
+        return {
+            "predictor_type": predictor_type,
+            "estimated_bytes": 1,
+            "model_mtime": _landmark_model_mtime(project_root, tag, predictor_type),
+        }
+
+    def _ensure(self, worker):
+        with mock.patch.object(predict_worker, "_load_inference_context", self._load), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return worker.ensure_context("r", self.project, "v1", "cnn")
+
+    def test_precision_switch_and_onnx_export_reload_the_context(self):
+        worker = LandmarkPredictWorker(prediction_cache_bytes=0)
+        self.assertTrue(self._ensure(worker))
+        self.assertFalse(self._ensure(worker))
+
+        self._touch("cnn_v1_config.json", 200)  # quantize_cnn_model --enable
+        self.assertTrue(self._ensure(worker))
+        self.assertFalse(self._ensure(worker))
+
+        self._touch("cnn_v1.onnx", 300)  # --export-onnx
+        self.assertTrue(self._ensure(worker))
+        self._touch("cnn_v1.int8.onnx", 300)
+        self.assertTrue(self._ensure(worker))
+        self.assertEqual(self.loads, 4)
+        self.assertEqual(worker.context_cache.stats()["invalidations"], 3)
+
+
+class StdinReaderTests(unittest.TestCase):
+    def test_skips_blank_lines_and_ends_with_eof(self):
+        inbox = queue.Queue()
+        with mock.patch.object(predict_worker.sys, "stdin", io.StringIO('{"cmd": "a"}\n\n  \n {"cmd": "b"} \n')):
+            _stdin_reader(inbox)
+        self.assertEqual([inbox.get_nowait() for _ in range(3)], ['{"cmd": "a"}', '{"cmd": "b"}', _INBOX_EOF])
+        self.assertTrue(inbox.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import time
+import unittest
+
+from backend.inference.prediction_cache import (
+    PredictionCache,
+    file_content_hash,
+    prediction_cache_key,
+)
+
+_BOX = {"obbCorners": [[10.0, 20.0], [110.0, 20.0], [110.0, 60.0], [10.0, 60.0]], "class_id": 0}
+_PARAMS = {"predictor_backend": "torch", "tta_k": 0, "orientation_policy": {}}
+
+
+def _prediction(x):
+    return {"landmarks": [{"id": 1, "x": x, "y": 5}], "inference_metadata": {"box_source": "provided_obb"}}
+
+
+class PredictionCacheKeyTests(unittest.TestCase):
+    def test_key_ignores_sub_resolution_jitter_and_unrelated_fields(self):
+        jittered = {
+            "obbCorners": [[10.001, 20.0], [110.0, 19.999], [110.0, 60.0], [10.0, 60.0]],
+            "class_id": 0,
+            "label": "fish",
+        }
+        self.assertEqual(
+            prediction_cache_key("img", _BOX, _PARAMS),
+            prediction_cache_key("img", jittered, _PARAMS),
+        )
+
+    def test_key_changes_with_image_box_and_params(self):
+        key = prediction_cache_key("img", _BOX, _PARAMS)
+        moved = {"obbCorners": [[11.0, 20.0], [110.0, 20.0], [110.0, 60.0], [10.0, 60.0]]}
+        self.assertNotEqual(key, prediction_cache_key("other", _BOX, _PARAMS))
+        self.assertNotEqual(key, prediction_cache_key("img", moved, _PARAMS))
+        self.assertNotEqual(key, prediction_cache_key("img", _BOX, dict(_PARAMS, tta_k=4)))
+
+    def test_key_changes_with_class_id(self):
+        self.assertNotEqual(
+            prediction_cache_key("img", _BOX, _PARAMS),
+            prediction_cache_key("img", dict(_BOX, class_id=1), _PARAMS),
+        )
+
+    def test_content_hash_follows_bytes_not_path(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            a = os.path.join(tmpdir, "a.jpg")
+            b = os.path.join(tmpdir, "b.jpg")
+            for path in (a, b):
+                with open(path, "wb") as f:
+                    f.write(b"same bytes")
+            self.assertEqual(file_content_hash(a), file_content_hash(b))
+            with open(b, "wb") as f:
+                f.write(b"other bytes!")
+            self.assertNotEqual(file_content_hash(a), file_content_hash(b))
+
+
+class PredictionCacheStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmpdir.name, "cache", "predictions")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_round_trip_and_stats(self):
+        cache = PredictionCache(self.root)
+        namespace = cache.namespace("cnn", "t", "m1")
+        self.assertIsNone(cache.get(namespace, "ab12"))
+        cache.put(namespace, "ab12", _prediction(3.5))
+        self.assertEqual(cache.get(namespace, "ab12"), _prediction(3.5))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["writes"]), (1, 1, 1))
+        # A new instance sees the persisted entry and its size.
+        reopened = PredictionCache(self.root)
+        self.assertEqual(reopened.bytes_used, cache.bytes_used)
+        self.assertEqual(reopened.get(namespace, "ab12"), _prediction(3.5))
+
+    def test_new_model_hash_invalidates_old_entries(self):
+        cache = PredictionCache(self.root)
+        old = cache.namespace("dlib", "t", "m1")
+        cache.put(old, "ab12", _prediction(1.0))
+        other_tag = cache.namespace("dlib", "u", "m1")
+        cache.put(other_tag, "ab12", _prediction(2.0))
+        new = cache.namespace("dlib", "t", "m2")
+        self.assertIsNone(cache.get(new, "ab12"))
+        self.assertFalse(os.path.exists(old))
+        self.assertEqual(cache.get(other_tag, "ab12"), _prediction(2.0))
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_eviction_drops_least_recently_used(self):
+        entry_bytes = len(b'{"landmarks":[{"id":1,"x":0.0,"y":5}],"inference_metadata":{"box_source":"provided_obb"}}')
+        cache = PredictionCache(self.root, max_bytes=entry_bytes * 3)
+        namespace = cache.namespace("cnn", "t", "m1")
+        now = time.time()
+        for idx, key in enumerate(("aa01", "aa02", "aa03")):
+            cache.put(namespace, key, _prediction(float(idx)))
+            os.utime(os.path.join(namespace, key[:2], f"{key}.json"), (now - 100 + idx, now - 100 + idx))
+        cache.get(namespace, "aa01")  # now the most recently used
+        cache.put(namespace, "aa04", _prediction(3.0))
+        self.assertLessEqual(cache.bytes_used, cache.max_bytes)
+        self.assertIsNotNone(cache.get(namespace, "aa01"))
+        self.assertIsNone(cache.get(namespace, "aa02"))
+        self.assertIsNotNone(cache.get(namespace, "aa04"))
+        self.assertGreaterEqual(cache.stats()["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import threading
+import time
+import unittest
+
+from backend.inference.prefetch import PrefetchPipeline
+
+
+class PrefetchPipelineTests(unittest.TestCase):
+    def test_yields_in_input_order_with_errors_inline(self):
+        def prepare(item):
+            time.sleep(0.01 * (5 - item))
+            if item == 2:
+                raise ValueError("bad image")
+            return item * 10
+
+        for depth in (0, 3):
+            pipeline = PrefetchPipeline(prepare, depth=depth, workers=3)
+            results = list(pipeline.iterate(range(5)))
+            self.assertEqual([item for item, _, _ in results], [0, 1, 2, 3, 4])
+            self.assertEqual([prepared for _, prepared, _ in results], [0, 10, None, 30, 40])
+            self.assertIsInstance(results[2][2], ValueError)
+            stats = pipeline.stats()
+            self.assertEqual(stats["items"], 5)
+            self.assertEqual(stats["errors"], 1)
+
+    def test_in_flight_items_bounded_by_depth(self):
+        lock = threading.Lock()
+        in_flight = {"now": 0, "max": 0}
+
+        def prepare(item):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            time.sleep(0.005)
+            return item
+
+        pipeline = PrefetchPipeline(prepare, depth=2, workers=4)
+        for item, prepared, _ in pipeline.iterate(range(8)):
+            with lock:
+                in_flight["now"] -= 1
+            time.sleep(0.01)
+        # depth items queued ahead plus the one the consumer is holding.
+        self.assertLessEqual(in_flight["max"], 3)
+        self.assertLessEqual(pipeline.stats()["max_occupancy"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import copy
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from backend.inference.result_transport import (
+    ResultsFile,
+    decode_packed_buffer,
+    encode_packed_buffer,
+    pack_landmarks,
+    resolve_landmark_encoding,
+    unpack_landmarks,
+)
+
+
+def _result():
+    return {
+        "specimens": [
+            {"box": {}, "landmarks": [{"id": 1, "x": 10.5, "y": 20.25}, {"id": 7, "x": 0.0, "y": 511.0}]},
+            {"box": {}, "landmarks": []},
+            {"box": {}, "landmarks": [{"id": 3, "x": 1234.0, "y": 98.5}]},
+        ],
+    }
+
+
+class PackedLandmarkTests(unittest.TestCase):
+    def test_inline_round_trip(self):
+        expected = _result()
+        result = copy.deepcopy(expected)
+        rows = pack_landmarks(result["specimens"])
+        result["landmark_buffer"] = encode_packed_buffer(rows)
+        self.assertEqual(rows.shape, (3, 3))
+        self.assertEqual(result["specimens"][2]["landmarks_packed"], {"offset": 2, "count": 1})
+        self.assertNotIn("landmarks", result["specimens"][0])
+        self.assertEqual(unpack_landmarks(result), expected)
+
+    def test_results_file_aligns_and_grows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = ResultsFile(os.path.join(tmp, "results.bin"), initial_bytes=16)
+            first = results.write_packed(np.ones((1, 3), dtype=np.float32))
+            second = results.write_packed(np.arange(12, dtype=np.float32).reshape(4, 3))
+            self.assertEqual(first["offset"], 0)
+            self.assertEqual(second["offset"], 16)
+            self.assertEqual(second["nbytes"], 48)
+            np.testing.assert_array_equal(
+                decode_packed_buffer(second),
+                np.arange(12, dtype=np.float32).reshape(4, 3),
+            )
+            np.testing.assert_array_equal(decode_packed_buffer(first), np.ones((1, 3), dtype=np.float32))
+            results.close()
+
+    def test_rejects_unknown_encoding(self):
+        self.assertEqual(resolve_landmark_encoding(None), "objects")
+        self.assertEqual(resolve_landmark_encoding("Packed"), "packed")
+        with self.assertRaises(ValueError):
+            resolve_landmark_encoding("msgpack")
+
+
+if __name__ == "__main__":
+    unittest.main()
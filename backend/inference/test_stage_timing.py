@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import unittest
+
+import cv2
+import numpy as np
+
+from backend.inference import predict
+from backend.inference.stage_timing import (
+    NULL_TIMER,
+    StageTimer,
+    TimingAggregator,
+    make_stage_timer,
+    resolve_profile_level,
+)
+
+
+class StageTimerTests(unittest.TestCase):
+    def test_nested_stages_report_exclusive_time(self):
+        timer = StageTimer("cpu")
+        with timer.stage("select_orientation"):
+            time.sleep(0.01)
+            model = timer.wrap("model", lambda: time.sleep(0.03))
+            model()
+            model()
+        stages = timer.summary()["stages"]
+        self.assertEqual(stages["model"]["count"], 2)
+        self.assertGreaterEqual(stages["model"]["wall_ms"], 55.0)
+        self.assertGreaterEqual(stages["select_orientation"]["wall_ms"], 9.0)
+        self.assertLess(stages["select_orientation"]["wall_ms"], 40.0)
+        self.assertIn("cpu_ms", stages["model"])
+        self.assertNotIn("alloc_peak_kb", stages["model"])
+
+    def test_alloc_level_tracks_peak_and_stops_tracemalloc(self):
+        was_tracing = tracemalloc.is_tracing()
+        timer = StageTimer("alloc")
+        with timer.stage("decode"):
+            buf = np.ones((1024, 1024), dtype=np.uint8)
+            del buf
+        timer.close()
+        self.assertGreaterEqual(timer.summary()["stages"]["decode"]["alloc_peak_kb"], 1000.0)
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+
+    def test_interleaved_alloc_timers_keep_their_peaks(self):
+        was_tracing = tracemalloc.is_tracing()
+        first, second = StageTimer("alloc"), StageTimer("alloc")
+        first_stage = first.stage("decode")
+        first_stage.__enter__()
+        buf = np.ones((4 * 1024 * 1024,), dtype=np.uint8)
+        del buf
+        with second.stage("load_context"):  # resets the global peak
+            pass
+        first_stage.__exit__(None, None, None)
+        first.close()  # second is still measuring
+        self.assertTrue(tracemalloc.is_tracing())
+        with second.stage("crop"):
+            buf = np.ones((2 * 1024 * 1024,), dtype=np.uint8)
+            del buf
+        second.close()
+
+        self.assertGreaterEqual(first.summary()["stages"]["decode"]["alloc_peak_kb"], 4000.0)
+        second_stages = second.summary()["stages"]
+        self.assertLess(second_stages["load_context"]["alloc_peak_kb"], 1000.0)
+        self.assertGreaterEqual(second_stages["crop"]["alloc_peak_kb"], 2000.0)
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+
+    def test_profile_levels(self):
+        self.assertIs(make_stage_timer("off"), NULL_TIMER)
+        self.assertIsNone(NULL_TIMER.summary())
+        self.assertEqual(resolve_profile_level(True), "wall")
+        self.assertEqual(resolve_profile_level(None, default="cpu"), "cpu")
+        with self.assertRaises(ValueError):
+            resolve_profile_level("verbose")
+
+
+class LazyDecodeStageTests(unittest.TestCase):
+    def test_lazy_decodes_are_timed_under_decode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "specimen.jpg")
+            cv2.imwrite(path, np.random.default_rng(0).integers(0, 255, (1000, 2000, 3), dtype=np.uint8))
+            timer = StageTimer("wall")
+            with timer.stage("decode"):
+                image = predict._open_inference_image(path)
+            box = predict._ensure_obb_box_geometry(
+                {"obbCorners": [[100, 100], [900, 100], [900, 500], [100, 500]]},
+                context="box",
+                image_shape=(image.height, image.width),
+            )
+            predict._prepare_obb_inference_crop(image, box, {}, timer=timer)
+            predict._detector_pixels(image, timer)
+        stages = timer.summary()["stages"]
+        self.assertEqual(stages["decode"]["count"], 3)
+        self.assertEqual(stages["crop"]["count"], 1)
+
+
+class TimingAggregatorTests(unittest.TestCase):
+    def test_aggregates_requests_and_writes_summary(self):
+        aggregator = TimingAggregator()
+        for wall in (10.0, 20.0, 30.0):
+            aggregator.add({
+                "level": "wall",
+                "total_ms": wall + 5.0,
+                "stages": {"model": {"count": 1, "wall_ms": wall}, "crop": {"count": 2, "wall_ms": 1.0}},
+            })
+        aggregator.add(None)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = aggregator.write(os.path.join(tmp, "debug", "timings.json"))
+            with open(path, encoding="utf-8") as f:
+                summary = json.load(f)
+        self.assertEqual(summary["requests"], 3)
+        self.assertEqual(summary["stages"]["model"]["p50_ms"], 20.0)
+        self.assertEqual(summary["stages"]["model"]["total_ms"], 60.0)
+        self.assertEqual(summary["stages"]["crop"]["calls"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,7 @@ Strategy:
 """
 
 import ast
+import json
 import os
 import subprocess
 import sys
@@ -94,3 +95,32 @@ class TestDispatcherErrorPaths:
         assert "Available:" in result.stderr
         # Spot-check that a known good name appears in the availability hint.
         assert "predict" in result.stderr
+
+
+class TestImporttimeReport:
+    """The built-in `importtime` command probes scripts in fresh interpreters."""
+
+    def _run_cli(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, CLI_PATH, *args],
+            capture_output=True,
+            text=True,
+            cwd=REPO_ROOT,
+            timeout=120,
+        )
+
+    def test_unknown_script_is_rejected(self):
+        result = self._run_cli("importtime", "not_a_real_script")
+        assert result.returncode == 1
+        assert "Unknown script: not_a_real_script" in result.stderr
+
+    def test_predict_import_defers_heavy_backends(self):
+        result = self._run_cli("importtime", "--json", "--top", "2", "predict", "predict_worker")
+        assert result.returncode == 0, result.stderr
+        report = json.loads(result.stdout)
+        assert [entry["script"] for entry in report["scripts"]] == ["predict", "predict_worker"]
+        for entry in report["scripts"]:
+            assert entry["module"] == SCRIPT_MAP[entry["script"]]
+            assert isinstance(entry["import_s"], float)
+            # torch/torchvision, dlib, onnxruntime and ultralytics load on first use.
+            assert not {"torch", "torchvision", "dlib", "onnxruntime", "ultralytics"} & set(entry["heavy_modules"])
@@ -0,0 +1,319 @@
+"""
+Post-training int8 quantization for a trained CNN landmark model.
+
+Calibrates activation ranges on the session's training crops
+(xml/train_{tag}.xml), writes an int8 ONNX graph next to the float model and
+measures the landmark error of both graphs on the held-out crops
+(xml/test_{tag}.xml, or the training crops when there is no test split).
+
+Output:
+  models/cnn_{tag}.onnx                    — float graph (exported first if missing or stale)
+  models/cnn_{tag}.int8.onnx               — int8 graph (backbone convs; deconv head and soft-argmax in float32)
+  debug/quantization_report_{tag}.json     — float vs int8 pixel error, latency and size
+
+Quantized inference is opt-in per model: --enable sets
+"inference_precision": "int8" in cnn_{tag}_config.json (only when the mean error
+delta is within --max-error-delta-px) and --disable switches back to float.
+Re-training the model removes the int8 graph and resets the setting.
+
+Usage:
+  python quantize_cnn_model.py <project_root> <tag> [--calibration-crops N] [--enable | --disable]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, _BACKEND_ROOT)
+
+import bv_utils.debug_io as dio
+from inference.onnx_backend import (
+    INT8_OP_TYPES,
+    OnnxLandmarkModel,
+    export_cnn_onnx,
+    is_onnx_model_current,
+    onnx_int8_model_path,
+    onnx_model_path,
+    onnx_runtime_available,
+    quantize_cnn_onnx,
+)
+from inference.cnn_preprocess import normalize_crops
+from inference.predict import STANDARD_SIZE, _load_cnn_model
+
+DEFAULT_CALIBRATION_CROPS = 64
+DEFAULT_MAX_ERROR_DELTA_PX = 1.0
+EVAL_BATCH_SIZE = 8
+LATENCY_RUNS = 3
+
+
+def _load_crop_records(xml_path):
+    """(crop_path, {part_name: (x, y)}) for every readable crop in a dlib training XML."""
+    if not os.path.exists(xml_path):
+        return []
+    images_el = ET.parse(xml_path).getroot().find("images")
+    if images_el is None:
+        return []
+    records = []
+    for img_el in images_el.findall("image"):
+        img_file = img_el.get("file", "")
+        box_el = img_el.find("box")
+        if not img_file or box_el is None or not os.path.exists(img_file):
+            continue
+        parts = {}
+        for p in box_el.findall("part"):
+            name = p.get("name")
+            x = int(p.get("x", -1))
+            y = int(p.get("y", -1))
+            if name is not None and x >= 0 and y >= 0:
+                parts[name] = (x, y)
+        if parts:
+            records.append((img_file, parts))
+    return records
+
+
+def _landmark_keys(records, n_landmarks):
+    """Part names present in every record, in the order train_cnn_model trained them."""
+    common = set(records[0][1].keys())
+    for _, parts in records[1:]:
+        common &= set(parts.keys())
+    keys = sorted(common, key=lambda n: (int(n) if n.isdigit() else float("inf"), n))
+    if len(keys) != int(n_landmarks):
+        raise RuntimeError(
+            f"Training XML has {len(keys)} shared landmarks but the model predicts {n_landmarks}."
+        )
+    return keys
+
+
+def _spread_subset(records, limit):
+    """Up to `limit` records spread evenly over the list (covers every source image)."""
+    if limit is None or limit <= 0 or len(records) <= limit:
+        return list(records)
+    idx = np.linspace(0, len(records) - 1, int(limit)).round().astype(int)
+    return [records[i] for i in sorted(set(idx.tolist()))]
+
+
+def _read_crops(records):
+    crops = []
+    for img_path, _ in records:
+        img = cv2.imread(img_path)
+        if img is None:
+            img = np.zeros((STANDARD_SIZE, STANDARD_SIZE, 3), dtype=np.uint8)
+        crops.append(img)
+    return crops
+
+
+def _iter_input_batches(records, batch_size=EVAL_BATCH_SIZE):
+    for start in range(0, len(records), batch_size):
+        yield normalize_crops(_read_crops(records[start:start + batch_size]))
+
+
+def _predict_px(model, records):
+    """(N, K, 2) predicted landmark positions in 512-crop pixels."""
+    denom = float(max(1, STANDARD_SIZE - 1))
+    coords = [model(batch) for batch in _iter_input_batches(records)]
+    coords = np.concatenate(coords, axis=0) if coords else np.empty((0, 0), dtype=np.float32)
+    return coords.reshape(coords.shape[0], -1, 2).astype(np.float64) * denom
+
+
+def _error_summary(pred_px, target_px):
+    dists = np.linalg.norm(pred_px - target_px, axis=2)  # [crops, landmarks]
+    per_crop = dists.mean(axis=1)
+    return {
+        "mean_px": float(per_crop.mean()),
+        "median_px": float(np.median(per_crop)),
+        "p95_px": float(np.percentile(per_crop, 95)),
+        "per_landmark_median_px": np.median(dists, axis=0).astype(float).tolist(),
+    }
+
+
+def _median_latency_ms(model, batch):
+    model(batch)  # warm-up (session initialisation, allocator growth)
+    runs = []
+    for _ in range(LATENCY_RUNS):
+        t0 = time.perf_counter()
+        model(batch)
+        runs.append((time.perf_counter() - t0) * 1000.0)
+    return float(np.median(runs))
+
+
+def _set_inference_precision(config_path, precision):
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["inference_precision"] = precision
+    dio.write_json(config_path, config)
+
+
+def quantize_cnn_model(
+    project_root,
+    tag,
+    *,
+    calibration_crops=DEFAULT_CALIBRATION_CROPS,
+    enable=False,
+    max_error_delta_px=DEFAULT_MAX_ERROR_DELTA_PX,
+):
+    """
+    Quantize cnn_{tag} to int8 and write the float-vs-int8 accuracy report.
+
+    Returns the report dict (also written to debug/quantization_report_{tag}.json).
+    """
+    if not onnx_runtime_available():
+        raise RuntimeError(
+            "onnxruntime not installed. Cannot quantize CNN models. "
+            "Install with: pip install onnx onnxruntime"
+        )
+    modeldir = os.path.join(project_root, "models")
+    weights_path = os.path.join(modeldir, f"cnn_{tag}.pth")
+    config_path = os.path.join(modeldir, f"cnn_{tag}_config.json")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    model_variant = config.get("model_variant_resolved") or config.get("model_variant_requested")
+
+    float_path = onnx_model_path(project_root, tag)
+    int8_path = onnx_int8_model_path(project_root, tag)
+    if not is_onnx_model_current(float_path, weights_path):
+        print("PROGRESS 5 exporting_float_onnx", file=sys.stderr)
+        torch_model = _load_cnn_model(project_root, tag, prefer_onnx=False)[0]
+        export_cnn_onnx(torch_model, float_path, image_size=STANDARD_SIZE)
+        del torch_model
+
+    train_records = _load_crop_records(os.path.join(project_root, "xml", f"train_{tag}.xml"))
+    if not train_records:
+        raise RuntimeError(f"No readable training crops in xml/train_{tag}.xml to calibrate with.")
+    landmark_keys = _landmark_keys(train_records, config["n_landmarks"])
+    calibration_records = _spread_subset(train_records, calibration_crops)
+
+    print(f"PROGRESS 20 calibrating {len(calibration_records)} crops", file=sys.stderr)
+    t0 = time.perf_counter()
+    quantize_cnn_onnx(float_path, int8_path, _iter_input_batches(calibration_records))
+    quantize_s = time.perf_counter() - t0
+
+    eval_records = _load_crop_records(os.path.join(project_root, "xml", f"test_{tag}.xml"))
+    eval_split = "test"
+    if not eval_records:
+        eval_records, eval_split = train_records, "train"
+    target_px = np.asarray(
+        [[parts.get(key, (STANDARD_SIZE // 2, STANDARD_SIZE // 2)) for key in landmark_keys]
+         for _, parts in eval_records],
+        dtype=np.float64,
+    )
+
+    print(f"PROGRESS 60 evaluating {len(eval_records)} {eval_split} crops", file=sys.stderr)
+    float_model = OnnxLandmarkModel(float_path, model_variant=model_variant)
+    int8_model = OnnxLandmarkModel(int8_path, model_variant=model_variant, precision="int8")
+    float_px = _predict_px(float_model, eval_records)
+    int8_px = _predict_px(int8_model, eval_records)
+    float_err = _error_summary(float_px, target_px)
+    int8_err = _error_summary(int8_px, target_px)
+    disagreement = np.linalg.norm(int8_px - float_px, axis=2)
+    mean_delta = int8_err["mean_px"] - float_err["mean_px"]
+
+    latency_batch = next(_iter_input_batches(eval_records))
+    float_ms = _median_latency_ms(float_model, latency_batch)
+    int8_ms = _median_latency_ms(int8_model, latency_batch)
+
+    within_budget = mean_delta <= float(max_error_delta_px)
+    report = {
+        "tag": tag,
+        "created_at": datetime.now().isoformat(),
+        "model_variant": model_variant,
+        "int8_model": os.path.basename(int8_path),
+        "quantized_ops": list(INT8_OP_TYPES),
+        "calibration_crops": len(calibration_records),
+        "quantize_seconds": round(quantize_s, 2),
+        "eval_split": eval_split,
+        "eval_crops": len(eval_records),
+        "float32": float_err,
+        "int8": int8_err,
+        "delta": {
+            "mean_px": mean_delta,
+            "median_px": int8_err["median_px"] - float_err["median_px"],
+            "per_landmark_median_px": [
+                q - f for q, f in zip(int8_err["per_landmark_median_px"], float_err["per_landmark_median_px"])
+            ],
+        },
+        "int8_vs_float32_px": {
+            "mean": float(disagreement.mean()),
+            "max": float(disagreement.max()),
+        },
+        "latency_ms": {
+            "batch_size": int(latency_batch.shape[0]),
+            "float32": round(float_ms, 2),
+            "int8": round(int8_ms, 2),
+        },
+        "size_bytes": {
+            "float32": os.path.getsize(float_path),
+            "int8": os.path.getsize(int8_path),
+        },
+        "max_error_delta_px": float(max_error_delta_px),
+        "within_budget": bool(within_budget),
+        "inference_precision": config.get("inference_precision", "float32"),
+    }
+
+    if enable:
+        if within_budget:
+            _set_inference_precision(config_path, "int8")
+            report["inference_precision"] = "int8"
+        else:
+            print(
+                f"Not enabling int8: mean error delta {mean_delta:.3f}px exceeds {max_error_delta_px:.3f}px",
+                file=sys.stderr,
+            )
+
+    report_path = os.path.join(project_root, "debug", f"quantization_report_{tag}.json")
+    dio.write_json(report_path, report)
+    print(f"Quantization report saved to: {report_path}", file=sys.stderr)
+    print("PROGRESS 100 done", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Quantize a trained CNN landmark model to int8 and report the accuracy delta."
+    )
+    parser.add_argument("project_root")
+    parser.add_argument("tag")
+    parser.add_argument(
+        "--calibration-crops",
+        type=int,
+        default=DEFAULT_CALIBRATION_CROPS,
+        help="Training crops used to calibrate activation ranges (0 = all).",
+    )
+    parser.add_argument(
+        "--max-error-delta-px",
+        type=float,
+        default=DEFAULT_MAX_ERROR_DELTA_PX,
+        help="Largest mean error increase (512-crop pixels) accepted by --enable.",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--enable", action="store_true", help="Use the int8 graph for inference if within budget.")
+    mode.add_argument("--disable", action="store_true", help="Switch the model back to float inference.")
+    args = parser.parse_args()
+
+    if args.disable:
+        _set_inference_precision(
+            os.path.join(args.project_root, "models", f"cnn_{args.tag}_config.json"), "float32"
+        )
+        print("inference_precision set to float32", file=sys.stderr)
+        sys.exit(0)
+
+    report = quantize_cnn_model(
+        args.project_root,
+        args.tag,
+        calibration_crops=args.calibration_crops,
+        enable=args.enable,
+        max_error_delta_px=args.max_error_delta_px,
+    )
+    print(json.dumps({
+        "delta_mean_px": report["delta"]["mean_px"],
+        "latency_ms": report["latency_ms"],
+        "size_bytes": report["size_bytes"],
+        "inference_precision": report["inference_precision"],
+    }))
@@ -7,6 +7,8 @@ data preparation is needed — just run this after prepare_dataset.py.
 Output:
   models/cnn_{tag}.pth           — model weights
   models/cnn_{tag}_config.json   — {n_landmarks, landmark_ids, trained_at}
+  models/cnn_{tag}.onnx          — optional ONNX graph (--export-onnx) for ONNX Runtime inference
+  (models/cnn_{tag}.int8.onnx from quantize_cnn_model.py is removed on retrain)
 
 Stdout protocol (same as train_shape_model.py so main.ts can parse identically):
   MODEL_PATH <path>
@@ -34,6 +36,17 @@ if _BACKEND_ROOT not in _sys.path:
 
 import bv_utils.debug_io as dio
 import bv_utils.orientation_utils as ou
+from inference.cnn_preprocess import NormalizeCrop
+from inference.heatmap_confidence import heatmap_confidence
+from inference.onnx_backend import (
+    ONNX_OPSET,
+    ONNX_PARITY_TOLERANCE,
+    export_cnn_onnx,
+    onnx_int8_model_path,
+    onnx_model_path,
+    onnx_parity_max_abs_diff,
+    onnx_runtime_available,
+)
 
 try:
     import torch
@@ -591,11 +604,14 @@ class CNNLandmarkPredictor(nn.Module):
         self.variant_fallback_reason = fallback_reason
         self.dropout_rate = dropout_rate
 
-    def forward(self, x, return_heatmaps=False):
+    def forward(self, x, return_heatmaps=False, return_confidence=False):
         x = self.features(x)
         up = self.deconv(x)
         heatmaps = self.heatmap_head(up)
         coords = _spatial_soft_argmax_2d(heatmaps, beta=self.softargmax_beta)
+        if return_confidence:
+            peak_prob, entropy = heatmap_confidence(heatmaps, beta=self.softargmax_beta)
+            return coords, peak_prob, entropy
         if return_heatmaps:
             return coords, heatmaps
         return coords
@@ -756,8 +772,42 @@ def _build_heldout_crop_report(model, records, landmark_keys, transform, device)
     return entries
 
 
+def _export_onnx_model(model, project_root, tag):
+    """
+    Export cnn_{tag}.onnx and check it against the torch model.
+
+    Export is best-effort: failures (missing `onnx`, unsupported ops, parity
+    drift) are reported in the returned summary and leave no .onnx behind, so
+    inference falls back to torch.
+    """
+    onnx_path = onnx_model_path(project_root, tag)
+    summary = {"path": os.path.basename(onnx_path), "opset": ONNX_OPSET}
+    try:
+        export_cnn_onnx(model, onnx_path, image_size=STANDARD_SIZE)
+        if onnx_runtime_available():
+            max_abs_diff = onnx_parity_max_abs_diff(model, onnx_path, image_size=STANDARD_SIZE)
+            summary["parity_max_abs_diff"] = max_abs_diff
+            if max_abs_diff > ONNX_PARITY_TOLERANCE:
+                os.remove(onnx_path)
+                summary["status"] = "failed_parity"
+                print(
+                    f"Warning: ONNX export differs from torch by {max_abs_diff:.2e}; discarded.",
+                    file=sys.stderr,
+                )
+                return summary
+        summary["status"] = "exported"
+        print(f"ONNX model exported: {onnx_path}", file=sys.stderr)
+    except Exception as exc:
+        if os.path.exists(onnx_path):
+            os.remove(onnx_path)
+        summary["status"] = "failed"
+        summary["error"] = str(exc)
+        print(f"Warning: ONNX export failed: {exc}", file=sys.stderr)
+    return summary
+
+
 def train_cnn_model(project_root, tag, epochs=None, lr=None, batch_size=None,
-                    model_variant="simplebaseline", device_override=None):
+                    model_variant="simplebaseline", device_override=None, export_onnx=False):
     """
     Train a CNN landmark predictor for a given session + model tag.
 
@@ -767,6 +817,7 @@ def train_cnn_model(project_root, tag, epochs=None, lr=None, batch_size=None,
         epochs: Training epochs (None -> adaptive by dataset size).
         lr: AdamW learning rate (None -> adaptive by dataset size).
         batch_size: Mini-batch size (None -> adaptive by dataset size).
+        export_onnx: Also write models/cnn_{tag}.onnx for ONNX Runtime inference.
     """
     project_root = os.path.abspath(project_root)
     orientation_policy, orientation_mode, aug_profile = _resolve_orientation_aug_policy(project_root)
@@ -1019,13 +1070,8 @@ def train_cnn_model(project_root, tag, epochs=None, lr=None, batch_size=None,
         tv_transforms.Normalize(mean=[0.485, 0.456, 0.406],
                                 std=[0.229, 0.224, 0.225]),
     ])
-    val_transform = tv_transforms.Compose([
-        tv_transforms.ToPILImage(),
-        tv_transforms.Resize((STANDARD_SIZE, STANDARD_SIZE)),
-        tv_transforms.ToTensor(),
-        tv_transforms.Normalize(mean=[0.485, 0.456, 0.406],
-                                std=[0.229, 0.224, 0.225]),
-    ])
+    # Evaluation crops use the same uint8 -> normalized tensor path as inference.
+    val_transform = NormalizeCrop(bgr=False, size=STANDARD_SIZE)
 
     train_ds = LandmarkDataset(
         train_records,
@@ -1280,6 +1326,15 @@ def train_cnn_model(project_root, tag, epochs=None, lr=None, batch_size=None,
     # Save weights
     model_path = os.path.join(modeldir, f"cnn_{tag}.pth")
     torch.save(model.state_dict(), model_path)
+    onnx_export = None
+    if export_onnx:
+        onnx_export = _export_onnx_model(model, project_root, tag)
+    elif os.path.exists(onnx_model_path(project_root, tag)):
+        # A graph exported from the previous weights must not shadow the new model.
+        os.remove(onnx_model_path(project_root, tag))
+    if os.path.exists(onnx_int8_model_path(project_root, tag)):
+        # int8 graphs are calibrated against specific weights; re-run quantize_cnn_model.
+        os.remove(onnx_int8_model_path(project_root, tag))
 
     # ── Resolve original schema landmark IDs ─────────────────────────────────
     # The dlib XML uses 0-indexed part names ("0", "1", ...) produced by
@@ -1349,6 +1404,7 @@ def train_cnn_model(project_root, tag, epochs=None, lr=None, batch_size=None,
         "epochs_completed": int(epochs_completed),
         "stop_reason": stop_reason,
         "best_val_error": None if not np.isfinite(_best_val_error) else float(_best_val_error),
+        "onnx_export": onnx_export,
     }
     config_path = os.path.join(modeldir, f"cnn_{tag}_config.json")
     with open(config_path, "w", encoding="utf-8") as f:
@@ -1507,6 +1563,11 @@ if __name__ == "__main__":
         choices=["cpu", "mps", "cuda"],
         help="Force compute device, overriding auto-detection.",
     )
+    parser.add_argument(
+        "--export-onnx",
+        action="store_true",
+        help="Also export models/cnn_<tag>.onnx for ONNX Runtime inference.",
+    )
     args = parser.parse_args()
 
     train_cnn_model(
@@ -1517,4 +1578,5 @@ if __name__ == "__main__":
         batch_size=args.batch_size,
         model_variant=args.model_variant,
         device_override=args.device,
+        export_onnx=args.export_onnx,
     )